@@ -35,11 +35,12 @@ from mkv2cast.converter import (
     convert_batch,
     convert_file,
     decide_for,
+    decide_for_many,
     pick_backend,
 )
 from mkv2cast.history import HistoryDB
 from mkv2cast.i18n import _, setup_i18n
-from mkv2cast.integrity import integrity_check
+from mkv2cast.integrity import integrity_check, integrity_check_batch
 from mkv2cast.json_progress import JSONProgressOutput, parse_ffmpeg_progress_for_json
 from mkv2cast.notifications import send_notification
 
@@ -58,6 +59,7 @@ __all__ = [
     "Decision",
     "ProgressCallback",
     "decide_for",
+    "decide_for_many",
     "pick_backend",
     "build_transcode_cmd",
     "convert_file",
@@ -66,6 +68,7 @@ __all__ = [
     "HistoryDB",
     # Integrity
     "integrity_check",
+    "integrity_check_batch",
     # i18n
     "_",
     "setup_i18n",
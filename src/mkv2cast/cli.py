@@ -5,8 +5,10 @@ This is the main entry point for the application.
 """
 
 import argparse
+import bisect
 import datetime
 import fnmatch
+import glob
 import os
 import re
 import shutil
@@ -15,7 +17,7 @@ import sys
 import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from mkv2cast import __author__, __license__, __url__, __version__
 from mkv2cast.config import (
@@ -27,13 +29,19 @@ from mkv2cast.config import (
     save_default_config,
 )
 from mkv2cast.converter import (
+    available_cpu_count,
     build_transcode_cmd,
     decide_for,
     have_encoder,
+    is_ffmpeg_progress_kv,
+    move_output,
+    parse_ffmpeg_progress_kv,
     pick_backend,
     probe_duration_ms,
+    set_probe_cache_dir,
     test_amf,
     test_nvenc,
+    total_ram_gb,
 )
 from mkv2cast.history import SQLITE_AVAILABLE, HistoryDB, HistoryRecorder
 from mkv2cast.i18n import _, setup_i18n
@@ -63,27 +71,28 @@ APP_DIRS: Dict[str, Path] = {}
 HISTORY_DB: Optional[HistoryDB] = None
 
 # Track all running ffmpeg processes for proper cleanup
-_active_processes: List[subprocess.Popen] = []
+_active_processes: Set[subprocess.Popen] = set()
 _processes_lock = threading.Lock()
 
 
 def register_process(proc: subprocess.Popen) -> None:
     """Register a process for tracking."""
     with _processes_lock:
-        _active_processes.append(proc)
+        _active_processes.add(proc)
 
 
 def unregister_process(proc: subprocess.Popen) -> None:
     """Unregister a process from tracking."""
     with _processes_lock:
-        if proc in _active_processes:
-            _active_processes.remove(proc)
+        _active_processes.discard(proc)
 
 
 def terminate_all_processes() -> None:
     """Terminate all active processes and wait for cleanup."""
+    global _active_processes
+    # Take the whole set; processes unregistering meanwhile just miss the new one
     with _processes_lock:
-        procs = list(_active_processes)
+        procs, _active_processes = _active_processes, set()
 
     if not procs:
         return
@@ -97,12 +106,16 @@ def terminate_all_processes() -> None:
         except Exception:
             pass
 
-    time.sleep(0.5)
-
+    # Return as soon as every process has exited, kill whatever outlives the grace period
+    deadline = time.monotonic() + 0.5
     for proc in procs:
         try:
-            if proc.poll() is None:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            try:
                 proc.kill()
+            except Exception:
+                pass
         except Exception:
             pass
 
@@ -121,9 +134,6 @@ def terminate_all_processes() -> None:
         except Exception:
             pass
 
-    with _processes_lock:
-        _active_processes.clear()
-
     print(f"✓ {_('All processes stopped')}", file=sys.stderr, flush=True)
 
 
@@ -201,6 +211,11 @@ Examples:
         action="store_true",
         help=_("Output JSON progress for integration with other applications"),
     )
+    debug_group.add_argument(
+        "--json-delta",
+        action="store_true",
+        help=_("With JSON progress, send only the changed file in progress events"),
+    )
 
     # Codec decisions
     codec_group = parser.add_argument_group(_("Codec decisions"))
@@ -455,7 +470,8 @@ Examples:
         integrity_workers=parsed_args.integrity_workers,
         notify=parsed_args.notify,
         lang=parsed_args.lang,
-        json_progress=parsed_args.json_progress,
+        json_progress=parsed_args.json_progress or parsed_args.json_delta,
+        json_delta=parsed_args.json_delta,
         retry_attempts=parsed_args.retry_attempts,
         retry_delay_sec=parsed_args.retry_delay,
         retry_fallback_cpu=parsed_args.retry_fallback_cpu,
@@ -534,22 +550,60 @@ def should_process_file(filepath: Path, cfg: Config) -> Tuple[bool, Optional[str
     return True, None
 
 
-def output_exists_for_input(inp: Path, cfg: Config) -> bool:
-    """Check if output already exists for input file."""
-    d = inp.parent
-    stem = inp.stem
+def _list_file_names(d: Path) -> List[str]:
+    """Sorted names of the regular files in a directory (one scandir, no per-file stat)."""
+    try:
+        with os.scandir(d) as it:
+            return sorted(e.name for e in it if e.is_file())
+    except OSError:
+        return []
+
+
+def _output_exists_in(names: List[str], stem: str, cfg: Config) -> bool:
+    """Check a sorted directory listing for an output or leftover tmp file of ``stem``."""
     ext = cfg.container
-    patterns = [f"{stem}*{cfg.suffix}.{ext}"]
-    for pat in patterns:
-        for p in d.glob(pat):
-            if p.is_file() and ".tmp." not in p.name:
-                return True
-    for p in d.glob(f"{stem}*.tmp.*.{ext}"):
-        if p.is_file():
+    escaped = glob.escape(stem)
+    out_pat = f"{escaped}*{cfg.suffix}.{ext}"
+    tmp_pat = f"{escaped}*.tmp.*.{ext}"
+    # Every candidate starts with the stem, so only that slice of the listing is matched
+    for i in range(bisect.bisect_left(names, stem), len(names)):
+        name = names[i]
+        if not name.startswith(stem):
+            break
+        if fnmatch.fnmatchcase(name, out_pat) and ".tmp." not in name:
+            return True
+        if fnmatch.fnmatchcase(name, tmp_pat):
             return True
     return False
 
 
+def output_exists_for_input(inp: Path, cfg: Config) -> bool:
+    """Check if output already exists for input file."""
+    return _output_exists_in(_list_file_names(inp.parent), inp.stem, cfg)
+
+
+def make_output_exists_checker() -> Callable[[Path, Config], bool]:
+    """
+    Return an :func:`output_exists_for_input` that lists each directory only once.
+
+    The listing is a snapshot taken the first time a directory is seen, so a
+    batch costs one scandir per directory instead of one per file. Outputs
+    written later in the run are still caught by the final-path check.
+    """
+    listings: Dict[Path, List[str]] = {}
+    lock = threading.Lock()
+
+    def output_exists(inp: Path, cfg: Config) -> bool:
+        d = inp.parent
+        with lock:
+            names = listings.get(d)
+            if names is None:
+                names = listings[d] = _list_file_names(d)
+        return _output_exists_in(names, inp.stem, cfg)
+
+    return output_exists
+
+
 def collect_targets(root: Path, single: Optional[Path], cfg: Config) -> Tuple[List[Path], List[Tuple[Path, str]]]:
     """Collect target files for processing."""
     targets: List[Path] = []
@@ -623,17 +677,7 @@ def is_running_as_root() -> bool:
 
 def get_total_ram_gb() -> int:
     """Get total RAM in GB."""
-    try:
-        with open("/proc/meminfo") as f:
-            for line in f:
-                if line.startswith("MemTotal:"):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        kb = int(parts[1])
-                        return kb // (1024 * 1024)
-    except Exception:
-        pass
-    return 8
+    return total_ram_gb()
 
 
 def get_gpu_info() -> Tuple[str, int]:
@@ -642,8 +686,6 @@ def get_gpu_info() -> Tuple[str, int]:
     Returns: (gpu_type, vram_mb)
     gpu_type: "nvidia", "amd", "intel", "unknown"
     """
-    import glob
-
     gpu_type = "unknown"
     vram_mb = 0
 
@@ -697,7 +739,7 @@ def auto_detect_workers(backend: str) -> Tuple[int, int]:
     Returns: (encode_workers, integrity_workers)
     """
     ram_gb = get_total_ram_gb()
-    cores = os.cpu_count() or 4
+    cores = available_cpu_count()
 
     if backend in ("vaapi", "qsv"):
         gpu_type, vram_mb = get_gpu_info()
@@ -1128,7 +1170,7 @@ def main_json_progress(single: Optional[Path], cfg: Config) -> Tuple[int, int, i
     root = Path(".").resolve()
     targets, _ignored = collect_targets(root, single, cfg)
     if not targets:
-        json_out = JSONProgressOutput()
+        json_out = JSONProgressOutput(delta=cfg.json_delta, threaded=True)
         json_out.start(0, pick_backend(cfg), 1, 1)
         json_out.complete()
         return 0, 0, 0, 0, False
@@ -1136,7 +1178,7 @@ def main_json_progress(single: Optional[Path], cfg: Config) -> Tuple[int, int, i
     backend = pick_backend(cfg)
     history = HistoryRecorder(HISTORY_DB, backend)
     history = HistoryRecorder(HISTORY_DB, backend)
-    json_out = JSONProgressOutput()
+    json_out = JSONProgressOutput(delta=cfg.json_delta, threaded=True)
 
     # Probe durations for all files
     for inp in targets:
@@ -1195,7 +1237,7 @@ def main_json_progress(single: Optional[Path], cfg: Config) -> Tuple[int, int, i
             continue
 
         tmp = get_tmp_path(inp, 0, tag, cfg)
-        dur_ms = probe_duration_ms(inp)
+        dur_ms = d.duration_ms
 
         cmd, _stage = build_transcode_cmd(inp, d, backend, tmp, log_path, cfg)
 
@@ -1211,18 +1253,38 @@ def main_json_progress(single: Optional[Path], cfg: Config) -> Tuple[int, int, i
         try:
             proc = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 text=True,
+                close_fds=False,
             )
             if proc.stderr is None:
                 raise RuntimeError("Failed to capture stderr")
 
+            kv_state: Dict[str, str] = {}
+            inp_key = str(inp)
+            # With -progress, non key=value lines are log output only
+            scrape_stats = "-progress" not in cmd
             for line in proc.stderr:
-                progress_data = parse_ffmpeg_progress_for_json(line)
+                if is_ffmpeg_progress_kv(line):
+                    info = parse_ffmpeg_progress_kv(line, kv_state, dur_ms)
+                    if info is None:
+                        continue
+                    progress_data = {
+                        "frame": info["frame"],
+                        "fps": info["fps"],
+                        "time_ms": info["current_time_ms"],
+                        "bitrate": info["bitrate"],
+                        "speed": info["speed"],
+                        "size_bytes": info["size_bytes"],
+                    }
+                elif scrape_stats:
+                    progress_data = parse_ffmpeg_progress_for_json(line)
+                else:
+                    continue
                 if progress_data:
                     json_out.file_progress(
-                        inp,
+                        inp_key,
                         frame=progress_data.get("frame", 0),
                         fps=progress_data.get("fps", 0.0),
                         time_ms=progress_data.get("time_ms", 0),
@@ -1262,7 +1324,7 @@ def main_json_progress(single: Optional[Path], cfg: Config) -> Tuple[int, int, i
 
         if rc == 0:
             try:
-                shutil.move(str(tmp), str(final))
+                move_output(tmp, final)
                 ok += 1
                 json_out.file_done(inp, output_path=final)
                 output_size = final.stat().st_size if final.exists() else 0
@@ -1327,16 +1389,18 @@ def main_legacy(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int
     skipped = 0
     failed = 0
     interrupted = False
+    output_exists = make_output_exists_checker()
 
     for _i, inp in enumerate(targets, start=1):
-        history.start(inp)
-        integrity_time = 0.0
-
-        if output_exists_for_input(inp, cfg):
+        if output_exists(inp, cfg):
             skipped += 1
-            history.finish(inp, "skipped", error_msg="output exists", integrity_time=integrity_time)
+            # One INSERT instead of a "running" row immediately updated to skipped
+            history.skip(inp, "output exists")
             continue
 
+        history.start(inp)
+        integrity_time = 0.0
+
         log_path = get_log_path(inp)
         ui.log(f"==> {inp}")
 
@@ -1389,11 +1453,12 @@ def main_legacy(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int
             history.finish(inp, "skipped", error_msg="dryrun", integrity_time=integrity_time)
             continue
 
-        probe_duration_ms(inp)
         start_encode = time.time()
 
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=86400)
+            result = subprocess.run(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=86400, close_fds=False
+            )
             rc = result.returncode
         except KeyboardInterrupt:
             interrupted = True
@@ -1421,7 +1486,7 @@ def main_legacy(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int
 
         if rc == 0:
             try:
-                shutil.move(str(tmp), str(final))
+                move_output(tmp, final)
                 ok += 1
                 ui.log("   DONE")
                 output_size = final.stat().st_size if final.exists() else 0
@@ -1491,16 +1556,18 @@ def main_rich(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int,
     skipped = 0
     failed = 0
     interrupted = False
+    output_exists = make_output_exists_checker()
 
     for idx, inp in enumerate(targets, start=1):
-        history.start(inp)
-        integrity_time = 0.0
-
-        if output_exists_for_input(inp, cfg):
+        if output_exists(inp, cfg):
             skipped += 1
-            history.finish(inp, "skipped", error_msg="output exists", integrity_time=integrity_time)
+            # One INSERT instead of a "running" row immediately updated to skipped
+            history.skip(inp, "output exists")
             continue
 
+        history.start(inp)
+        integrity_time = 0.0
+
         log_path = get_log_path(inp)
 
         # Integrity check
@@ -1552,7 +1619,7 @@ def main_rich(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int,
             history.finish(inp, "skipped", error_msg="dryrun", integrity_time=integrity_time)
             continue
 
-        dur_ms = probe_duration_ms(inp)
+        dur_ms = d.duration_ms
         start_encode = time.time()
 
         try:
@@ -1582,7 +1649,7 @@ def main_rich(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, int,
 
         if rc == 0:
             try:
-                shutil.move(str(tmp), str(final))
+                move_output(tmp, final)
                 output_size = final.stat().st_size if final.exists() else 0
                 ui.log_success(encode_time, output_size)
                 history.finish(
@@ -1671,7 +1738,7 @@ def main_pipeline(single: Optional[Path], cfg: Config) -> Tuple[int, int, int, i
         integrity_workers=integrity_workers,
         get_log_path=get_log_path,
         get_tmp_path=lambda inp, wid, tag: get_tmp_path(inp, wid, tag, cfg),
-        output_exists_fn=output_exists_for_input,
+        output_exists_fn=make_output_exists_checker(),
     )
 
     ok, skipped, failed, interrupted = pipeline.run()
@@ -1782,6 +1849,7 @@ def main() -> int:
 
     # Initialize directories
     APP_DIRS = get_app_dirs()
+    set_probe_cache_dir(APP_DIRS["cache"] / "probe")
 
     # Create default config if needed
     save_default_config(APP_DIRS["config"])
@@ -199,6 +199,7 @@ class Config:
 
     # JSON progress output (new)
     json_progress: bool = False
+    json_delta: bool = False
 
     # Retry / robustness
     retry_attempts: int = 1
@@ -10,7 +10,10 @@ Contains:
 - Batch processing with multi-threading
 """
 
+import errno
+import hashlib
 import json
+import math
 import os
 import re
 import shlex
@@ -18,60 +21,278 @@ import shutil
 import subprocess
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from queue import Empty, Queue
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from mkv2cast.config import CFG, Config
 
+if TYPE_CHECKING:
+    from mkv2cast.history import HistoryDB
+
+# Faster JSON parsing for ffprobe output (optional, parses bytes directly)
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    _json_loads: Callable[[Any], Any] = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
 # -------------------- UTILITY FUNCTIONS --------------------
 
 
+@lru_cache(maxsize=None)
+def find_executable(name: str) -> str:
+    """
+    Resolve an executable on PATH once per process.
+
+    Returns the absolute path, or ``name`` unchanged if it is not found so the
+    subprocess call reports the usual error.
+    """
+    return shutil.which(name) or name
+
+
 def run_quiet(cmd: List[str], timeout: float = 10.0) -> bool:
     """Run a command quietly, return True if successful."""
     try:
-        p = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+        # Python fds are non-inheritable by default (PEP 446), so there is nothing
+        # to close; close_fds=False also lets CPython launch via posix_spawn.
+        p = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout, close_fds=False)
         return p.returncode == 0
     except Exception:
         return False
 
 
-def ffprobe_json(path: Path) -> Dict[str, Any]:
-    """Run ffprobe and return JSON output."""
-    cmd = ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", str(path)]
-    out = subprocess.check_output(cmd)
-    result: Dict[str, Any] = json.loads(out)
+# Directory for the persistent ffprobe cache; None keeps probe results in memory only.
+_PROBE_CACHE_DIR: Optional[Path] = None
+
+# In-process ffprobe output per (path, mtime_ns, size), least recently used first
+_PROBE_MEMO: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_PROBE_MEMO_MAX = 1024
+# Probes currently running, so concurrent callers for the same file wait instead of launching another
+_PROBE_INFLIGHT: "Dict[Tuple[str, int, int], Future[bytes]]" = {}
+_probe_memo_lock = threading.Lock()
+# On-disk entries unused for this long, or beyond this many (oldest first), are pruned
+_PROBE_CACHE_MAX_AGE_DAYS = 30
+_PROBE_CACHE_MAX_ENTRIES = 10000
+
+
+def set_probe_cache_dir(path: Optional[Path]) -> None:
+    """
+    Enable (or with ``None`` disable) the on-disk ffprobe cache.
+
+    Cached probes are keyed by path, size and mtime, so an edited or replaced
+    file is probed again while unchanged files skip ffprobe across runs.
+    Stale entries are pruned here (see :func:`_prune_probe_cache`).
+    """
+    global _PROBE_CACHE_DIR
+    _PROBE_CACHE_DIR = Path(path) if path is not None else None
+    with _probe_memo_lock:
+        _PROBE_MEMO.clear()
+    _probe_duration_cached.cache_clear()
+    if _PROBE_CACHE_DIR is not None:
+        _prune_probe_cache(_PROBE_CACHE_DIR)
+
+
+def _prune_probe_cache(
+    cache_dir: Path, max_age_days: int = _PROBE_CACHE_MAX_AGE_DAYS, max_entries: int = _PROBE_CACHE_MAX_ENTRIES
+) -> int:
+    """
+    Delete cache entries not used for ``max_age_days``, then the least recently
+    used ones beyond ``max_entries``. Returns the number of files removed.
+    """
+    try:
+        with os.scandir(cache_dir) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.is_file()]
+    except OSError:
+        return 0
+
+    cutoff = time.time() - max_age_days * 86400
+    entries.sort(reverse=True)  # most recently used first
+    stale = [p for i, (mtime, p) in enumerate(entries) if mtime < cutoff or i >= max_entries]
+
+    removed = 0
+    for p in stale:
+        try:
+            os.unlink(p)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _probe_cache_file(path: str, mtime_ns: int, size: int) -> Optional[Path]:
+    """Return the cache entry path for one file version, if disk caching is on."""
+    if _PROBE_CACHE_DIR is None:
+        return None
+    key = f"{path}\0{size}\0{mtime_ns}".encode("utf-8", "surrogateescape")
+    return _PROBE_CACHE_DIR / f"{hashlib.sha1(key).hexdigest()}.json"
+
+
+def _run_ffprobe(path: str, timeout: Optional[float] = None) -> bytes:
+    """Run ffprobe for streams and format, returning its raw JSON output."""
+    cmd = [
+        find_executable("ffprobe"),
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-show_streams",
+        "-show_format",
+        path,
+    ]
+    # stdout stays bytes end to end: no text-mode decode before parsing
+    out: bytes = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=timeout, close_fds=False)
+    return out
+
+
+def _ffprobe_output(path: str, mtime_ns: int, size: int, timeout: Optional[float] = None) -> bytes:
+    """Raw ffprobe JSON for one file version; the stat fields only serve as cache key."""
+    key = (path, mtime_ns, size)
+    while True:
+        with _probe_memo_lock:
+            memo = _PROBE_MEMO.get(key)
+            if memo is not None:
+                _PROBE_MEMO.move_to_end(key)
+                return memo
+            pending = _PROBE_INFLIGHT.get(key)
+            if pending is None:
+                pending = _PROBE_INFLIGHT[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            try:
+                return pending.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise subprocess.TimeoutExpired(path, timeout or 0) from None
+            except subprocess.TimeoutExpired:
+                # The other caller's (shorter) timeout ran out; probe again with ours
+                continue
+        break
+
+    try:
+        out = _probe_output_uncached(path, mtime_ns, size, timeout)
+    except BaseException as exc:
+        with _probe_memo_lock:
+            del _PROBE_INFLIGHT[key]
+        pending.set_exception(exc)
+        raise
+
+    with _probe_memo_lock:
+        _PROBE_MEMO[key] = out
+        if len(_PROBE_MEMO) > _PROBE_MEMO_MAX:
+            _PROBE_MEMO.popitem(last=False)
+        del _PROBE_INFLIGHT[key]
+    pending.set_result(out)
+    return out
+
+
+def _probe_output_uncached(path: str, mtime_ns: int, size: int, timeout: Optional[float]) -> bytes:
+    """Read a probe from the on-disk cache, or run ffprobe and store it there."""
+    cache_file = _probe_cache_file(path, mtime_ns, size)
+    if cache_file is not None:
+        try:
+            cached = cache_file.read_bytes()
+        except OSError:
+            cached = b""
+        if cached:
+            try:
+                os.utime(cache_file)  # mark as recently used for pruning
+            except OSError:
+                pass
+            return cached
+
+    out = _run_ffprobe(path, timeout)
+    if cache_file is not None:
+        # Write then rename so concurrent runs never read a partial entry
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(out)
+            os.replace(tmp, cache_file)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+    return out
+
+
+def ffprobe_json(path: Path, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run ffprobe and return JSON output.
+
+    Output is cached per path, mtime and size (see :func:`set_probe_cache_dir`),
+    and parsed on every call so callers always get their own dict.
+
+    Raises:
+        subprocess.CalledProcessError: ffprobe could not read the file.
+        subprocess.TimeoutExpired: ffprobe ran longer than ``timeout`` seconds.
+    """
+    path_str = os.fspath(path)
+    try:
+        st = os.stat(path_str)
+    except OSError:
+        # Nothing to key the cache on; let ffprobe report the error
+        out = _run_ffprobe(path_str, timeout)
+    else:
+        out = _ffprobe_output(path_str, st.st_mtime_ns, st.st_size, timeout)
+    result: Dict[str, Any] = _json_loads(out)
     return result
 
 
+def _duration_ms_from_probe(j: Dict[str, Any]) -> int:
+    """Extract duration in milliseconds from ffprobe JSON (format, then first video stream)."""
+
+    def to_seconds(value: Any) -> float:
+        try:
+            return float(value or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    dur = to_seconds((j.get("format") or {}).get("duration"))
+    if dur <= 0:
+        for s in j.get("streams") or []:
+            if s.get("codec_type") == "video":
+                d2 = to_seconds(s.get("duration"))
+                if d2 > 0:
+                    dur = d2
+                    break
+    if dur <= 0:
+        return 0
+    return int(dur * 1000)
+
+
+@lru_cache(maxsize=4096)
+def _probe_duration_cached(path: str, mtime_ns: int, size: int) -> int:
+    """
+    Probe duration once per file version, sharing the full probe with :func:`decide_for`.
+
+    Probe errors propagate so that a failed (e.g. timed out) probe is not cached.
+    """
+    return _duration_ms_from_probe(_json_loads(_ffprobe_output(path, mtime_ns, size)))
+
+
 def probe_duration_ms(path: Path, debug: bool = False) -> int:
-    """Get video duration in milliseconds."""
+    """
+    Get video duration in milliseconds.
+
+    Prefer :attr:`Decision.duration_ms` when :func:`decide_for` has already
+    been run for the file. Results are cached per path, mtime and size, so
+    probing the same unchanged file again does not launch another ffprobe.
+    """
     try:
-        cmd = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-of",
-            "json",
-            "-show_entries",
-            "format=duration:stream=codec_type,duration",
-            str(path),
-        ]
-        j = json.loads(subprocess.check_output(cmd))
-        dur = None
-        if "format" in j and j["format"].get("duration"):
-            dur = float(j["format"]["duration"])
-        if (dur is None or dur <= 0) and "streams" in j:
-            for s in j["streams"]:
-                if s.get("codec_type") == "video" and s.get("duration"):
-                    d2 = float(s["duration"])
-                    if d2 > 0:
-                        dur = d2
-                        break
-        if dur is None or dur <= 0:
-            return 0
-        return int(dur * 1000)
+        st = os.stat(path)
+        return _probe_duration_cached(os.fspath(path), st.st_mtime_ns, st.st_size)
     except Exception:
         return 0
 
@@ -84,6 +305,116 @@ def file_size(path: Path) -> int:
         return 0
 
 
+def move_output(src: Path, dst: Path) -> None:
+    """
+    Move a finished temp file to its final path.
+
+    Tries a single ``os.replace`` first; only when the temp directory is on
+    another filesystem does it fall back to ``shutil.move`` (copy + delete).
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(os.fspath(src), os.fspath(dst))
+
+
+def available_cpu_count() -> int:
+    """
+    Number of CPUs this process may actually use.
+
+    Honours the affinity mask (taskset, cpusets) and a cgroup v2 ``cpu.max``
+    quota, so container limits do not lead to oversubscribed workers.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        count = os.cpu_count() or 4
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "rb") as f:
+            quota, _sep, period = f.read().partition(b" ")
+        if quota != b"max":
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError, ZeroDivisionError):
+        pass
+    return max(1, count)
+
+
+def total_ram_gb(default: int = 8) -> int:
+    """
+    Total RAM in whole GiB, capped by a cgroup v2 ``memory.max`` limit.
+
+    Returns ``default`` when the amount cannot be determined.
+    """
+    try:
+        total = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return default
+    if total <= 0:
+        return default
+
+    try:
+        with open("/sys/fs/cgroup/memory.max", "rb") as f:
+            limit = f.read().strip()
+        if limit != b"max":
+            total = min(total, int(limit))
+    except (OSError, ValueError):
+        pass
+    return total // (1024 * 1024 * 1024)
+
+
+def partition_cpus(workers: int) -> List[List[int]]:
+    """
+    Split the CPUs this process may run on into ``workers`` disjoint sets.
+
+    Every CPU is used: when they do not divide evenly, the first sets get
+    one extra. Returns an empty list when CPU affinity is not supported or
+    there are fewer CPUs than workers (pinning would then only add contention).
+    """
+    if workers <= 1 or not hasattr(os, "sched_getaffinity"):
+        return []
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except OSError:
+        return []
+    if len(cpus) < workers:
+        return []
+    per_worker, extra = divmod(len(cpus), workers)
+    sets = []
+    start = 0
+    for i in range(workers):
+        end = start + per_worker + (1 if i < extra else 0)
+        sets.append(cpus[start:end])
+        start = end
+    return sets
+
+
+def spawn_ffmpeg_pinned(
+    args: List[str], cpu_set: Optional[Sequence[int]] = None, **popen_kwargs: Any
+) -> subprocess.Popen:
+    """
+    Start ffmpeg, optionally restricted to a set of CPUs.
+
+    The affinity is applied to the child right after it starts; the encoder
+    threads ffmpeg creates afterwards inherit it. Pinning is best effort and
+    silently skipped where ``os.sched_setaffinity`` is unavailable.
+
+    Unless the caller says otherwise ``close_fds`` is False, which lets CPython
+    start the child with posix_spawn (vfork) instead of copying the parent's
+    page tables with fork; pinning after the fact keeps that fast path open.
+    """
+    popen_kwargs.setdefault("close_fds", False)
+    process = subprocess.Popen(args, **popen_kwargs)
+    if cpu_set and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(process.pid, cpu_set)
+        except OSError:
+            pass
+    return process
+
+
 def _mb_to_bytes(mb: int) -> int:
     """Convert MB to bytes (0 for invalid values)."""
     try:
@@ -92,6 +423,18 @@ def _mb_to_bytes(mb: int) -> int:
         return 0
 
 
+@lru_cache(maxsize=16)
+def _dev_of(path: str) -> int:
+    """Device id of a directory (cached: a path does not change filesystem mid-run)."""
+    return os.stat(path).st_dev
+
+
+def _free_bytes(path: str) -> int:
+    """Free bytes available to unprivileged users (same value as shutil.disk_usage().free)."""
+    st = os.statvfs(path)
+    return st.f_bavail * st.f_frsize
+
+
 def check_disk_space(
     output_dir: Path,
     tmp_dir: Optional[Path],
@@ -107,20 +450,18 @@ def check_disk_space(
     min_free_out = _mb_to_bytes(cfg.disk_min_free_mb)
     if min_free_out > 0:
         try:
-            usage = shutil.disk_usage(str(output_dir))
-            if usage.free - estimated_bytes < min_free_out:
+            if _free_bytes(str(output_dir)) - estimated_bytes < min_free_out:
                 return f"Insufficient free space in {output_dir} (min {cfg.disk_min_free_mb} MB)"
         except Exception:
             pass
 
     if tmp_dir is not None and cfg.disk_min_free_tmp_mb > 0:
         try:
-            if output_dir.exists() and tmp_dir.exists():
-                if output_dir.stat().st_dev != tmp_dir.stat().st_dev:
-                    usage = shutil.disk_usage(str(tmp_dir))
-                    min_free_tmp = _mb_to_bytes(cfg.disk_min_free_tmp_mb)
-                    if usage.free - estimated_bytes < min_free_tmp:
-                        return f"Insufficient temp space in {tmp_dir} (min {cfg.disk_min_free_tmp_mb} MB)"
+            # Missing directories raise here and skip the check, as before
+            if _dev_of(str(output_dir)) != _dev_of(str(tmp_dir)):
+                min_free_tmp = _mb_to_bytes(cfg.disk_min_free_tmp_mb)
+                if _free_bytes(str(tmp_dir)) - estimated_bytes < min_free_tmp:
+                    return f"Insufficient temp space in {tmp_dir} (min {cfg.disk_min_free_tmp_mb} MB)"
         except Exception:
             pass
 
@@ -149,19 +490,38 @@ def enforce_output_quota(output_path: Path, input_size: int, cfg: Config) -> Opt
 # -------------------- BACKEND SELECTION --------------------
 
 
-def have_encoder(name: str) -> bool:
-    """Check if ffmpeg has the specified encoder."""
-    try:
-        result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=4.0)
-        # Search for the encoder name in the output
+_encoders_cache: Optional[FrozenSet[str]] = None
+_encoders_lock = threading.Lock()
+
+
+def _list_encoders() -> FrozenSet[str]:
+    """Return the set of encoder names reported by ``ffmpeg -encoders`` (cached)."""
+    global _encoders_cache
+
+    with _encoders_lock:
+        if _encoders_cache is not None:
+            return _encoders_cache
+        try:
+            result = subprocess.run(
+                [find_executable("ffmpeg"), "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=4.0
+            )
+        except Exception:
+            return frozenset()
+        names = set()
         for line in result.stdout.split("\n"):
             # Format is like: " V....D libx264    description..."
             parts = line.split()
-            if len(parts) >= 2 and parts[1] == name:
-                return True
-        return False
-    except Exception:
-        return False
+            if len(parts) >= 2:
+                names.add(parts[1])
+        # Only cache a successful listing so a transient failure can be retried
+        if result.returncode == 0 and names:
+            _encoders_cache = frozenset(names)
+        return frozenset(names)
+
+
+def have_encoder(name: str) -> bool:
+    """Check if ffmpeg has the specified encoder."""
+    return name in _list_encoders()
 
 
 def test_qsv(vaapi_device: str = "/dev/dri/renderD128") -> bool:
@@ -169,7 +529,7 @@ def test_qsv(vaapi_device: str = "/dev/dri/renderD128") -> bool:
     if not Path(vaapi_device).exists():
         return False
     cmd = [
-        "ffmpeg",
+        find_executable("ffmpeg"),
         "-hide_banner",
         "-loglevel",
         "error",
@@ -180,15 +540,13 @@ def test_qsv(vaapi_device: str = "/dev/dri/renderD128") -> bool:
         "-f",
         "lavfi",
         "-i",
-        "testsrc2=size=128x128:rate=30",
-        "-t",
-        "0.2",
+        "testsrc2=size=128x128",
+        "-frames:v",
+        "1",
         "-vf",
         "format=nv12",
         "-c:v",
         "h264_qsv",
-        "-global_quality",
-        "35",
         "-an",
         "-f",
         "null",
@@ -202,7 +560,7 @@ def test_vaapi(vaapi_device: str = "/dev/dri/renderD128") -> bool:
     if not Path(vaapi_device).exists():
         return False
     cmd = [
-        "ffmpeg",
+        find_executable("ffmpeg"),
         "-hide_banner",
         "-loglevel",
         "error",
@@ -211,15 +569,13 @@ def test_vaapi(vaapi_device: str = "/dev/dri/renderD128") -> bool:
         "-f",
         "lavfi",
         "-i",
-        "testsrc2=size=128x128:rate=30",
-        "-t",
-        "0.2",
+        "testsrc2=size=128x128",
+        "-frames:v",
+        "1",
         "-vf",
         "format=nv12,hwupload",
         "-c:v",
         "h264_vaapi",
-        "-qp",
-        "35",
         "-an",
         "-f",
         "null",
@@ -242,22 +598,18 @@ def test_nvenc() -> bool:
 
     # Test actual encoding
     cmd = [
-        "ffmpeg",
+        find_executable("ffmpeg"),
         "-hide_banner",
         "-loglevel",
         "error",
         "-f",
         "lavfi",
         "-i",
-        "testsrc2=size=128x128:rate=30",
-        "-t",
-        "0.2",
+        "testsrc2=size=128x128",
+        "-frames:v",
+        "1",
         "-c:v",
         "h264_nvenc",
-        "-preset",
-        "p4",
-        "-cq",
-        "23",
         "-an",
         "-f",
         "null",
@@ -274,28 +626,18 @@ def test_amf() -> bool:
 
     # Test actual encoding
     cmd = [
-        "ffmpeg",
+        find_executable("ffmpeg"),
         "-hide_banner",
         "-loglevel",
         "error",
         "-f",
         "lavfi",
         "-i",
-        "testsrc2=size=128x128:rate=30",
-        "-t",
-        "0.2",
+        "testsrc2=size=128x128",
+        "-frames:v",
+        "1",
         "-c:v",
         "h264_amf",
-        "-quality",
-        "balanced",
-        "-rc",
-        "cqp",
-        "-qp_i",
-        "23",
-        "-qp_p",
-        "23",
-        "-qp_b",
-        "23",
         "-an",
         "-f",
         "null",
@@ -304,6 +646,11 @@ def test_amf() -> bool:
     return run_quiet(cmd, timeout=6.0)
 
 
+# Auto-detected backend per VAAPI device, so test encodes run at most once per process
+_backend_cache: Dict[str, str] = {}
+_backend_lock = threading.Lock()
+
+
 def pick_backend(cfg: Optional[Config] = None) -> str:
     """
     Select the best available encoding backend.
@@ -319,20 +666,57 @@ def pick_backend(cfg: Optional[Config] = None) -> str:
 
     if cfg.hw != "auto":
         return cfg.hw
+
+    vaapi_device = cfg.vaapi_device
+    with _backend_lock:
+        cached = _backend_cache.get(vaapi_device)
+    if cached is not None:
+        return cached
+
+    backend = _probe_backend(vaapi_device)
+    with _backend_lock:
+        _backend_cache[vaapi_device] = backend
+    return backend
+
+
+def _probe_backend(vaapi_device: str) -> str:
+    """Run the hardware test encodes and return the best working backend."""
     # Priority: NVENC > AMF > QSV > VAAPI > CPU
-    if have_encoder("h264_nvenc") and test_nvenc():
-        return "nvenc"
-    if have_encoder("h264_amf") and test_amf():
-        return "amf"
-    if have_encoder("h264_qsv") and test_qsv(cfg.vaapi_device):
-        return "qsv"
-    if have_encoder("h264_vaapi") and test_vaapi(cfg.vaapi_device):
-        return "vaapi"
+    # The test encodes are independent and mostly wait on ffmpeg, so run them concurrently.
+    probes: Dict[str, Callable[[], bool]] = {}
+    if have_encoder("h264_nvenc"):
+        probes["nvenc"] = test_nvenc
+    if have_encoder("h264_amf"):
+        probes["amf"] = test_amf
+    if have_encoder("h264_qsv"):
+        probes["qsv"] = lambda: test_qsv(vaapi_device)
+    if have_encoder("h264_vaapi"):
+        probes["vaapi"] = lambda: test_vaapi(vaapi_device)
+
+    if not probes:
+        return "cpu"
+
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {name: executor.submit(fn) for name, fn in probes.items()}
+
+    for name in ("nvenc", "amf", "qsv", "vaapi"):
+        future = futures.get(name)
+        if future is None:
+            continue
+        try:
+            if future.result():
+                return name
+        except Exception:
+            pass
     return "cpu"
 
 
-def video_args_for(backend: str, cfg: Optional[Config] = None) -> List[str]:
-    """Get ffmpeg video encoding arguments for the specified backend."""
+def video_args_for(backend: str, cfg: Optional[Config] = None, threads: int = 0) -> List[str]:
+    """
+    Get ffmpeg video encoding arguments for the specified backend.
+
+    ``threads`` limits the libx264 thread count (CPU backend only, 0 = ffmpeg default).
+    """
     if cfg is None:
         cfg = CFG
 
@@ -444,7 +828,7 @@ def video_args_for(backend: str, cfg: Optional[Config] = None) -> List[str]:
             "high",
             "-level",
             "4.1",
-        ]
+        ] + (["-threads", str(threads)] if threads > 0 else [])
     raise RuntimeError(f"Unknown backend: {backend}")
 
 
@@ -474,12 +858,35 @@ class Decision:
     sidx: int = -1  # Subtitle stream index to use (-1 if none)
     slang: str = ""  # Subtitle language
     sforced: bool = False  # Is forced subtitle
+    duration_ms: int = 0  # Duration in milliseconds (0 if unknown)
+
+
+# Bit depth of the most common pixel formats, checked before falling back to the regex
+_PIX_BITDEPTH = {
+    "yuv420p": 8,
+    "yuvj420p": 8,
+    "yuv422p": 8,
+    "yuv444p": 8,
+    "nv12": 8,
+    "yuv420p10le": 10,
+    "yuv422p10le": 10,
+    "yuv444p10le": 10,
+    "p010le": 10,
+    "yuv420p12le": 12,
+    "yuv422p12le": 12,
+    "yuv444p12le": 12,
+}
+
+_RE_BITDEPTH = re.compile(r"(10|12)le")
 
 
 def parse_bitdepth_from_pix(pix: str) -> int:
     """Parse bit depth from pixel format string."""
     pix = (pix or "").lower()
-    m = re.search(r"(10|12)le", pix)
+    depth = _PIX_BITDEPTH.get(pix)
+    if depth is not None:
+        return depth
+    m = _RE_BITDEPTH.search(pix)
     if m:
         return int(m.group(1))
     if "p010" in pix:
@@ -487,17 +894,13 @@ def parse_bitdepth_from_pix(pix: str) -> int:
     return 8
 
 
+# Audio description markers in track titles (matched on the lowercased title)
+_RE_AUDIO_DESCRIPTION = re.compile(r"audio[ -]?description|visual impaired| v\.i| ad")
+
+
 def is_audio_description(title: str) -> bool:
     """Check if audio track is an audio description track."""
-    t = (title or "").lower()
-    return (
-        "audio description" in t
-        or "audio-description" in t
-        or "audiodescription" in t
-        or "visual impaired" in t
-        or " v.i" in t
-        or " ad" in t
-    )
+    return _RE_AUDIO_DESCRIPTION.search((title or "").lower()) is not None
 
 
 def select_audio_track(streams: List[dict], cfg: Optional["Config"] = None) -> Tuple[Optional[dict], str]:
@@ -526,50 +929,45 @@ def select_audio_track(streams: List[dict], cfg: Optional["Config"] = None) -> T
     if not audio_streams:
         return None, ""
 
-    def get_lang(s: dict) -> str:
-        return (s.get("tags") or {}).get("language", "").lower()
-
-    def get_title(s: dict) -> str:
-        return (s.get("tags") or {}).get("title", "")
-
     # 1. Explicit track index
     if cfg.audio_track is not None:
         if 0 <= cfg.audio_track < len(audio_streams):
             selected = audio_streams[cfg.audio_track]
-            return selected, get_lang(selected)
-
-    # 2. Language priority list from config
-    if cfg.audio_lang:
-        langs = [lang.strip().lower() for lang in cfg.audio_lang.split(",")]
-        for lang in langs:
-            # First pass: match language, exclude audio descriptions
-            for stream in audio_streams:
-                stream_lang = get_lang(stream)
-                if (stream_lang == lang or stream_lang.startswith(lang)) and not is_audio_description(
-                    get_title(stream)
-                ):
-                    return stream, stream_lang
-            # Second pass: match language, include audio descriptions
-            for stream in audio_streams:
-                stream_lang = get_lang(stream)
-                if stream_lang == lang or stream_lang.startswith(lang):
-                    return stream, stream_lang
+            return selected, (selected.get("tags") or {}).get("language", "").lower()
 
-    # 3. Default: prefer French (fre, fra, fr)
+    langs = [lang.strip().lower() for lang in cfg.audio_lang.split(",")] if cfg.audio_lang else []
+    no_lang_rank = len(langs)
     fr_langs = {"fre", "fra", "fr"}
-    # First pass: French without audio description
-    for stream in audio_streams:
-        stream_lang = get_lang(stream)
-        if stream_lang in fr_langs and not is_audio_description(get_title(stream)):
-            return stream, stream_lang
-    # Second pass: French with audio description
-    for stream in audio_streams:
-        stream_lang = get_lang(stream)
-        if stream_lang in fr_langs:
-            return stream, stream_lang
 
-    # 4. Fallback: first audio track
-    return audio_streams[0], get_lang(audio_streams[0])
+    # Single pass: score every track, smallest key wins. The key encodes
+    # 2. language priority list (non audio-description first), then
+    # 3. French default (non audio-description first), then
+    # 4. track order (so the first audio track is the fallback).
+    best_key: Optional[Tuple[int, int, int, int, int]] = None
+    best: Tuple[dict, str] = (audio_streams[0], "")
+    for pos, stream in enumerate(audio_streams):
+        tags = stream.get("tags") or {}
+        stream_lang = tags.get("language", "").lower()
+        is_ad = is_audio_description(tags.get("title", ""))
+
+        lang_rank = no_lang_rank
+        for rank, lang in enumerate(langs):
+            if stream_lang == lang or stream_lang.startswith(lang):
+                lang_rank = rank
+                break
+
+        if lang_rank < no_lang_rank:
+            key = (lang_rank, int(is_ad), 0, 0, pos)
+        elif stream_lang in fr_langs:
+            key = (lang_rank, 0, 0, int(is_ad), pos)
+        else:
+            key = (lang_rank, 0, 1, 0, pos)
+
+        if best_key is None or key < best_key:
+            best_key = key
+            best = (stream, stream_lang)
+
+    return best
 
 
 def select_subtitle_track(
@@ -605,57 +1003,59 @@ def select_subtitle_track(
     if not subtitle_streams:
         return None
 
-    def get_lang(s: dict) -> str:
-        return (s.get("tags") or {}).get("language", "").lower()
-
     def is_forced(s: dict) -> bool:
         disposition = s.get("disposition") or {}
         return disposition.get("forced", 0) == 1
 
-    def is_sdh(s: dict) -> bool:
-        """Check if subtitle is SDH (for hearing impaired)."""
-        disposition = s.get("disposition") or {}
-        title = (s.get("tags") or {}).get("title", "").lower()
-        return disposition.get("hearing_impaired", 0) == 1 or "sdh" in title
-
     # 1. Explicit track index
     if cfg.subtitle_track is not None:
         if 0 <= cfg.subtitle_track < len(subtitle_streams):
             selected = subtitle_streams[cfg.subtitle_track]
             return selected, is_forced(selected)
 
-    # 2. Prefer forced subtitles in audio language
-    if cfg.prefer_forced_subs and audio_lang:
-        # Normalize audio language for comparison
-        audio_lang_norm = audio_lang[:2] if len(audio_lang) >= 2 else audio_lang
-        for stream in subtitle_streams:
-            stream_lang = get_lang(stream)
+    prefer_forced = bool(cfg.prefer_forced_subs and audio_lang)
+    # Normalize audio language for comparison
+    audio_lang_norm = audio_lang[:2] if len(audio_lang) >= 2 else audio_lang
+    langs = [lang.strip().lower() for lang in cfg.subtitle_lang.split(",")] if cfg.subtitle_lang else []
+
+    # Single pass: score every track, smallest key wins. The key encodes
+    # 2. forced subtitles in the audio language (if --prefer-forced-subs), then
+    # 3. language priority list: forced, then non-SDH, then any, then
+    # track order. Tracks matching neither rule are never selected.
+    best_key: Optional[Tuple[int, int, int, int]] = None
+    best: Optional[dict] = None
+    for pos, stream in enumerate(subtitle_streams):
+        tags = stream.get("tags") or {}
+        disposition = stream.get("disposition") or {}
+        stream_lang = tags.get("language", "").lower()
+        forced = disposition.get("forced", 0) == 1
+
+        key: Optional[Tuple[int, int, int, int]] = None
+        if prefer_forced and forced:
             stream_lang_norm = stream_lang[:2] if len(stream_lang) >= 2 else stream_lang
-            if is_forced(stream) and (stream_lang == audio_lang or stream_lang_norm == audio_lang_norm):
-                return stream, True
-
-    # 3. Language priority list
-    if cfg.subtitle_lang:
-        langs = [lang.strip().lower() for lang in cfg.subtitle_lang.split(",")]
-        for lang in langs:
-            # First pass: forced subtitles in requested language
-            for stream in subtitle_streams:
-                stream_lang = get_lang(stream)
-                if (stream_lang == lang or stream_lang.startswith(lang)) and is_forced(stream):
-                    return stream, True
-            # Second pass: non-SDH subtitles in requested language
-            for stream in subtitle_streams:
-                stream_lang = get_lang(stream)
-                if (stream_lang == lang or stream_lang.startswith(lang)) and not is_sdh(stream):
-                    return stream, is_forced(stream)
-            # Third pass: any subtitle in requested language
-            for stream in subtitle_streams:
-                stream_lang = get_lang(stream)
+            if stream_lang == audio_lang or stream_lang_norm == audio_lang_norm:
+                key = (0, 0, 0, pos)
+
+        if key is None:
+            for rank, lang in enumerate(langs):
                 if stream_lang == lang or stream_lang.startswith(lang):
-                    return stream, is_forced(stream)
+                    if forced:
+                        kind = 0
+                    elif disposition.get("hearing_impaired", 0) == 1 or "sdh" in tags.get("title", "").lower():
+                        kind = 2  # SDH (for hearing impaired)
+                    else:
+                        kind = 1
+                    key = (1, rank, kind, pos)
+                    break
+
+        if key is not None and (best_key is None or key < best_key):
+            best_key = key
+            best = stream
 
     # 4. No subtitle selected by default (user must specify --subtitle-lang)
-    return None
+    if best is None:
+        return None
+    return best, is_forced(best)
 
 
 def decide_for(path: Path, cfg: Optional[Config] = None) -> Decision:
@@ -675,6 +1075,7 @@ def decide_for(path: Path, cfg: Optional[Config] = None) -> Decision:
     j = ffprobe_json(path)
     fmt = j.get("format", {}) or {}
     format_name = fmt.get("format_name", "") or ""
+    duration_ms = _duration_ms_from_probe(j)
 
     streams = j.get("streams", []) or []
     v = next((s for s in streams if s.get("codec_type") == "video"), None)
@@ -778,9 +1179,43 @@ def decide_for(path: Path, cfg: Optional[Config] = None) -> Decision:
         sidx=sidx,
         slang=slang,
         sforced=sforced,
+        duration_ms=duration_ms,
     )
 
 
+def decide_for_many(
+    paths: List[Path], cfg: Optional[Config] = None, max_workers: Optional[int] = None
+) -> List[Decision]:
+    """
+    Analyze several files concurrently.
+
+    Each :func:`decide_for` call mostly waits on an ffprobe subprocess, so the
+    probes are overlapped in a thread pool.
+
+    Args:
+        paths: Paths to the MKV files.
+        cfg: Config instance (uses global CFG if not provided).
+        max_workers: Number of concurrent probes (default: twice the CPU count, max 32).
+
+    Returns:
+        List of Decision objects in the same order as ``paths``.
+
+    Raises:
+        Exception: Whatever :func:`decide_for` raised for the first failing file.
+    """
+    if cfg is None:
+        cfg = CFG
+
+    if not paths:
+        return []
+
+    if max_workers is None or max_workers <= 0:
+        max_workers = min(32, (os.cpu_count() or 4) * 2)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(lambda p: decide_for(p, cfg), paths))
+
+
 # -------------------- FFMPEG COMMAND BUILDING --------------------
 
 
@@ -791,6 +1226,7 @@ def build_transcode_cmd(
     tmp_out: Path,
     log_path: Optional[Path] = None,
     cfg: Optional[Config] = None,
+    threads: int = 0,
 ) -> Tuple[List[str], str]:
     """
     Build ffmpeg transcoding command.
@@ -802,6 +1238,7 @@ def build_transcode_cmd(
         tmp_out: Temporary output path.
         log_path: Optional path to write command log.
         cfg: Config instance.
+        threads: Encoder thread count for the CPU backend (0 = ffmpeg default).
 
     Returns:
         Tuple of (command_args, stage_name).
@@ -813,7 +1250,8 @@ def build_transcode_cmd(
     if ext not in ("mkv", "mp4"):
         raise RuntimeError("container must be mkv or mp4")
 
-    args = ["ffmpeg", "-hide_banner", "-y"]
+    # Machine-readable progress (key=value blocks) on stderr instead of the human stats line
+    args = ["ffmpeg", "-hide_banner", "-y", "-progress", "pipe:2", "-nostats"]
 
     if ext == "mkv":
         args += ["-f", "matroska"]
@@ -842,7 +1280,7 @@ def build_transcode_cmd(
     if not decision.need_v:
         args += ["-c:v", "copy"]
     else:
-        args += video_args_for(backend, cfg)
+        args += video_args_for(backend, cfg, threads)
 
     if decision.add_silence:
         args += ["-c:a", "aac", "-b:a", cfg.abr, "-ac", "2"]
@@ -891,6 +1329,20 @@ def build_transcode_cmd(
 
 # -------------------- PROGRESS PARSING --------------------
 
+# Progress fields of an ffmpeg stats line, folded into one alternation so each
+# line is scanned once. time= may use a comma as decimal separator and a
+# flexible hour width depending on the ffmpeg version/locale.
+_RE_PROGRESS_FIELDS = re.compile(
+    r"(?P<time>time=\s*(?P<h>\d+):(?P<m>\d+):(?P<s>\d+)[\.,](?P<cs>\d+))"
+    r"|(?P<fps>fps=\s*(?P<fps_v>[0-9.]+))"
+    r"|(?P<speed>speed=\s*(?P<speed_v>[0-9.]+)x)"
+    r"|(?P<bitrate>bitrate=\s*(?P<bitrate_v>[^\s]+))"
+    r"|(?P<frame>frame=\s*(?P<frame_v>\d+))"
+    r"|(?P<size>size=\s*(?P<size_v>\d+)kB)"
+)
+
+_RE_SPEED_VALUE = re.compile(r"([0-9.]+)x")
+
 
 def parse_ffmpeg_progress(line: str, dur_ms: int) -> Dict[str, Any]:
     """
@@ -920,47 +1372,133 @@ def parse_ffmpeg_progress(line: str, dur_ms: int) -> Dict[str, Any]:
         "size_bytes": 0,
     }
 
-    # Parse time: time=00:01:23.45 (some ffmpeg builds may use comma as decimal separator)
-    # Accept both dot and comma and flexible hour width to be robust across versions/locales.
-    m = re.search(r"time=\s*(\d+):(\d+):(\d+)[\.,](\d+)", line)
-    if m:
-        h, mi, s, cs = int(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4))
-        current_ms = (h * 3600 + mi * 60 + s) * 1000 + cs * 10
-        result["current_time_ms"] = current_ms
-        if dur_ms > 0:
-            result["progress_percent"] = min(100.0, (current_ms / dur_ms) * 100)
-
-    # Parse fps: fps=123.45
-    m = re.search(r"fps=\s*([0-9.]+)", line)
-    if m:
+    # Single sweep over the line; only the first occurrence of each field counts.
+    seen = set()
+    for m in _RE_PROGRESS_FIELDS.finditer(line):
+        key = m.lastgroup
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+
+        if key == "time":
+            h, mi, s, cs = int(m.group("h")), int(m.group("m")), int(m.group("s")), int(m.group("cs"))
+            current_ms = (h * 3600 + mi * 60 + s) * 1000 + cs * 10
+            result["current_time_ms"] = current_ms
+            if dur_ms > 0:
+                result["progress_percent"] = min(100.0, (current_ms / dur_ms) * 100)
+        elif key == "fps":
+            try:
+                result["fps"] = float(m.group("fps_v"))
+            except ValueError:
+                pass
+        elif key == "speed":
+            try:
+                result["speed"] = f"{float(m.group('speed_v')):.1f}x"
+            except ValueError:
+                pass
+        elif key == "bitrate":
+            result["bitrate"] = m.group("bitrate_v")
+        elif key == "frame":
+            result["frame"] = int(m.group("frame_v"))
+        elif key == "size":
+            result["size_bytes"] = int(m.group("size_v")) * 1024
+
+    return result
+
+
+def is_ffmpeg_progress_kv(line: str) -> bool:
+    """Return True if ``line`` is a ``key=value`` line from ffmpeg ``-progress`` output."""
+    key, sep, value = line.strip().partition("=")
+    return bool(sep) and bool(key) and " " not in key and "=" not in value
+
+
+def parse_ffmpeg_progress_kv(line: str, state: Dict[str, str], dur_ms: int) -> Optional[Dict[str, Any]]:
+    """
+    Feed one line of ffmpeg ``-progress`` output and return metrics at block end.
+
+    ffmpeg emits a block of ``key=value`` lines terminated by ``progress=continue``
+    (or ``progress=end``). Keys are accumulated in ``state`` until the terminator
+    is seen, at which point the block is converted and ``state`` is cleared.
+
+    Args:
+        line: A ``key=value`` line (see :func:`is_ffmpeg_progress_kv`).
+        state: Per-process dict used to accumulate the current block.
+        dur_ms: Total duration in milliseconds.
+
+    Returns:
+        Dict with the same keys as :func:`parse_ffmpeg_progress` when a block is
+        complete, None otherwise.
+    """
+    key, _sep, value = line.strip().partition("=")
+    if key != "progress":
+        state[key] = value.strip()
+        return None
+
+    result: Dict[str, Any] = {
+        "progress_percent": 0.0,
+        "fps": 0.0,
+        "speed": "",
+        "bitrate": "",
+        "current_time_ms": 0,
+        "frame": 0,
+        "size_bytes": 0,
+    }
+
+    try:
+        result["current_time_ms"] = max(0, int(state.get("out_time_us", "")) // 1000)
+    except ValueError:
+        pass
+    if dur_ms > 0:
+        result["progress_percent"] = min(100.0, (result["current_time_ms"] / dur_ms) * 100)
+
+    try:
+        result["fps"] = float(state.get("fps", ""))
+    except ValueError:
+        pass
+
+    speed = state.get("speed", "")
+    if speed.endswith("x"):
         try:
-            result["fps"] = float(m.group(1))
+            result["speed"] = f"{float(speed[:-1]):.1f}x"
         except ValueError:
             pass
 
-    # Parse speed: speed=2.5x
-    m = re.search(r"speed=\s*([0-9.]+)x", line)
-    if m:
-        result["speed"] = f"{float(m.group(1)):.1f}x"
-
-    # Parse bitrate: bitrate=2500kbits/s
-    m = re.search(r"bitrate=\s*([^\s]+)", line)
-    if m:
-        result["bitrate"] = m.group(1)
+    bitrate = state.get("bitrate", "")
+    if bitrate and bitrate != "N/A":
+        result["bitrate"] = bitrate
 
-    # Parse frame: frame=12345
-    m = re.search(r"frame=\s*(\d+)", line)
-    if m:
-        result["frame"] = int(m.group(1))
+    try:
+        result["frame"] = int(state.get("frame", ""))
+    except ValueError:
+        pass
 
-    # Parse size: size=12345kB
-    m = re.search(r"size=\s*(\d+)kB", line)
-    if m:
-        result["size_bytes"] = int(m.group(1)) * 1024
+    try:
+        result["size_bytes"] = int(state.get("total_size", ""))
+    except ValueError:
+        pass
 
+    state.clear()
     return result
 
 
+def parse_ffmpeg_progress_line(line: str, state: Dict[str, str], dur_ms: int) -> Optional[Dict[str, Any]]:
+    """
+    Parse one line of ffmpeg stderr, accepting both progress formats.
+
+    ``-progress`` key=value lines are handled by :func:`parse_ffmpeg_progress_kv`;
+    anything else falls back to the regex-based :func:`parse_ffmpeg_progress`
+    for the human-readable stats line.
+
+    Returns:
+        Progress metrics dict, or None if the line carries no progress update.
+    """
+    if is_ffmpeg_progress_kv(line):
+        return parse_ffmpeg_progress_kv(line, state, dur_ms)
+    if "time=" not in line:
+        return None
+    return parse_ffmpeg_progress(line, dur_ms)
+
+
 def calculate_eta(current_time_ms: int, dur_ms: int, speed_str: str, start_time: float) -> float:
     """
     Calculate ETA in seconds based on progress.
@@ -983,7 +1521,7 @@ def calculate_eta(current_time_ms: int, dur_ms: int, speed_str: str, start_time:
 
     # Try speed-based ETA first
     if speed_str:
-        m = re.match(r"([0-9.]+)x", speed_str)
+        m = _RE_SPEED_VALUE.match(speed_str)
         if m:
             try:
                 speed_x = float(m.group(1))
@@ -1049,6 +1587,29 @@ def get_output_tag(decision: Decision) -> str:
     return tag
 
 
+def _history_output_matches(previous: Path, input_path: Path, output_dir: Path, cfg: Config) -> bool:
+    """
+    Check a recorded output against the name this run's settings could give it.
+
+    Mirrors the checks :func:`convert_file` makes after analysis: the output must
+    be ``<stem><tag><suffix>.<container>`` in ``output_dir``, with a tag that
+    ``force_h264``/``force_aac`` allow, and no ``.remux`` output when compatible
+    files are skipped instead of remuxed (``skip_when_ok``).
+    """
+    if previous.parent != output_dir:
+        return False
+    for tag in (".h264.aac", ".h264", ".aac", ".remux"):
+        if previous.name == f"{input_path.stem}{tag}{cfg.suffix}.{cfg.container}":
+            break
+    else:
+        return False
+    if cfg.force_h264 and ".h264" not in tag:
+        return False
+    if cfg.force_aac and ".aac" not in tag:
+        return False
+    return not (cfg.skip_when_ok and tag == ".remux")
+
+
 def convert_file(
     input_path: Path,
     cfg: Optional[Config] = None,
@@ -1056,6 +1617,8 @@ def convert_file(
     output_dir: Optional[Path] = None,
     log_path: Optional[Path] = None,
     progress_callback: Optional[ProgressCallback] = None,
+    cpu_set: Optional[Sequence[int]] = None,
+    history_db: Optional["HistoryDB"] = None,
 ) -> Tuple[bool, Optional[Path], str]:
     """
     Convert a single MKV file.
@@ -1077,6 +1640,11 @@ def convert_file(
             - current_time_ms: int
             - duration_ms: int
             - error: Optional[str]
+        cpu_set: Optional CPUs to pin ffmpeg to (see :func:`partition_cpus`).
+            With the CPU backend the encoder thread count is matched to it.
+        history_db: Optional history; files it records as already converted
+            (unchanged input, output still present and named as the current
+            settings would name it) are skipped without probing.
 
     Returns:
         Tuple of (success, output_path, message).
@@ -1107,6 +1675,14 @@ def convert_file(
     # Signal checking stage
     _call_callback("checking", progress_percent=0.0)
 
+    # Re-runs: skip files the history already has a valid output for, before ffprobe.
+    # Only an output this run could also produce counts (see _history_output_matches).
+    if history_db is not None:
+        previous = history_db.find_converted(input_path)
+        if previous is not None and _history_output_matches(previous, input_path, output_dir, cfg):
+            _call_callback("skipped", progress_percent=100.0)
+            return True, previous, "Output already exists"
+
     # Analyze file
     try:
         decision = decide_for(input_path, cfg)
@@ -1133,7 +1709,7 @@ def convert_file(
         _call_callback("failed", error=space_error)
         return False, None, space_error
 
-    # Create temp path
+    # Temp file lives next to the output so finalizing is an atomic same-directory rename
     tmp_path = output_dir / f"{input_path.stem}{tag}{cfg.suffix}.tmp.{os.getpid()}.{cfg.container}"
 
     if cfg.dryrun:
@@ -1141,8 +1717,8 @@ def convert_file(
         _call_callback("skipped", progress_percent=100.0)
         return True, None, f"DRYRUN: {shlex.join(cmd)}"
 
-    # Get duration for progress calculation
-    dur_ms = probe_duration_ms(input_path)
+    # Duration for progress calculation (from the decide_for probe)
+    dur_ms = decision.duration_ms
 
     # Signal encoding start
     _call_callback("encoding", progress_percent=0.0, duration_ms=dur_ms)
@@ -1158,42 +1734,49 @@ def convert_file(
             if cfg.retry_delay_sec > 0:
                 time.sleep(cfg.retry_delay_sec)
 
-        cmd, stage = build_transcode_cmd(input_path, decision, attempt_backend, tmp_path, log_path, cfg)
+        threads = len(cpu_set) if cpu_set and attempt_backend == "cpu" else 0
+        cmd, stage = build_transcode_cmd(
+            input_path, decision, attempt_backend, tmp_path, log_path, cfg, threads=threads
+        )
 
         # Run ffmpeg with progress parsing if callback is provided
         if progress_callback is not None:
             success, out_path, message = _run_ffmpeg_with_callback(
-                cmd, tmp_path, output_path, stage, dur_ms, input_path, progress_callback
+                cmd, tmp_path, output_path, stage, dur_ms, input_path, progress_callback, cpu_set, cfg.stats_period
             )
         else:
             # Original behavior without callback
             try:
-                result = subprocess.run(cmd, capture_output=True, timeout=86400)  # 24h timeout
-
-                if result.returncode == 0:
-                    # Move temp to final
-                    shutil.move(str(tmp_path), str(output_path))
+                # Output is not inspected here, so let it go straight to /dev/null
+                process = spawn_ffmpeg_pinned(cmd, cpu_set, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                try:
+                    process.wait(timeout=86400)  # 24h timeout
+                except BaseException:
+                    # Like subprocess.run: never leave ffmpeg writing to tmp_path behind us
+                    process.kill()
+                    process.wait()
+                    raise
+
+                if process.returncode == 0:
+                    os.replace(tmp_path, output_path)
                     success = True
                     out_path = output_path
                     message = f"{stage} complete"
                 else:
                     # Clean up temp file
-                    if tmp_path.exists():
-                        tmp_path.unlink()
+                    tmp_path.unlink(missing_ok=True)
                     success = False
                     out_path = None
-                    message = f"ffmpeg error (rc={result.returncode})"
+                    message = f"ffmpeg error (rc={process.returncode})"
 
             except subprocess.TimeoutExpired:
-                if tmp_path.exists():
-                    tmp_path.unlink()
+                tmp_path.unlink(missing_ok=True)
                 success = False
                 out_path = None
                 message = "Timeout exceeded"
 
             except Exception as e:
-                if tmp_path.exists():
-                    tmp_path.unlink()
+                tmp_path.unlink(missing_ok=True)
                 success = False
                 out_path = None
                 message = f"Error: {e}"
@@ -1227,6 +1810,8 @@ def _run_ffmpeg_with_callback(
     dur_ms: int,
     input_path: Path,
     progress_callback: ProgressCallback,
+    cpu_set: Optional[Sequence[int]] = None,
+    min_interval: float = 0.2,
 ) -> Tuple[bool, Optional[Path], str]:
     """
     Run FFmpeg command while parsing progress and calling callback.
@@ -1239,6 +1824,8 @@ def _run_ffmpeg_with_callback(
         dur_ms: Duration in milliseconds.
         input_path: Input file path.
         progress_callback: Callback function for progress updates.
+        cpu_set: Optional CPUs to pin ffmpeg to.
+        min_interval: Minimum seconds between "encoding" callbacks (cfg.stats_period).
 
     Returns:
         Tuple of (success, output_path, message).
@@ -1246,16 +1833,18 @@ def _run_ffmpeg_with_callback(
     start_time = time.time()
 
     try:
-        # Start process with stderr pipe for progress
-        process = subprocess.Popen(
+        # Only stderr is read; an unread stdout pipe could fill up and block ffmpeg
+        process = spawn_ffmpeg_pinned(
             cmd,
-            stdout=subprocess.PIPE,
+            cpu_set,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=False,
         )
 
         # Read stderr for progress updates
-        last_progress = 0.0
+        last_callback = time.monotonic() - min_interval
+        kv_state: Dict[str, str] = {}
 
         while True:
             if process.stderr is None:
@@ -1264,14 +1853,21 @@ def _run_ffmpeg_with_callback(
             if not line:
                 break
 
-            line_str = line.decode("utf-8", errors="replace")
+            # Every progress line (key=value or stats) contains '='; skip decoding log noise
+            if b"=" not in line:
+                continue
+
+            line_str = line.decode("ascii", errors="replace")
 
             # Parse progress from FFmpeg output
-            progress_data = parse_ffmpeg_progress(line_str, dur_ms)
+            progress_data = parse_ffmpeg_progress_line(line_str, kv_state, dur_ms)
+            if progress_data is None:
+                continue
 
-            # Only call callback if progress changed significantly
-            if progress_data["progress_percent"] > last_progress + 0.5 or progress_data["fps"] > 0:
-                last_progress = progress_data["progress_percent"]
+            # Rate-limit by wall clock; the final "done" callback is always sent below
+            now = time.monotonic()
+            if now - last_callback >= min_interval:
+                last_callback = now
 
                 # Calculate ETA
                 eta = calculate_eta(progress_data["current_time_ms"], dur_ms, progress_data["speed"], start_time)
@@ -1295,8 +1891,7 @@ def _run_ffmpeg_with_callback(
         process.wait()
 
         if process.returncode == 0:
-            # Move temp to final
-            shutil.move(str(tmp_path), str(output_path))
+            os.replace(tmp_path, output_path)
 
             # Signal done
             try:
@@ -1312,8 +1907,7 @@ def _run_ffmpeg_with_callback(
             return True, output_path, f"{stage} complete"
         else:
             # Clean up temp file
-            if tmp_path.exists():
-                tmp_path.unlink()
+            tmp_path.unlink(missing_ok=True)
 
             error_msg = f"ffmpeg error (rc={process.returncode})"
             try:
@@ -1328,8 +1922,7 @@ def _run_ffmpeg_with_callback(
             return False, None, error_msg
 
     except subprocess.TimeoutExpired:
-        if tmp_path.exists():
-            tmp_path.unlink()
+        tmp_path.unlink(missing_ok=True)
         error_msg = "Timeout exceeded"
         try:
             progress_dict = _make_progress_dict(stage="failed", error=error_msg)
@@ -1339,8 +1932,7 @@ def _run_ffmpeg_with_callback(
         return False, None, error_msg
 
     except Exception as e:
-        if tmp_path.exists():
-            tmp_path.unlink()
+        tmp_path.unlink(missing_ok=True)
         error_msg = f"Error: {e}"
         try:
             progress_dict = _make_progress_dict(stage="failed", error=error_msg)
@@ -1356,6 +1948,7 @@ def convert_batch(
     progress_callback: Optional[ProgressCallback] = None,
     output_dir: Optional[Path] = None,
     backend: Optional[str] = None,
+    history_db: Optional["HistoryDB"] = None,
 ) -> Dict[Path, Tuple[bool, Optional[Path], str]]:
     """
     Convert multiple files in parallel using multi-threading.
@@ -1373,6 +1966,8 @@ def convert_batch(
             The callback should be thread-safe if processing multiple files.
         output_dir: Output directory for all files (same as input if not provided).
         backend: Backend to use (auto-detected if not provided).
+        history_db: Optional history used to skip already converted files
+            (see :func:`convert_file`).
 
     Returns:
         Dict mapping input_path -> (success, output_path, message).
@@ -1417,17 +2012,35 @@ def convert_batch(
                 except Exception:
                     pass
 
+    # CPU encodes: give each concurrent ffmpeg its own disjoint set of cores. Only as
+    # many encodes as there are files can overlap; with one, ffmpeg gets every core.
+    concurrent_encodes = min(max_workers, len(input_paths))
+    free_cpu_sets: Queue[List[int]] = Queue()
+    for cpu_set in partition_cpus(concurrent_encodes) if backend == "cpu" else []:
+        free_cpu_sets.put(cpu_set)
+
     def process_file(input_path: Path) -> Tuple[Path, Tuple[bool, Optional[Path], str]]:
         """Process a single file and return the result."""
         out_dir = output_dir if output_dir is not None else input_path.parent
 
-        result = convert_file(
-            input_path,
-            cfg=cfg,
-            backend=backend,
-            output_dir=out_dir,
-            progress_callback=thread_safe_callback if progress_callback else None,
-        )
+        try:
+            cpu_set: Optional[List[int]] = free_cpu_sets.get_nowait()
+        except Empty:
+            cpu_set = None
+
+        try:
+            result = convert_file(
+                input_path,
+                cfg=cfg,
+                backend=backend,
+                output_dir=out_dir,
+                progress_callback=thread_safe_callback if progress_callback else None,
+                cpu_set=cpu_set,
+                history_db=history_db,
+            )
+        finally:
+            if cpu_set is not None:
+                free_cpu_sets.put(cpu_set)
 
         return input_path, result
 
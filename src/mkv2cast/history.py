@@ -5,12 +5,17 @@ Tracks all conversions with timestamps, durations, and results.
 Uses SQLite as primary storage with JSONL fallback if SQLite is unavailable.
 """
 
+import atexit
 import datetime
+import heapq
 import json
+import os
 import threading
 import time
+import weakref
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from queue import Empty, Queue
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 
 # SQLite support (usually available, but check anyway)
 try:
@@ -20,6 +25,31 @@ try:
 except ImportError:
     SQLITE_AVAILABLE = False
 
+# Optional faster JSON encoder for the JSONL fallback
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    _json_dumps_bytes: Callable[[Any], bytes] = orjson.dumps
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+# Maximum number of queued writes committed in one transaction
+_WRITE_BATCH = 64
+
+# Databases with a background writer, flushed at interpreter exit
+_open_dbs: "weakref.WeakSet[HistoryDB]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for db in list(_open_dbs):
+        db.flush()
+
 
 class HistoryDB:
     """History storage with SQLite primary and JSONL text fallback."""
@@ -30,13 +60,132 @@ class HistoryDB:
 
         if self._use_sqlite:
             self._db_path = state_dir / "history.db"
+            self._local = threading.local()
+            self._write_queue: Queue[Tuple[str, Tuple[Any, ...]]] = Queue()
+            self._writer: Optional[threading.Thread] = None
+            self._writer_lock = threading.Lock()
             self._init_sqlite()
         else:
             self._log_path = state_dir / "history.log"
+            self._log_fh: Optional[IO[bytes]] = None
+            self._log_lock = threading.Lock()
+            # In-memory view of the log, kept in sync with appends once loaded
+            self._jsonl_index: Optional[Dict[Any, dict]] = None
+
+    def _conn(self) -> "sqlite3.Connection":
+        """Return this thread's SQLite connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._db_path))
+            # WAL appends instead of rewriting a rollback journal on every commit;
+            # NORMAL only syncs at checkpoints, which is enough for a history log.
+            # auto_vacuum only takes effect on a new file, so it must precede journal_mode
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Flush pending writes and close the calling thread's SQLite connection (reopened on next use)."""
+        if not self._use_sqlite:
+            self._close_jsonl()
+            return
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _enqueue_write(self, sql: str, params: Tuple[Any, ...]) -> None:
+        """Queue a write for the background writer thread, starting it on first use."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="mkv2cast-history", daemon=True)
+                self._writer.start()
+                _open_dbs.add(self)
+        self._write_queue.put((sql, params))
+
+    def _write_loop(self) -> None:
+        """Commit queued writes, batching whatever accumulated into one transaction."""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                conn = self._conn()
+                for sql, params in batch:
+                    conn.execute(sql, params)
+                conn.commit()
+            except Exception:
+                try:
+                    self._conn().rollback()
+                except Exception:
+                    pass
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def flush(self) -> None:
+        """Block until all queued history writes are committed."""
+        if self._use_sqlite and self._writer is not None:
+            self._write_queue.join()
+
+    def _append_jsonl(self, entry: dict) -> None:
+        """Append one entry to the JSONL log through a handle kept open between writes."""
+        data = _json_dumps_bytes(entry) + b"\n"
+        with self._log_lock:
+            if self._log_fh is None:
+                self._log_fh = self._log_path.open("ab")
+            self._log_fh.write(data)
+            # Flush per record so readers and crashes never see a partial history
+            self._log_fh.flush()
+            if self._jsonl_index is not None:
+                self._merge_jsonl_entry(self._jsonl_index, entry)
+
+    def _jsonl_entries(self) -> Dict[Any, dict]:
+        """
+        Return the merged JSONL entries, parsing the log only on first use.
+
+        Start and finish lines share an ``id`` and are merged into one entry.
+        Must be called with ``_log_lock`` held.
+        """
+        if self._jsonl_index is None:
+            merged: Dict[Any, dict] = {}
+            if self._log_path.exists():
+                with self._log_path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            try:
+                                self._merge_jsonl_entry(merged, json.loads(line))
+                            except json.JSONDecodeError:
+                                pass
+            self._jsonl_index = merged
+        return self._jsonl_index
+
+    @staticmethod
+    def _merge_jsonl_entry(merged: Dict[Any, dict], entry: dict) -> None:
+        """Fold one log line into the merged entries (updates extend their start entry)."""
+        eid = entry.get("id")
+        if eid in merged:
+            merged[eid].update(entry)
+        else:
+            merged[eid] = dict(entry)
+
+    def _close_jsonl(self) -> None:
+        """Close the JSONL append handle (reopened on next write)."""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.close()
+                self._log_fh = None
 
     def _init_sqlite(self) -> None:
         """Initialize SQLite database."""
-        conn = sqlite3.connect(str(self._db_path))
+        conn = self._conn()
         conn.execute("""
             CREATE TABLE IF NOT EXISTS conversions (
                 id INTEGER PRIMARY KEY,
@@ -56,15 +205,15 @@ class HistoryDB:
         """)
         conn.execute("CREATE INDEX IF NOT EXISTS idx_started ON conversions(started_at)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON conversions(status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_input ON conversions(input_path)")
         conn.commit()
-        conn.close()
 
     def record_start(self, input_path: Path, backend: str, input_size: int = 0) -> int:
         """Record conversion start, return entry ID."""
         started_at = datetime.datetime.now().isoformat()
 
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
+            conn = self._conn()
             cur = conn.execute(
                 """INSERT INTO conversions (input_path, input_size, started_at, status, backend)
                    VALUES (?, ?, ?, ?, ?)""",
@@ -72,7 +221,6 @@ class HistoryDB:
             )
             entry_id = cur.lastrowid or 0
             conn.commit()
-            conn.close()
             return entry_id
         else:
             # For JSONL, we use timestamp as pseudo-ID
@@ -85,8 +233,7 @@ class HistoryDB:
                 "status": "running",
                 "backend": backend,
             }
-            with self._log_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            self._append_jsonl(entry)
             return entry_id
 
     def record_finish(
@@ -104,8 +251,7 @@ class HistoryDB:
         finished_at = datetime.datetime.now().isoformat()
 
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
-            conn.execute(
+            self._enqueue_write(
                 """UPDATE conversions SET
                    output_path=?, output_size=?, duration_ms=?, finished_at=?,
                    status=?, error_msg=?, encode_time_s=?, integrity_time_s=?
@@ -122,8 +268,6 @@ class HistoryDB:
                     entry_id,
                 ),
             )
-            conn.commit()
-            conn.close()
         else:
             # For JSONL, append a new line with the update
             entry = {
@@ -136,22 +280,18 @@ class HistoryDB:
                 "integrity_time": integrity_time,
                 "error_msg": error_msg,
             }
-            with self._log_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            self._append_jsonl(entry)
 
     def record_skip(self, input_path: Path, reason: str, backend: str) -> None:
         """Record a skipped file."""
         now = datetime.datetime.now().isoformat()
 
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
-            conn.execute(
+            self._enqueue_write(
                 """INSERT INTO conversions (input_path, started_at, finished_at, status, backend, error_msg)
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (str(input_path), now, now, "skipped", backend, reason),
             )
-            conn.commit()
-            conn.close()
         else:
             entry = {
                 "input": str(input_path),
@@ -161,68 +301,100 @@ class HistoryDB:
                 "backend": backend,
                 "reason": reason,
             }
-            with self._log_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            self._append_jsonl(entry)
 
     def get_recent(self, limit: int = 20) -> List[dict]:
         """Get recent conversions."""
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
-            conn.row_factory = sqlite3.Row
-            cur = conn.execute("""SELECT * FROM conversions ORDER BY started_at DESC LIMIT ?""", (limit,))
+            self.flush()
+            conn = self._conn()
+            cur = conn.cursor()
+            cur.row_factory = sqlite3.Row
+            cur.execute("""SELECT * FROM conversions ORDER BY started_at DESC LIMIT ?""", (limit,))
             rows = [dict(row) for row in cur.fetchall()]
-            conn.close()
             return rows
         else:
-            # Read JSONL and get last N entries
-            if not self._log_path.exists():
-                return []
-            entries = []
-            with self._log_path.open("r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            entries.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            pass
-            # Merge updates with starts (by id)
-            merged: Dict[int, dict] = {}
-            for e in entries:
-                eid = e.get("id")
-                if eid in merged:
-                    merged[eid].update(e)
-                else:
-                    merged[eid] = e
-            # Sort by started time descending
-            result = sorted(merged.values(), key=lambda x: x.get("started", ""), reverse=True)
-            return result[:limit]
+            with self._log_lock:
+                entries = list(self._jsonl_entries().values())
+            # Most recently started first
+            result = heapq.nlargest(limit, entries, key=lambda x: x.get("started", ""))
+            return [dict(e) for e in result]
+
+    def find_converted(self, input_path: Path) -> Optional[Path]:
+        """
+        Return the output of the latest successful conversion of an unchanged input.
+
+        The input must still have the recorded size and the output must still
+        exist and be newer than the input; otherwise None is returned.
+        """
+        try:
+            in_st = input_path.stat()
+        except OSError:
+            return None
+
+        output: Optional[str] = None
+        if self._use_sqlite:
+            self.flush()
+            cur = self._conn().execute(
+                """SELECT output_path FROM conversions
+                   WHERE input_path=? AND status='done' AND input_size=? AND output_path IS NOT NULL
+                   ORDER BY started_at DESC LIMIT 1""",
+                (str(input_path), in_st.st_size),
+            )
+            row = cur.fetchone()
+            output = row[0] if row else None
+        else:
+            key = str(input_path)
+            with self._log_lock:
+                matches = [
+                    e
+                    for e in self._jsonl_entries().values()
+                    if e.get("input") == key
+                    and e.get("status") == "done"
+                    and e.get("input_size") == in_st.st_size
+                    and e.get("output")
+                ]
+            if matches:
+                output = max(matches, key=lambda x: x.get("started", "")).get("output")
+
+        if not output:
+            return None
+        out_path = Path(output)
+        try:
+            if out_path.stat().st_mtime < in_st.st_mtime:
+                return None
+        except OSError:
+            return None
+        return out_path
 
     def get_stats(self) -> dict:
         """Get conversion statistics."""
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
+            self.flush()
+            conn = self._conn()
             stats: dict = {}
 
-            # Total counts by status
-            cur = conn.execute("SELECT status, COUNT(*) FROM conversions GROUP BY status")
-            stats["by_status"] = {row[0]: row[1] for row in cur.fetchall()}
-
-            # Average encode time for successful conversions
+            # One scan: counts per status, with encode time and sizes summed for "done" rows
             cur = conn.execute(
-                'SELECT AVG(encode_time_s), SUM(encode_time_s) FROM conversions WHERE status="done" AND encode_time_s > 0'
+                """SELECT status, COUNT(*),
+                          SUM(CASE WHEN encode_time_s > 0 THEN encode_time_s END),
+                          COUNT(CASE WHEN encode_time_s > 0 THEN 1 END),
+                          SUM(input_size), SUM(output_size)
+                   FROM conversions GROUP BY status"""
             )
-            row = cur.fetchone()
-            stats["avg_encode_time"] = row[0] or 0
-            stats["total_encode_time"] = row[1] or 0
+            stats["by_status"] = {}
+            stats["avg_encode_time"] = 0
+            stats["total_encode_time"] = 0
+            stats["total_input_size"] = 0
+            stats["total_output_size"] = 0
+            for status, count, enc_sum, enc_count, in_sum, out_sum in cur.fetchall():
+                stats["by_status"][status] = count
+                if status == "done":
+                    stats["avg_encode_time"] = (enc_sum / enc_count) if enc_count else 0
+                    stats["total_encode_time"] = enc_sum or 0
+                    stats["total_input_size"] = in_sum or 0
+                    stats["total_output_size"] = out_sum or 0
 
-            # Total size processed
-            cur = conn.execute('SELECT SUM(input_size), SUM(output_size) FROM conversions WHERE status="done"')
-            row = cur.fetchone()
-            stats["total_input_size"] = row[0] or 0
-            stats["total_output_size"] = row[1] or 0
-
-            conn.close()
             return stats
 
         # Basic stats from JSONL (non-SQLite path)
@@ -250,33 +422,43 @@ class HistoryDB:
         cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
 
         if self._use_sqlite:
-            conn = sqlite3.connect(str(self._db_path))
+            self.flush()
+            conn = self._conn()
             cur = conn.execute("DELETE FROM conversions WHERE started_at < ?", (cutoff,))
             count = cur.rowcount
             conn.commit()
-            conn.close()
+            if count > 0:
+                # Return freed pages to the filesystem (no-op unless auto_vacuum is enabled)
+                conn.execute("PRAGMA incremental_vacuum")
             return count
         else:
-            # For JSONL, rewrite file without old entries
-            if not self._log_path.exists():
-                return 0
-            entries = []
-            removed = 0
-            with self._log_path.open("r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            e = json.loads(line)
-                            if e.get("started", "") >= cutoff:
-                                entries.append(line)
-                            else:
-                                removed += 1
-                        except json.JSONDecodeError:
-                            pass
-            with self._log_path.open("w", encoding="utf-8") as f:
-                for line in entries:
-                    f.write(line + "\n")
+            # For JSONL, rewrite file without old entries. The lock keeps appends
+            # from landing in the old file while it is being replaced.
+            with self._log_lock:
+                if not self._log_path.exists():
+                    return 0
+                if self._log_fh is not None:
+                    self._log_fh.close()
+                    self._log_fh = None
+                kept = []
+                removed = 0
+                with self._log_path.open("rb") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            try:
+                                e = json.loads(line)
+                                if e.get("started", "") >= cutoff:
+                                    kept.append(line + b"\n")
+                                else:
+                                    removed += 1
+                            except json.JSONDecodeError:
+                                pass
+                tmp_path = self._log_path.with_name(self._log_path.name + ".tmp")
+                with tmp_path.open("wb", buffering=1 << 20) as f:
+                    f.writelines(kept)
+                os.replace(tmp_path, self._log_path)
+                self._jsonl_index = None
             return removed
 
 
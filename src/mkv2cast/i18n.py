@@ -8,15 +8,23 @@ Supports: English (en), French (fr), Spanish (es), Italian (it), German (de)
 import gettext
 import locale
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 
-# Global translation function
+# Global translation function and the language it was set up for
 _current_translation: Optional[Callable[[str], str]] = None
+_current_language: Optional[str] = None
+# Catalog strings translated once per setup_i18n call; _() checks here first
+_PRETRANSLATED: Dict[str, str] = {}
 
 # Supported languages
 SUPPORTED_LANGUAGES = ["en", "fr", "es", "it", "de"]
 DEFAULT_LANGUAGE = "en"
+_SUPPORTED_SET = frozenset(SUPPORTED_LANGUAGES)
+
+# Environment variables checked for the language, in order of priority
+_LANG_ENV_VARS = ("MKV2CAST_LANG", "LANGUAGE", "LC_ALL", "LC_MESSAGES", "LANG")
 
 
 def get_locales_dir() -> Path:
@@ -29,22 +37,28 @@ def detect_system_language() -> str:
     Detect the system language from environment.
     Returns language code (e.g., 'fr', 'en', 'es').
     """
-    # Check environment variables in order of priority
-    for env_var in ["MKV2CAST_LANG", "LANGUAGE", "LC_ALL", "LC_MESSAGES", "LANG"]:
-        lang = os.environ.get(env_var, "")
+    environ = os.environ
+    for env_var in _LANG_ENV_VARS:
+        lang = environ.get(env_var)
         if lang:
             # Extract language code (e.g., 'fr_FR.UTF-8' -> 'fr')
-            lang_code = lang.split("_")[0].split(".")[0].lower()
-            if lang_code in SUPPORTED_LANGUAGES:
+            lang_code = lang.partition("_")[0].partition(".")[0].lower()
+            if lang_code in _SUPPORTED_SET:
                 return lang_code
 
+    return _locale_language()
+
+
+@lru_cache(maxsize=None)
+def _locale_language() -> str:
+    """Language from the process locale (queried once; environment overrides are checked by the caller)."""
     # Try locale module (use newer API to avoid deprecation warning)
     try:
         # Try getlocale first (Python 3.11+)
         loc = locale.getlocale()[0]
         if loc:
             lang_code = loc.split("_")[0].lower()
-            if lang_code in SUPPORTED_LANGUAGES:
+            if lang_code in _SUPPORTED_SET:
                 return lang_code
     except Exception:
         pass
@@ -52,6 +66,14 @@ def detect_system_language() -> str:
     return DEFAULT_LANGUAGE
 
 
+@lru_cache(maxsize=None)
+def _load_translation(lang: str) -> gettext.NullTranslations:
+    """Load the catalog for a language once per process."""
+    return gettext.translation(
+        "mkv2cast", localedir=get_locales_dir(), languages=[lang, DEFAULT_LANGUAGE], fallback=True
+    )
+
+
 def setup_i18n(lang: Optional[str] = None) -> Callable[[str], str]:
     """
     Configure internationalization and return the translation function.
@@ -62,7 +84,7 @@ def setup_i18n(lang: Optional[str] = None) -> Callable[[str], str]:
     Returns:
         Translation function that takes a string and returns translated string.
     """
-    global _current_translation
+    global _current_translation, _current_language, _PRETRANSLATED
 
     if lang is None:
         lang = detect_system_language()
@@ -70,22 +92,24 @@ def setup_i18n(lang: Optional[str] = None) -> Callable[[str], str]:
     # Normalize language code
     lang = lang.lower().split("_")[0].split(".")[0]
 
-    if lang not in SUPPORTED_LANGUAGES:
+    if lang not in _SUPPORTED_SET:
         lang = DEFAULT_LANGUAGE
 
-    locales_dir = get_locales_dir()
+    _current_language = lang
 
     try:
-        translation = gettext.translation(
-            "mkv2cast", localedir=locales_dir, languages=[lang, DEFAULT_LANGUAGE], fallback=True
-        )
-        _current_translation = translation.gettext
+        translation = _load_translation(lang)
+        # Messages are a small fixed set looked up repeatedly (UI refresh, summaries);
+        # a fresh cache per setup_i18n call also drops entries of the previous language
+        _current_translation = lru_cache(maxsize=2048)(translation.gettext)
+        _PRETRANSLATED = {msg: translation.gettext(msg) for msg in TRANSLATION_CATALOG}
     except Exception:
         # Fallback to identity function
         def identity_fn(x: str) -> str:
             return x
 
         _current_translation = identity_fn
+        _PRETRANSLATED = {}
 
     return _current_translation if _current_translation else (lambda x: x)
 
@@ -104,7 +128,9 @@ def _(message: str) -> str:
     Returns:
         Translated message, or original if no translation found.
     """
-    global _current_translation
+    translated = _PRETRANSLATED.get(message)
+    if translated is not None:
+        return translated
 
     if _current_translation is None:
         setup_i18n()
@@ -113,8 +139,19 @@ def _(message: str) -> str:
 
 
 def get_current_language() -> str:
-    """Get the currently configured language code."""
-    return detect_system_language()
+    """Get the currently configured language code (detected if setup_i18n has not run)."""
+    return _current_language or detect_system_language()
+
+
+def reset_i18n() -> None:
+    """Forget the configured language and cached catalogs/locale (mainly for tests)."""
+    global _current_translation, _current_language, _PRETRANSLATED
+
+    _current_translation = None
+    _current_language = None
+    _PRETRANSLATED = {}
+    _load_translation.cache_clear()
+    _locale_language.cache_clear()
 
 
 def ngettext(singular: str, plural: str, n: int) -> str:
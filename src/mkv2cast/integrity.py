@@ -8,36 +8,96 @@ Includes:
 - Optional deep decode verification
 """
 
+import atexit
+import importlib.util
+import os
+import select
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from mkv2cast.converter import ffprobe_json, find_executable
+
+# PyAV is optional; only probe for it here, it is imported by the worker child process
+AV_AVAILABLE = importlib.util.find_spec("av") is not None
+
+
+def file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    """Get (size, mtime_ns) with a single stat call, or None on error."""
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st.st_size, st.st_mtime_ns
 
 
 def file_size(path: Path) -> int:
     """Get file size in bytes, returns 0 on error."""
-    try:
-        return path.stat().st_size
-    except Exception:
-        return 0
+    st = file_stat(path)
+    return st[0] if st else 0
 
 
 def run_quiet(cmd: list, timeout: float = 10.0) -> bool:
     """Run a command quietly, return True if successful."""
     try:
-        p = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+        p = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout, close_fds=False)
         return p.returncode == 0
     except Exception:
         return False
 
 
+def wait_until_stable(
+    path: Path,
+    wait_seconds: float,
+    stop_event: Optional[threading.Event] = None,
+    initial: Optional[Tuple[int, int]] = None,
+) -> bool:
+    """
+    Wait until a file has gone ``wait_seconds`` without being modified.
+
+    The file's mtime tells how long it has already been quiet, so files at
+    rest pass immediately; otherwise only the remainder of the window is
+    slept, once, before comparing size and mtime again.
+
+    Args:
+        path: Path to the file.
+        wait_seconds: Required quiet period in seconds.
+        stop_event: Optional event that aborts the wait when set.
+        initial: (size, mtime_ns) already fetched by the caller, to save a stat.
+
+    Returns:
+        True if the file is stable, False if it changed, vanished or the wait was aborted.
+    """
+    before = initial if initial is not None else file_stat(path)
+    if before is None:
+        return False
+
+    quiet = (time.time_ns() - before[1]) / 1e9
+    remaining = min(wait_seconds, wait_seconds - quiet)
+    if remaining <= 0:
+        return True
+
+    if stop_event is not None:
+        if stop_event.wait(remaining):
+            return False
+    else:
+        time.sleep(remaining)
+
+    return file_stat(path) == before
+
+
 def check_file_stable(path: Path, wait_seconds: int = 3) -> bool:
     """
     Check if file size is stable (not being written to).
 
     Args:
         path: Path to the file.
-        wait_seconds: Number of seconds to wait between checks.
+        wait_seconds: Required quiet period in seconds.
 
     Returns:
         True if file size is stable, False otherwise.
@@ -45,20 +105,165 @@ def check_file_stable(path: Path, wait_seconds: int = 3) -> bool:
     if wait_seconds <= 0:
         return True
 
-    s1 = file_size(path)
-    if s1 < 1024 * 1024:  # Less than 1MB is suspicious
+    st = file_stat(path)
+    if st is None or st[0] < 1024 * 1024:  # Less than 1MB is suspicious
         return False
 
-    time.sleep(wait_seconds)
+    return wait_until_stable(path, wait_seconds, initial=st)
+
+
+_PROBE_WORKER_SCRIPT = """
+import sys
+import av
+for line in sys.stdin:
+    try:
+        av.open(line[:-1]).close()
+        ok = "1"
+    except Exception:
+        ok = "0"
+    sys.stdout.write(ok + "\\n")
+    sys.stdout.flush()
+"""
+
+
+class FFProbeWorker:
+    """
+    Long-lived child process that validates files with PyAV.
+
+    Paths are written one per line to the child's stdin and it answers
+    "1" or "0" per path, so a batch pays for one interpreter start instead
+    of one ffprobe spawn per file. The child runs out of process so a
+    crash in the demuxer cannot take mkv2cast down; it is restarted on the
+    next request.
+    """
+
+    def __init__(self, cmd: Optional[List[str]] = None):
+        self.cmd = cmd or [sys.executable, "-c", _PROBE_WORKER_SCRIPT]
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                errors="surrogateescape",
+                bufsize=1,
+                env={**os.environ, "PYTHONIOENCODING": "utf-8:surrogateescape"},
+            )
+        return self._proc
+
+    def submit(self, path: Path, timeout: float = 8.0) -> Optional[bool]:
+        """
+        Validate one file.
+
+        Returns:
+            True/False for the file, or None if the worker could not answer
+            (caller should fall back to ffprobe).
+        """
+        name = os.fspath(path)
+        if "\n" in name:
+            return None
+
+        with self._lock:
+            try:
+                proc = self._ensure_started()
+                if proc.stdin is None or proc.stdout is None:
+                    return None
+                proc.stdin.write(name + "\n")
+                proc.stdin.flush()
+                if os.name == "posix":
+                    ready, _w, _x = select.select([proc.stdout], [], [], timeout)
+                    if not ready:
+                        # Hung on this file: same verdict as an ffprobe timeout
+                        self._kill()
+                        return False
+                answer = proc.stdout.readline()
+            except (OSError, ValueError):
+                self._kill()
+                return None
+
+        if not answer:
+            self._kill()
+            return None
+        return answer.strip() == "1"
+
+    def _kill(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+    def close(self) -> None:
+        """Stop the child process."""
+        with self._lock:
+            if self._proc is not None:
+                try:
+                    if self._proc.stdin:
+                        self._proc.stdin.close()
+                    self._proc.wait(timeout=2)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._proc.kill()
+                    self._proc.wait()
+                self._proc = None
+
+
+# One worker per thread so concurrent integrity checks do not serialize on a pipe.
+# Each worker belongs to the thread that started it and is closed once that thread exits.
+_probe_workers = threading.local()
+_probe_worker_owners: List[Tuple[threading.Thread, FFProbeWorker]] = []
+_probe_workers_lock = threading.Lock()
+
+
+def _get_probe_worker() -> Optional[FFProbeWorker]:
+    if not AV_AVAILABLE:
+        return None
+    worker = getattr(_probe_workers, "worker", None)
+    if worker is None:
+        release_probe_workers()
+        worker = FFProbeWorker()
+        _probe_workers.worker = worker
+        with _probe_workers_lock:
+            _probe_worker_owners.append((threading.current_thread(), worker))
+    return worker
+
+
+def release_probe_workers() -> None:
+    """
+    Close the PyAV probe workers of threads that have exited.
+
+    Call this once the threads that ran :func:`check_ffprobe_valid` are joined
+    (e.g. after a thread pool shuts down) so their workers do not outlive them.
+    """
+    with _probe_workers_lock:
+        finished = [w for t, w in _probe_worker_owners if not t.is_alive()]
+        _probe_worker_owners[:] = [(t, w) for t, w in _probe_worker_owners if t.is_alive()]
+    for worker in finished:
+        worker.close()
+
 
-    s2 = file_size(path)
-    return s1 == s2
+@atexit.register
+def _close_probe_workers() -> None:
+    with _probe_workers_lock:
+        workers = [w for _t, w in _probe_worker_owners]
+        _probe_worker_owners.clear()
+    for worker in workers:
+        worker.close()
 
 
 def check_ffprobe_valid(path: Path, timeout: float = 8.0) -> bool:
     """
     Check if file is valid using ffprobe.
 
+    When PyAV is installed the check goes through a per-thread
+    :class:`FFProbeWorker` instead of spawning ffprobe for every file.
+    Otherwise the full stream probe is run and cached, so the
+    :func:`~mkv2cast.converter.decide_for` that follows reuses it.
+
     Args:
         path: Path to the file.
         timeout: Timeout in seconds.
@@ -66,10 +271,17 @@ def check_ffprobe_valid(path: Path, timeout: float = 8.0) -> bool:
     Returns:
         True if ffprobe reports valid duration.
     """
-    return run_quiet(
-        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", str(path)],
-        timeout=timeout,
-    )
+    worker = _get_probe_worker()
+    if worker is not None:
+        result = worker.submit(path, timeout)
+        if result is not None:
+            return result
+
+    try:
+        ffprobe_json(path, timeout=timeout)
+    except Exception:
+        return False
+    return True
 
 
 def check_deep_decode(
@@ -96,10 +308,27 @@ def check_deep_decode(
         with log_path.open("a", encoding="utf-8", errors="replace") as lf:
             lf.write("DEEP_CHECK: decode video stream\n")
 
-    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(path), "-map", "0:v:0", "-f", "null", "-"]
+    cmd = [
+        find_executable("ffmpeg"),
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        str(path),
+        "-map",
+        "0:v:0",
+        "-f",
+        "null",
+        "-",
+    ]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, timeout=3600)  # 1 hour timeout
+        # Only the exit status matters; 1 hour timeout
+        result = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=3600, close_fds=False
+        )
         return result.returncode == 0
     except subprocess.TimeoutExpired:
         return False
@@ -107,6 +336,68 @@ def check_deep_decode(
         return False
 
 
+def _concat_entry(path: Path) -> str:
+    """Format a path as a concat demuxer ``file`` directive."""
+    escaped = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def check_deep_decode_batch(paths: List[Path], log_path: Optional[Path] = None) -> Dict[Path, bool]:
+    """
+    Deep-decode several files with a single ffmpeg process.
+
+    The files are chained through the concat demuxer, saving one process
+    start and decoder init per file. ``-xerror`` makes any decode error
+    fail the run; the files are then re-checked one by one with
+    :func:`check_deep_decode` to find the bad ones (this also covers
+    batches whose streams cannot be concatenated).
+
+    Args:
+        paths: Paths to the files.
+        log_path: Optional path to write logs.
+
+    Returns:
+        Dict mapping each path to True if it decodes cleanly.
+    """
+    if len(paths) < 2:
+        return {p: check_deep_decode(p, log_path) for p in paths}
+
+    fd, list_name = tempfile.mkstemp(prefix="mkv2cast-concat-", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(_concat_entry(p) for p in paths)
+
+        cmd = [
+            find_executable("ffmpeg"),
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-xerror",
+            "-threads",
+            "0",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_name,
+            "-map",
+            "0:v:0",
+            "-f",
+            "null",
+            "-",
+        ]
+        if run_quiet(cmd, timeout=3600.0 * len(paths)):
+            return dict.fromkeys(paths, True)
+    finally:
+        try:
+            os.unlink(list_name)
+        except OSError:
+            pass
+
+    return {p: check_deep_decode(p, log_path) for p in paths}
+
+
 def integrity_check(
     path: Path,
     enabled: bool = True,
@@ -138,22 +429,21 @@ def integrity_check(
     if progress_callback:
         progress_callback("CHECK", 0, "Checking file...")
 
-    size = file_size(path)
-    if size < 1024 * 1024:  # Less than 1MB
+    st = file_stat(path)
+    if st is None or st[0] < 1024 * 1024:  # Less than 1MB
         return False, time.time() - start_time
 
     # Stage 2: File stability check
     if stable_wait > 0:
-        for i in range(stable_wait):
-            if progress_callback:
-                pct = int(((i + 1) * 50) / stable_wait)
-                progress_callback("STABLE", pct, f"Waiting {stable_wait - i - 1}s...")
-            time.sleep(1)
-
-        new_size = file_size(path)
-        if size != new_size:
+        if progress_callback:
+            progress_callback("STABLE", 25, f"Waiting up to {stable_wait}s...")
+
+        if not wait_until_stable(path, stable_wait, initial=st):
             return False, time.time() - start_time
 
+        if progress_callback:
+            progress_callback("STABLE", 50, "Stable")
+
     # Stage 3: ffprobe validation
     if progress_callback:
         progress_callback("FFPROBE", 60, "Validating with ffprobe...")
@@ -174,3 +464,50 @@ def integrity_check(
 
     elapsed = time.time() - start_time
     return True, elapsed
+
+
+def integrity_check_batch(paths: List[Path], workers: int = 0, **kwargs: Any) -> Iterator[Tuple[Path, bool, float]]:
+    """
+    Run :func:`integrity_check` on several files concurrently.
+
+    Each check mostly waits on the stability window or an ffprobe/ffmpeg
+    subprocess, so they are overlapped in a thread pool. With
+    ``deep_check=True``, files that pass the quick checks are deep-decoded
+    together afterwards via :func:`check_deep_decode_batch`.
+
+    Args:
+        paths: Paths to the files to check.
+        workers: Number of concurrent checks (default: CPU count, max 32).
+        **kwargs: Passed through to :func:`integrity_check`.
+
+    Yields:
+        Tuples of (path, success, elapsed_seconds) in completion order.
+    """
+    if not paths:
+        return
+
+    if workers <= 0:
+        workers = min(32, os.cpu_count() or 4)
+
+    deep_check = kwargs.pop("deep_check", False) and kwargs.get("enabled", True)
+    passed: List[Tuple[Path, float]] = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            futures = {executor.submit(integrity_check, p, **kwargs): p for p in paths}
+            for future in as_completed(futures):
+                success, elapsed = future.result()
+                if deep_check and success:
+                    passed.append((futures[future], elapsed))
+                else:
+                    yield futures[future], success, elapsed
+    finally:
+        # The pool's threads are joined; close the probe workers they started
+        release_probe_workers()
+
+    if passed:
+        start = time.time()
+        results = check_deep_decode_batch([p for p, _t in passed], kwargs.get("log_path"))
+        decode_time = time.time() - start
+        for p, elapsed in passed:
+            yield p, results[p], elapsed + decode_time
@@ -5,12 +5,31 @@ This module provides structured JSON output for integration
 with other applications (web UIs, monitoring tools, etc.).
 """
 
+import atexit
 import json
+import os
+import re
 import sys
+import threading
 import time
-from dataclasses import asdict, dataclass, field
+import weakref
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+# Optional faster JSON encoder (pip install mkv2cast[fast])
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _dumps: Callable[[Any], str] = json.dumps  # type: ignore[no-redef]
 
 
 @dataclass
@@ -59,30 +78,156 @@ class JSONProgressState:
     """Complete state for JSON progress output."""
 
     version: str = "1.0"
-    timestamp: float = field(default_factory=time.time)
+    timestamp: float = 0.0  # set by each emit
     event: str = "progress"  # "start", "progress", "file_start", "file_done", "complete"
     overall: OverallProgress = field(default_factory=OverallProgress)
     files: Dict[str, FileProgress] = field(default_factory=dict)
-    current_encoding: List[str] = field(default_factory=list)
-    current_checking: List[str] = field(default_factory=list)
+    # Insertion-ordered sets of file names (dict keys) for O(1) add/remove; emitted as lists
+    current_encoding: Dict[str, None] = field(default_factory=dict)
+    current_checking: Dict[str, None] = field(default_factory=dict)
+
+
+# Max queued lines written (and flushed) together by the background writer
+_WRITE_BATCH = 64
+
+# Threaded outputs with a running writer, flushed at interpreter exit
+_open_outputs: "weakref.WeakSet[JSONProgressOutput]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for out in list(_open_outputs):
+        out.flush()
+
+
+def _file_key(filepath: Union[Path, str]) -> str:
+    """Key of a file in ``JSONProgressState.files`` (its path as a string)."""
+    return filepath if isinstance(filepath, str) else str(filepath)
 
 
 class JSONProgressOutput:
-    """Manages JSON progress output to stdout."""
+    """Manages JSON progress output to stdout.
+
+    With ``delta=True``, "progress" and "file_done" events carry only the
+    affected file under ``files_delta`` instead of the full ``files`` map;
+    consumers rebuild the state from the "start" snapshot.
 
-    def __init__(self, stream=sys.stdout):
+    With ``threaded=True``, serialized lines are handed to a background
+    writer thread that writes and flushes them in batches, keeping stream
+    I/O off the caller's thread; :meth:`flush` waits for it to catch up.
+    """
+
+    def __init__(
+        self,
+        stream=sys.stdout,
+        min_emit_interval: float = 0.1,
+        delta: bool = False,
+        threaded: bool = False,
+    ):
         self.stream = stream
+        self.delta = delta
+        self._write_queue: Optional[Queue[str]] = Queue(maxsize=1024) if threaded else None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         self.state = JSONProgressState()
         self._file_durations: Dict[str, int] = {}
+        # "progress" events are coalesced to at most one per interval; milestones always go out
+        self._min_emit_interval = min_emit_interval
+        self._last_progress_emit = float("-inf")
+        # Files whose progress changed since the last "progress" event (insertion-ordered set);
+        # the next event carries all of them, so one file's ticks never hide another's
+        self._dirty_progress: Dict[str, None] = {}
+        # Keys of files currently in "encoding" status, kept in sync with state.files
+        self._encoding_keys: Set[str] = set()
+
+    def _state_dict(self) -> Dict[str, Any]:
+        """
+        Build the serializable state without dataclasses.asdict().
+
+        asdict() deep-copies every FileProgress on each emit; the dict is
+        serialized immediately, so shallow views of the field dicts suffice.
+        """
+        state = self.state
+        return {
+            "version": state.version,
+            "timestamp": state.timestamp,
+            "event": state.event,
+            "overall": dict(vars(state.overall)),
+            "files": {key: vars(fp) for key, fp in state.files.items()},
+            "current_encoding": list(state.current_encoding),
+            "current_checking": list(state.current_checking),
+        }
 
     def _emit(self, event: str, extra: Optional[Dict[str, Any]] = None) -> None:
         """Emit a JSON progress event."""
         self.state.timestamp = time.time()
         self.state.event = event
-        output = asdict(self.state)
+        output = self._state_dict()
         if extra:
             output.update(extra)
-        print(json.dumps(output), file=self.stream, flush=True)
+        self._write(_dumps(output) + "\n")
+
+    def _write(self, line: str) -> None:
+        """Write one serialized event, directly or through the background writer."""
+        if self._write_queue is None:
+            self.stream.write(line)
+            self.stream.flush()
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="mkv2cast-json", daemon=True)
+                self._writer.start()
+                _open_outputs.add(self)
+        # Blocks when the consumer falls far behind rather than dropping events
+        self._write_queue.put(line)
+
+    def _write_loop(self) -> None:
+        """Write queued lines, joining whatever accumulated into one write and flush."""
+        queue = self._write_queue
+        if queue is None:
+            return
+        while True:
+            batch = [queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                self.stream.write("".join(batch))
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def flush(self) -> None:
+        """Block until all queued events are written."""
+        if self._write_queue is not None and self._writer is not None:
+            self._write_queue.join()
+
+    def _emit_delta(self, event: str, changed_keys: Iterable[str], extra: Optional[Dict[str, Any]] = None) -> None:
+        """Emit an event carrying only the given files, or the full state when delta mode is off."""
+        if not self.delta:
+            self._emit(event, extra)
+            return
+        state = self.state
+        state.timestamp = time.time()
+        state.event = event
+        files = state.files
+        output = {
+            "version": state.version,
+            "timestamp": state.timestamp,
+            "event": event,
+            "overall": dict(vars(state.overall)),
+            "files_delta": {key: vars(files[key]) for key in changed_keys if key in files},
+            "current_encoding": list(state.current_encoding),
+            "current_checking": list(state.current_checking),
+        }
+        if extra:
+            output.update(extra)
+        self._write(_dumps(output) + "\n")
 
     def start(
         self,
@@ -114,21 +259,24 @@ class JSONProgressOutput:
             status="queued",
             duration_ms=duration_ms or self._file_durations.get(key, 0),
         )
+        self._encoding_keys.discard(key)
         self._file_durations[key] = duration_ms
 
-    def file_checking(self, filepath: Path) -> None:
+    def file_checking(self, filepath: Union[Path, str]) -> None:
         """Signal a file integrity check has started."""
-        key = str(filepath)
+        key = _file_key(filepath)
+        name = os.path.basename(key)
         if key in self.state.files:
             self.state.files[key].status = "checking"
             self.state.files[key].started_at = time.time()
-        self.state.current_checking.append(filepath.name)
-        self._emit("file_checking", {"file": filepath.name})
+            self._encoding_keys.discard(key)
+        self.state.current_checking[name] = None
+        self._emit("file_checking", {"file": name})
 
-    def file_check_done(self, filepath: Path) -> None:
+    def file_check_done(self, filepath: Union[Path, str]) -> None:
         """Signal a file integrity check has finished."""
-        if filepath.name in self.state.current_checking:
-            self.state.current_checking.remove(filepath.name)
+        name = os.path.basename(_file_key(filepath))
+        self.state.current_checking.pop(name, None)
 
     def file_encoding_start(self, filepath: Path, duration_ms: int = 0) -> None:
         """Signal encoding has started for a file."""
@@ -146,13 +294,14 @@ class JSONProgressOutput:
                 duration_ms=duration_ms or self._file_durations.get(key, 0),
                 started_at=time.time(),
             )
-        self.state.current_encoding.append(filepath.name)
+        self._encoding_keys.add(key)
+        self.state.current_encoding[filepath.name] = None
         self.state.overall.current_file = filepath.name
         self._emit("file_start", {"file": filepath.name})
 
     def file_progress(
         self,
-        filepath: Path,
+        filepath: Union[Path, str],
         frame: int = 0,
         fps: float = 0.0,
         time_ms: int = 0,
@@ -160,8 +309,12 @@ class JSONProgressOutput:
         speed: str = "",
         size_bytes: int = 0,
     ) -> None:
-        """Update encoding progress for a file."""
-        key = str(filepath)
+        """Update encoding progress for a file.
+
+        ``filepath`` may be the ``str(path)`` key itself, which callers
+        reporting many ticks for one file can compute once.
+        """
+        key = _file_key(filepath)
         if key not in self.state.files:
             return
 
@@ -185,18 +338,28 @@ class JSONProgressOutput:
                     rate = elapsed / time_ms
                     fp.eta_seconds = (remaining_ms * rate) / 1000
 
+        self._dirty_progress[key] = None
+        now = time.monotonic()
+        if now - self._last_progress_emit < self._min_emit_interval and fp.progress_percent < 100.0:
+            return
+        self._last_progress_emit = now
+
+        changed, self._dirty_progress = self._dirty_progress, {}
         self._update_overall()
-        self._emit("progress")
+        self._emit_delta("progress", changed)
 
     def file_done(
         self,
-        filepath: Path,
+        filepath: Union[Path, str],
         output_path: Optional[Path] = None,
         skipped: bool = False,
         error: Optional[str] = None,
     ) -> None:
         """Signal a file has finished processing."""
-        key = str(filepath)
+        key = _file_key(filepath)
+        name = os.path.basename(key)
+        self._encoding_keys.discard(key)
+        self._dirty_progress.pop(key, None)  # this event carries the file's final state
         if key in self.state.files:
             fp = self.state.files[key]
             fp.finished_at = time.time()
@@ -214,17 +377,19 @@ class JSONProgressOutput:
             if output_path:
                 fp.output_path = str(output_path)
 
-        if filepath.name in self.state.current_encoding:
-            self.state.current_encoding.remove(filepath.name)
+        self.state.current_encoding.pop(name, None)
 
         self.state.overall.processed_files += 1
         self._update_overall()
-        self._emit("file_done", {"file": filepath.name, "status": fp.status if key in self.state.files else "unknown"})
+        self._emit_delta(
+            "file_done", (key,), {"file": name, "status": fp.status if key in self.state.files else "unknown"}
+        )
 
     def complete(self) -> None:
         """Signal all processing is complete."""
         self.state.overall.overall_percent = 100.0
         self._emit("complete")
+        self.flush()
 
     def _update_overall(self) -> None:
         """Update overall progress statistics."""
@@ -232,9 +397,8 @@ class JSONProgressOutput:
         if total > 0:
             # Weight: completed files + partial progress of encoding files
             completed_weight = self.state.overall.processed_files
-            encoding_weight = sum(
-                fp.progress_percent / 100.0 for fp in self.state.files.values() if fp.status == "encoding"
-            )
+            files = self.state.files
+            encoding_weight = sum(files[k].progress_percent / 100.0 for k in self._encoding_keys)
             self.state.overall.overall_percent = ((completed_weight + encoding_weight) / total) * 100
 
             # Estimate overall ETA based on average processing time
@@ -245,67 +409,59 @@ class JSONProgressOutput:
                 self.state.overall.eta_seconds = avg_time * remaining
 
 
-def parse_ffmpeg_progress_for_json(line: str) -> Dict[str, Any]:
-    """Parse FFmpeg progress line for JSON output.
+# key=value fields of an ffmpeg stats line; values may be padded (e.g. "frame=  120")
+_RE_STATS_FIELD = re.compile(r"(frame|fps|time|bitrate|speed|size)=\s*([^\s=]+)(?=\s|$)")
 
-    Returns a dict with parsed values.
-    """
-    result: Dict[str, Any] = {}
 
-    # frame=12345
-    if "frame=" in line:
-        try:
-            frame_part = line.split("frame=")[1].split()[0]
-            result["frame"] = int(frame_part)
-        except (IndexError, ValueError):
-            pass
+def _stats_time_ms(value: str) -> Optional[int]:
+    if value == "N/A":
+        return None
+    parts = value.split(":")
+    if len(parts) != 3:
+        return None
+    h, m, s = parts
+    return int((int(h) * 3600 + int(m) * 60 + float(s)) * 1000)
 
-    # fps=123.45
-    if "fps=" in line:
-        try:
-            fps_part = line.split("fps=")[1].split()[0]
-            result["fps"] = float(fps_part)
-        except (IndexError, ValueError):
-            pass
 
-    # time=00:01:23.45
-    if "time=" in line:
-        try:
-            time_part = line.split("time=")[1].split()[0]
-            if time_part and time_part != "N/A":
-                parts = time_part.split(":")
-                if len(parts) == 3:
-                    h, m, s = parts
-                    time_ms = int((int(h) * 3600 + int(m) * 60 + float(s)) * 1000)
-                    result["time_ms"] = time_ms
-        except (IndexError, ValueError):
-            pass
-
-    # bitrate=1234.5kbits/s
-    if "bitrate=" in line:
-        try:
-            bitrate_part = line.split("bitrate=")[1].split()[0]
-            result["bitrate"] = bitrate_part
-        except (IndexError, ValueError):
-            pass
+def _stats_size_bytes(value: str) -> Optional[int]:
+    if value.endswith("kB"):
+        return int(float(value[:-2]) * 1024)
+    if value.endswith("mB"):
+        return int(float(value[:-2]) * 1024 * 1024)
+    return None
+
+
+# field -> (result key, converter returning None to skip the field)
+_STATS_FIELDS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "frame": ("frame", int),
+    "fps": ("fps", float),
+    "time": ("time_ms", _stats_time_ms),
+    "bitrate": ("bitrate", str),
+    "speed": ("speed", str),
+    "size": ("size_bytes", _stats_size_bytes),
+}
 
-    # speed=1.23x
-    if "speed=" in line:
-        try:
-            speed_part = line.split("speed=")[1].split()[0]
-            result["speed"] = speed_part
-        except (IndexError, ValueError):
-            pass
 
-    # size=12345kB
-    if "size=" in line:
+def parse_ffmpeg_progress_for_json(line: str) -> Dict[str, Any]:
+    """Parse FFmpeg progress line for JSON output.
+
+    Returns a dict with parsed values. The line is scanned once; only the
+    first occurrence of each field is used.
+    """
+    result: Dict[str, Any] = {}
+    seen = set()
+
+    for m in _RE_STATS_FIELD.finditer(line):
+        field_name = m.group(1)
+        if field_name in seen:
+            continue
+        seen.add(field_name)
+        key, convert = _STATS_FIELDS[field_name]
         try:
-            size_part = line.split("size=")[1].split()[0]
-            if size_part.endswith("kB"):
-                result["size_bytes"] = int(float(size_part[:-2]) * 1024)
-            elif size_part.endswith("mB"):
-                result["size_bytes"] = int(float(size_part[:-2]) * 1024 * 1024)
-        except (IndexError, ValueError):
-            pass
+            value = convert(m.group(2))
+        except ValueError:
+            continue
+        if value is not None:
+            result[key] = value
 
     return result
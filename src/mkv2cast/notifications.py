@@ -7,19 +7,25 @@ Uses notify-send (libnotify) as primary method with plyer as fallback.
 
 import shutil
 import subprocess
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import Any, Literal, Optional
 
 from mkv2cast.i18n import _
 
 
-# Check for notification capabilities
-def _has_notify_send() -> bool:
-    """Check if notify-send is available."""
+# Check for notification capabilities. Both probes are deferred until a
+# notification is actually sent: importing plyer initializes its platform
+# backend (dbus bindings on Linux), which is wasted work for --help,
+# --dry-run and most runs with notifications disabled.
+@lru_cache(maxsize=None)
+def has_notify_send() -> bool:
+    """Check if notify-send is available (cached)."""
     return shutil.which("notify-send") is not None
 
 
-def _has_plyer() -> bool:
-    """Check if plyer is available."""
+@lru_cache(maxsize=None)
+def has_plyer() -> bool:
+    """Check if plyer is available (cached)."""
     try:
         from plyer import notification  # noqa: F401
 
@@ -28,8 +34,13 @@ def _has_plyer() -> bool:
         return False
 
 
-NOTIFY_SEND_AVAILABLE = _has_notify_send()
-PLYER_AVAILABLE = _has_plyer()
+def __getattr__(name: str) -> Any:
+    # Backward compatibility for the former module-level constants.
+    if name == "NOTIFY_SEND_AVAILABLE":
+        return has_notify_send()
+    if name == "PLYER_AVAILABLE":
+        return has_plyer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def send_notification(
@@ -56,7 +67,7 @@ def send_notification(
         True if notification was sent successfully, False otherwise.
     """
     # Try notify-send first (Linux standard via libnotify)
-    if NOTIFY_SEND_AVAILABLE:
+    if has_notify_send():
         try:
             cmd = [
                 "notify-send",
@@ -77,7 +88,7 @@ def send_notification(
             pass
 
     # Fallback to plyer
-    if PLYER_AVAILABLE:
+    if has_plyer():
         try:
             from plyer import notification
 
@@ -189,8 +200,10 @@ def check_notification_support() -> dict:
     Returns:
         Dict with 'notify_send' and 'plyer' boolean keys indicating availability.
     """
+    notify_send = has_notify_send()
+    plyer = has_plyer()
     return {
-        "notify_send": NOTIFY_SEND_AVAILABLE,
-        "plyer": PLYER_AVAILABLE,
-        "any": NOTIFY_SEND_AVAILABLE or PLYER_AVAILABLE,
+        "notify_send": notify_send,
+        "plyer": plyer,
+        "any": notify_send or plyer,
     }
@@ -5,29 +5,43 @@ Manages multiple integrity check and encode workers processing files in parallel
 """
 
 import os
-import shutil
+import re
+import select
 import signal
 import subprocess
 import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from queue import Empty, Queue
-from typing import Callable, List, Optional, Tuple
+from typing import IO, Any, Callable, Deque, Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
 
 from mkv2cast.config import Config
 from mkv2cast.converter import (
     Decision,
+    available_cpu_count,
     build_transcode_cmd,
     check_disk_space,
     decide_for,
     enforce_output_quota,
+    find_executable,
+    is_ffmpeg_progress_kv,
+    move_output,
     parse_ffmpeg_progress,
-    probe_duration_ms,
+    parse_ffmpeg_progress_kv,
+    total_ram_gb,
 )
 from mkv2cast.history import HistoryRecorder
 from mkv2cast.i18n import _
-from mkv2cast.integrity import check_ffprobe_valid, file_size
+from mkv2cast.integrity import (
+    check_ffprobe_valid,
+    file_size,
+    file_stat,
+    release_probe_workers,
+    wait_until_stable,
+)
 from mkv2cast.ui.rich_ui import RichProgressUI
 
 
@@ -43,30 +57,103 @@ class EncodeJob:
     dur_ms: int
     stage: str
     integrity_time: float
+    cmd: List[str]
+
+
+T = TypeVar("T")
+
+
+class WorkQueue(Generic[T]):
+    """
+    FIFO work queue whose consumers sleep until an item arrives or it is stopped.
+
+    Unlike ``queue.Queue.get(timeout=...)`` polling, idle workers cost no
+    wakeups. :meth:`close` lets workers drain what is left and then exit, so
+    no per-worker sentinels are needed; :meth:`stop` releases them at once.
+    With ``maxsize`` > 0, :meth:`put` blocks while the queue is full.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._items: Deque[T] = deque()
+        self._maxsize = maxsize
+        lock = threading.Lock()
+        self._not_empty = threading.Condition(lock)
+        self._not_full = threading.Condition(lock)
+        self._closed = False
+        self._stopped = False
+
+    def put(self, item: T) -> bool:
+        """
+        Append an item and wake one waiting worker, waiting for room if bounded.
+
+        Returns:
+            False if the queue was stopped instead (the item is dropped).
+        """
+        with self._not_full:
+            while self._maxsize > 0 and len(self._items) >= self._maxsize and not self._stopped:
+                self._not_full.wait()
+            if self._stopped:
+                return False
+            self._items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def get(self) -> Tuple[bool, Optional[T]]:
+        """
+        Block until an item is available, or the queue is stopped or closed and empty.
+
+        Returns:
+            (True, item), or (False, None) once there is nothing more to do.
+        """
+        with self._not_empty:
+            while not self._items and not self._closed and not self._stopped:
+                self._not_empty.wait()
+            if self._stopped or not self._items:
+                return False, None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return True, item
+
+    def close(self) -> None:
+        """Signal that no more items will be put; workers exit once it is drained."""
+        with self._not_empty:
+            self._closed = True
+            self._not_empty.notify_all()
+
+    def stop(self) -> None:
+        """Make every current and future :meth:`get` and :meth:`put` return immediately."""
+        with self._not_empty:
+            self._stopped = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
 
 
 # Track active ffmpeg processes for cleanup on interrupt
-_active_processes: List[subprocess.Popen] = []
+_active_processes: Set[subprocess.Popen] = set()
 _processes_lock = threading.Lock()
 
 
 def register_process(proc: subprocess.Popen) -> None:
     """Register a process for tracking."""
     with _processes_lock:
-        _active_processes.append(proc)
+        _active_processes.add(proc)
 
 
 def unregister_process(proc: subprocess.Popen) -> None:
     """Unregister a process from tracking."""
     with _processes_lock:
-        if proc in _active_processes:
-            _active_processes.remove(proc)
+        _active_processes.discard(proc)
 
 
 def terminate_all_processes() -> None:
-    """Terminate all active processes."""
+    """Terminate all active processes, killing any still running after 0.5 s."""
+    global _active_processes
+    # Take the whole set; processes unregistering meanwhile just miss the new one
     with _processes_lock:
-        procs = list(_active_processes)
+        procs, _active_processes = _active_processes, set()
+
+    if not procs:
+        return
 
     for proc in procs:
         try:
@@ -74,12 +161,16 @@ def terminate_all_processes() -> None:
         except Exception:
             pass
 
-    # Wait a bit then kill any remaining
-    time.sleep(0.5)
+    # Return as soon as every process has exited, kill whatever outlives the grace period
+    deadline = time.monotonic() + 0.5
     for proc in procs:
         try:
-            if proc.poll() is None:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            try:
                 proc.kill()
+            except Exception:
+                pass
         except Exception:
             pass
 
@@ -92,10 +183,17 @@ def integrity_check_with_progress(
     log_path: Optional[Path] = None,
     stop_event: Optional[threading.Event] = None,
     cfg: Optional[Config] = None,
+    initial: Optional[Tuple[int, int]] = None,
+    on_stable: Optional[Callable[[], None]] = None,
 ) -> Tuple[bool, float]:
     """
     Perform integrity check with Rich UI progress updates.
 
+    ``initial`` is a (size, mtime_ns) pair the caller already has from
+    :func:`~mkv2cast.integrity.file_stat`, saving another stat of the input.
+    ``on_stable`` is called once the size and stability checks have passed,
+    before the ffprobe and deep-decode stages.
+
     Returns (success, elapsed_seconds).
     """
     if cfg is None:
@@ -112,26 +210,21 @@ def integrity_check_with_progress(
 
     # Stage 1: File size check
     ui.update_integrity(worker_id, "SIZE", 10, filename, inp=path)
-    size = file_size(path)
-    if size < 1024 * 1024:  # 1MB minimum
+    st = initial if initial is not None else file_stat(path)
+    if st is None or st[0] < 1024 * 1024:  # 1MB minimum
         ui.stop_integrity(worker_id, path)
         return False, time.time() - start_time
 
     # Stage 2: Stability check
     if cfg.stable_wait > 0:
-        for i in range(cfg.stable_wait):
-            if stop_event and stop_event.is_set():
-                ui.stop_integrity(worker_id, path)
-                return False, time.time() - start_time
-
-            pct = 10 + int((i + 1) * 40 / cfg.stable_wait)
-            ui.update_integrity(worker_id, "STABLE", pct, filename, inp=path)
-            time.sleep(1)
-
-        new_size = file_size(path)
-        if size != new_size:
+        ui.update_integrity(worker_id, "STABLE", 30, filename, inp=path)
+        if not wait_until_stable(path, cfg.stable_wait, stop_event, initial=st):
             ui.stop_integrity(worker_id, path)
             return False, time.time() - start_time
+        ui.update_integrity(worker_id, "STABLE", 50, filename, inp=path)
+
+    if on_stable is not None:
+        on_stable()
 
     # Stage 3: ffprobe check
     ui.update_integrity(worker_id, "FFPROBE", 60, filename, inp=path)
@@ -143,9 +236,23 @@ def integrity_check_with_progress(
     if cfg.deep_check:
         ui.update_integrity(worker_id, "DECODE", 70, filename, inp=path)
         # Deep decode check - this takes a while
-        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(path), "-map", "0:v:0", "-f", "null", "-"]
+        cmd = [
+            find_executable("ffmpeg"),
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(path),
+            "-map",
+            "0:v:0",
+            "-f",
+            "null",
+            "-",
+        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=3600)
+            result = subprocess.run(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=3600, close_fds=False
+            )
             if result.returncode != 0:
                 ui.stop_integrity(worker_id, path)
                 return False, time.time() - start_time
@@ -160,6 +267,40 @@ def integrity_check_with_progress(
     return True, elapsed
 
 
+# ffmpeg ends stats lines with "\r" and log lines with "\n"
+_RE_LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+# Bytes requested per read from an ffmpeg stderr pipe
+_READ_CHUNK = 64 * 1024
+
+
+def _iter_output_lines(stream: IO[bytes], stop_event: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    Yield non-empty lines from a binary pipe, reading it in large chunks.
+
+    Stops at EOF, or once ``stop_event`` is set (checked at least every
+    0.2 s on POSIX, where the pipe can be polled with select()).
+    """
+    fd = stream.fileno()
+    poll = os.name == "posix"
+    pending = b""
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            return
+        if poll and not select.select([fd], [], [], 0.2)[0]:
+            continue
+        chunk = os.read(fd, _READ_CHUNK)
+        if not chunk:
+            break
+        lines = _RE_LINE_BREAK.split(pending + chunk)
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if pending:
+        yield pending
+
+
 def run_ffmpeg_with_progress(
     cmd: List[str],
     ui: RichProgressUI,
@@ -170,65 +311,96 @@ def run_ffmpeg_with_progress(
     log_path: Optional[Path],
     inp: Path,
     stop_event: Optional[threading.Event] = None,
+    min_interval: float = 0.1,
 ) -> int:
     """
     Run ffmpeg command while updating Rich UI progress.
 
+    The UI is updated whenever the percentage advances; speed-only changes
+    are sent at most once per ``min_interval`` seconds.
+
     Returns the process return code.
     """
     # Add progress output to command
     progress_cmd = list(cmd)
+    # With -progress (and -nostats) every other stderr line is plain log output; only
+    # scrape human-readable stats lines when the command does not use -progress
+    scrape_stats = "-progress" not in progress_cmd
     # Insert progress stats option after ffmpeg
-    if progress_cmd[0] == "ffmpeg" and "-progress" not in progress_cmd:
+    if os.path.basename(progress_cmd[0]) == "ffmpeg" and scrape_stats:
         progress_cmd.insert(1, "-stats")
 
-    # Start process
+    # Start process (close_fds=False keeps CPython on its posix_spawn path)
     process = subprocess.Popen(
         progress_cmd,
-        stdout=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
         text=False,
+        close_fds=False,
     )
     register_process(process)
 
+    # Log file stays open for the whole encode; raw stderr bytes are appended as-is
+    lf: Optional[IO[bytes]] = None
+    if log_path:
+        try:
+            lf = log_path.open("ab", buffering=_READ_CHUNK)
+        except OSError:
+            lf = None
+
     try:
         # Parse stderr for progress
         last_pct = 0
         last_speed = ""
+        last_update = float("-inf")
+        kv_state: Dict[str, str] = {}
+
+        if process.stderr is not None:
+            for line in _iter_output_lines(process.stderr, stop_event):
+                line_str = line.decode("utf-8", errors="replace")
+
+                if is_ffmpeg_progress_kv(line_str):
+                    info = parse_ffmpeg_progress_kv(line_str, kv_state, dur_ms)
+                    if info is None:
+                        continue
+                    pct, speed, out_ms = _progress_tuple(info)
+                else:
+                    # Log to file (progress blocks are not worth keeping)
+                    if lf is not None:
+                        try:
+                            lf.write(line + b"\n")
+                        except OSError:
+                            pass
 
-        while True:
-            if stop_event and stop_event.is_set():
-                process.terminate()
-                break
-
-            if process.stderr is None:
-                break
-            line = process.stderr.readline()
-            if not line:
-                break
-
-            line_str = line.decode("utf-8", errors="replace")
+                    if not scrape_stats:
+                        continue
 
-            # Log to file
-            if log_path:
-                try:
-                    with log_path.open("a", encoding="utf-8", errors="replace") as lf:
-                        lf.write(line_str)
-                except Exception:
-                    pass
+                    # Parse progress
+                    pct, speed, out_ms = _parse_ffmpeg_progress(line_str, dur_ms)
 
-            # Parse progress
-            pct, speed, out_ms = _parse_ffmpeg_progress(line_str, dur_ms)
+                if pct <= last_pct and speed == last_speed:
+                    continue
+                now = time.monotonic()
+                if pct > last_pct or now - last_update >= min_interval:
+                    last_pct = pct
+                    last_speed = speed
+                    last_update = now
+                    ui.update_encode(
+                        worker_id, stage, pct, filename, speed=speed, inp=inp, out_ms=out_ms, dur_ms=dur_ms
+                    )
 
-            if pct > last_pct or speed != last_speed:
-                last_pct = pct
-                last_speed = speed
-                ui.update_encode(worker_id, stage, pct, filename, speed=speed, inp=inp, out_ms=out_ms, dur_ms=dur_ms)
+        if stop_event and stop_event.is_set():
+            process.terminate()
 
         process.wait()
         return process.returncode
 
     finally:
+        if lf is not None:
+            try:
+                lf.close()
+            except OSError:
+                pass
         unregister_process(process)
 
 
@@ -243,8 +415,11 @@ def _parse_ffmpeg_progress(line: str, dur_ms: int) -> Tuple[int, str, int]:
     Returns:
         Tuple of (percentage, speed_str, current_ms).
     """
-    info = parse_ffmpeg_progress(line, dur_ms)
+    return _progress_tuple(parse_ffmpeg_progress(line, dur_ms))
+
 
+def _progress_tuple(info: Dict[str, Any]) -> Tuple[int, str, int]:
+    """Reduce a progress metrics dict to (percentage, speed_str, current_ms)."""
     pct_float = info.get("progress_percent") or 0.0
     try:
         pct = int(pct_float)
@@ -287,76 +462,102 @@ class PipelineOrchestrator:
         self.get_log_path = get_log_path
         self.get_tmp_path = get_tmp_path
         self.output_exists_fn = output_exists_fn
+        # Constant tail of every output name: "<stem><tag>" + this
+        self._output_tail = f"{cfg.suffix}.{cfg.container}"
+
+        # Status messages, translated once per run
+        self._msg_output_exists = _("output exists")
+        self._msg_integrity_failed = _("integrity failed")
+        self._msg_integrity_error = _("integrity error")
+        self._msg_analysis_error = _("analysis error")
+        self._msg_compatible = _("compatible")
+        self._msg_tmp_exists = _("tmp exists")
+        self._msg_dryrun = _("dryrun")
+        self._msg_encode_error = _("encode error")
+        self._msg_move_error = _("move error")
+        self._msg_interrupted = _("interrupted")
 
         # Queues
-        self.integrity_queue: Queue[Optional[Path]] = Queue()
-        self.encode_queue: Queue[Optional[EncodeJob]] = Queue()
+        self.integrity_queue: WorkQueue[Path] = WorkQueue()
+        # Bounded so integrity checks run at most a couple of files ahead of the encoders
+        self.encode_queue: WorkQueue[EncodeJob] = WorkQueue(maxsize=max(1, encode_workers) * 2)
+        self._encoders_alive = encode_workers
+        self._encoders_lock = threading.Lock()
+
+        # Stream analysis (ffprobe) runs here, overlapping each file's integrity check
+        self._probe_executor = ThreadPoolExecutor(
+            max_workers=max(1, integrity_workers), thread_name_prefix="mkv2cast-probe"
+        )
 
         # Control
         self.stop_event = threading.Event()
         self.interrupted = False
 
-        # Track sentinels
-        self.integrity_sentinels_remaining = integrity_workers
-        self.integrity_sentinels_lock = threading.Lock()
-
         # Register all jobs and fill integrity queue
         for t in targets:
             self.ui.register_job(t, backend=self.backend)
             self.integrity_queue.put(t)
+        self.integrity_queue.close()
 
-        # Add sentinels for integrity workers
-        for _i in range(integrity_workers):
-            self.integrity_queue.put(None)
+    def _start_analysis(self, inp: Path, futures: "List[Future[Decision]]") -> None:
+        """Submit ``decide_for`` for a file that passed the size and stability checks."""
+        futures.append(self._probe_executor.submit(decide_for, inp, self.cfg))
 
     def integrity_worker(self, worker_id: int):
         """Worker that performs integrity checks and prepares encode jobs."""
-        while not self.stop_event.is_set():
-            try:
-                inp = self.integrity_queue.get(timeout=0.5)
-            except Empty:
-                continue
-
-            if inp is None:
-                # Sentinel - check if we're the last one
-                with self.integrity_sentinels_lock:
-                    self.integrity_sentinels_remaining -= 1
-                    if self.integrity_sentinels_remaining == 0:
-                        # Last integrity worker - send sentinels to encode workers
-                        for _j in range(self.encode_workers_count):
-                            self.encode_queue.put(None)
+        while True:
+            ok, inp = self.integrity_queue.get()
+            if not ok or inp is None:
                 break
 
             filename = inp.name
-            input_size = file_size(inp)
-            integrity_time = 0.0
 
-            if self.history:
-                self.history.start(inp, input_size)
-
-            # Check if output already exists
+            # Check if output already exists; a one-shot skip is a single history record
             if self.output_exists_fn(inp, self.cfg):
-                reason = _("output exists")
+                reason = self._msg_output_exists
                 self.ui.mark_skipped(inp, reason)
                 if self.history:
-                    self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
+                    self.history.skip(inp, reason)
                 continue
 
+            # One stat serves the history record, the size check and the stability window
+            st = file_stat(inp)
+            input_size = st[0] if st is not None else 0
+            integrity_time = 0.0
+
+            if self.history:
+                self.history.start(inp, input_size)
+
             log_path = self.get_log_path(inp)
 
+            # Once the file is complete and stable, analyze it while ffprobe/deep-decode run
+            decision_futures: List[Future[Decision]] = []
+
             # Run integrity check
             try:
                 success, integrity_time = integrity_check_with_progress(
-                    inp, self.ui, worker_id, filename, log_path, self.stop_event, self.cfg
+                    inp,
+                    self.ui,
+                    worker_id,
+                    filename,
+                    log_path,
+                    self.stop_event,
+                    self.cfg,
+                    initial=st,
+                    on_stable=partial(self._start_analysis, inp, decision_futures),
                 )
                 if not success:
-                    reason = _("integrity failed")
+                    for future in decision_futures:
+                        future.cancel()
+                    reason = self._msg_integrity_failed
                     self.ui.mark_skipped(inp, reason)
                     if self.history:
                         self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
                     continue
             except Exception as e:
-                reason = _("integrity error") + f": {e}"
+                for future in decision_futures:
+                    future.cancel()
+                reason = self._msg_integrity_error + f": {e}"
                 self.ui.mark_failed(inp, reason)
                 if self.history:
                     self.history.finish(inp, "failed", error_msg=reason, integrity_time=integrity_time)
@@ -364,9 +565,9 @@ class PipelineOrchestrator:
 
             # Analyze file
             try:
-                d = decide_for(inp, self.cfg)
+                d = decision_futures[0].result() if decision_futures else decide_for(inp, self.cfg)
             except Exception as e:
-                reason = _("analysis error") + f": {e}"
+                reason = self._msg_analysis_error + f": {e}"
                 self.ui.mark_failed(inp, reason)
                 if self.history:
                     self.history.finish(inp, "failed", error_msg=reason, integrity_time=integrity_time)
@@ -374,7 +575,7 @@ class PipelineOrchestrator:
 
             # Check if already compatible
             if (not d.need_v) and (not d.need_a) and self.cfg.skip_when_ok:
-                reason = _("compatible")
+                reason = self._msg_compatible
                 self.ui.mark_skipped(inp, reason)
                 if self.history:
                     self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
@@ -389,9 +590,9 @@ class PipelineOrchestrator:
             if not tag:
                 tag = ".remux"
 
-            final = inp.parent / f"{inp.stem}{tag}{self.cfg.suffix}.{self.cfg.container}"
+            final = inp.with_name(f"{inp.stem}{tag}{self._output_tail}")
             if final.exists():
-                reason = _("output exists")
+                reason = self._msg_output_exists
                 self.ui.mark_skipped(inp, reason)
                 if self.history:
                     self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
@@ -399,7 +600,7 @@ class PipelineOrchestrator:
 
             tmp = self.get_tmp_path(inp, worker_id, tag)
             if tmp.exists():
-                reason = _("tmp exists")
+                reason = self._msg_tmp_exists
                 self.ui.mark_skipped(inp, reason)
                 if self.history:
                     self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
@@ -414,11 +615,11 @@ class PipelineOrchestrator:
 
             # Build ffmpeg command
             cmd, stage = build_transcode_cmd(inp, d, self.backend, tmp, log_path, self.cfg)
-            dur_ms = probe_duration_ms(inp)
+            dur_ms = d.duration_ms
 
             if self.cfg.dryrun:
                 self.ui.log(f"DRYRUN: {' '.join(cmd)}")
-                reason = _("dryrun")
+                reason = self._msg_dryrun
                 self.ui.mark_skipped(inp, reason)
                 if self.history:
                     self.history.finish(inp, "skipped", error_msg=reason, integrity_time=integrity_time)
@@ -434,18 +635,27 @@ class PipelineOrchestrator:
                 dur_ms=dur_ms,
                 stage=stage,
                 integrity_time=integrity_time,
+                cmd=cmd,
             )
-            self.encode_queue.put(job)
+            if not self.encode_queue.put(job):
+                break
+
+    def _run_encode_worker(self, worker_id: int) -> None:
+        """Run an encode worker; the last one to exit releases producers blocked on a full queue."""
+        try:
+            self.encode_worker(worker_id)
+        finally:
+            with self._encoders_lock:
+                self._encoders_alive -= 1
+                last = self._encoders_alive == 0
+            if last:
+                self.encode_queue.stop()
 
     def encode_worker(self, worker_id: int):
         """Worker that performs encoding."""
-        while not self.stop_event.is_set():
-            try:
-                job = self.encode_queue.get(timeout=0.5)
-            except Empty:
-                continue
-
-            if job is None:
+        while True:
+            ok, job = self.encode_queue.get()
+            if not ok or job is None:
                 break
 
             filename = job.inp.name
@@ -463,10 +673,13 @@ class PipelineOrchestrator:
                     if self.cfg.retry_delay_sec > 0:
                         time.sleep(self.cfg.retry_delay_sec)
 
-                # Rebuild command (backend may change)
-                cmd, _stage = build_transcode_cmd(
-                    job.inp, job.decision, attempt_backend, job.tmp, job.log_path, self.cfg
-                )
+                # Reuse the integrity worker's command; rebuild only after a backend fallback
+                if attempt_backend == self.backend:
+                    cmd = job.cmd
+                else:
+                    cmd, _stage = build_transcode_cmd(
+                        job.inp, job.decision, attempt_backend, job.tmp, job.log_path, self.cfg
+                    )
 
                 attempt_start = time.time()
 
@@ -481,17 +694,18 @@ class PipelineOrchestrator:
                         job.log_path,
                         job.inp,
                         self.stop_event,
+                        min_interval=self.cfg.ui_refresh_ms / 1000.0,
                     )
                     last_error = f"ffmpeg rc={rc}"
                 except Exception as e:
                     rc = -1
-                    last_error = _("encode error") + f": {e}"
+                    last_error = self._msg_encode_error + f": {e}"
 
                 encode_time_total += time.time() - attempt_start
 
                 if rc == 0:
                     try:
-                        shutil.move(str(job.tmp), str(job.final))
+                        move_output(job.tmp, job.final)
                         quota_error = enforce_output_quota(job.final, file_size(job.inp), self.cfg)
                         if quota_error:
                             job.final.unlink(missing_ok=True)
@@ -521,7 +735,7 @@ class PipelineOrchestrator:
                             job.tmp.unlink(missing_ok=True)
                         except Exception:
                             pass
-                        reason = _("move error") + f": {e}"
+                        reason = self._msg_move_error + f": {e}"
                         self.ui.mark_failed(job.inp, reason)
                         if self.history:
                             self.history.finish(
@@ -540,7 +754,7 @@ class PipelineOrchestrator:
                     pass
 
                 if self.stop_event.is_set():
-                    reason = _("interrupted")
+                    reason = self._msg_interrupted
                     self.ui.mark_failed(job.inp, reason)
                     if self.history:
                         self.history.finish(
@@ -568,6 +782,12 @@ class PipelineOrchestrator:
                     )
                 break
 
+    def stop(self) -> None:
+        """Ask all workers to stop and wake any that are waiting for work."""
+        self.stop_event.set()
+        self.integrity_queue.stop()
+        self.encode_queue.stop()
+
     def run(self) -> Tuple[int, int, int, bool]:
         """Run the pipeline. Returns (ok, skipped, failed, interrupted)."""
         # Create worker threads
@@ -578,13 +798,13 @@ class PipelineOrchestrator:
 
         encode_threads = []
         for i in range(self.encode_workers_count):
-            t = threading.Thread(target=self.encode_worker, args=(i,), name=f"encode_worker_{i}", daemon=True)
+            t = threading.Thread(target=self._run_encode_worker, args=(i,), name=f"encode_worker_{i}", daemon=True)
             encode_threads.append(t)
 
         # Signal handler
         def on_sigint(_sig, _frm):
             self.interrupted = True
-            self.stop_event.set()
+            self.stop()
             terminate_all_processes()
 
         old_handler = signal.signal(signal.SIGINT, on_sigint)
@@ -599,9 +819,10 @@ class PipelineOrchestrator:
             for t in encode_threads:
                 t.start()
 
-            # Wait for all threads
+            # Wait for all threads; encode workers exit once the last job is drained
             for t in integrity_threads:
                 t.join()
+            self.encode_queue.close()
             for t in encode_threads:
                 t.join()
 
@@ -609,6 +830,8 @@ class PipelineOrchestrator:
             signal.signal(signal.SIGINT, old_handler)
             self.ui.stop()
             terminate_all_processes()
+            self._probe_executor.shutdown(wait=False)
+            release_probe_workers()
 
         if self.interrupted and self.history:
             self.history.interrupt_all()
@@ -620,29 +843,14 @@ class PipelineOrchestrator:
 
 def auto_detect_workers() -> Tuple[int, int]:
     """Auto-detect optimal number of workers based on system resources."""
-    try:
-        cpu_count = os.cpu_count() or 4
-    except Exception:
-        cpu_count = 4
+    cpu_count = available_cpu_count()
 
-    # Try to read RAM
-    try:
-        with open("/proc/meminfo") as f:
-            for line in f:
-                if line.startswith("MemTotal:"):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        ram_gb = int(parts[1]) // (1024 * 1024)
-                        break
-            else:
-                ram_gb = 8
-    except Exception:
-        ram_gb = 8
+    ram_gb = total_ram_gb()
 
     # Encode workers: limited by RAM (each encode can use 2-4GB)
     encode_workers = max(1, min(cpu_count // 2, ram_gb // 4))
 
     # Integrity workers: limited by I/O, typically 2-4 is good
-    integrity_workers = min(4, cpu_count // 2, encode_workers * 2)
+    integrity_workers = max(1, min(4, cpu_count // 2, encode_workers * 2))
 
     return encode_workers, integrity_workers
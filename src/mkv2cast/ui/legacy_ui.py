@@ -6,8 +6,10 @@ Used when rich is not available or in non-interactive terminals.
 
 import shutil
 import sys
+import time
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 
 def term_width() -> int:
@@ -18,6 +20,7 @@ def term_width() -> int:
         return 120
 
 
+@lru_cache(maxsize=256)
 def mkbar(pct: int, width: int = 26) -> str:
     """Create a simple progress bar string."""
     pct = max(0, min(100, pct))
@@ -65,10 +68,17 @@ class UIState:
 class LegacyProgressUI:
     """Fallback progress UI when rich is not available."""
 
+    # Seconds between terminal size queries
+    WIDTH_TTL = 1.0
+
     def __init__(self, progress: bool = True, bar_width: int = 26):
         self.enabled = progress and sys.stdout.isatty()
         self.bar_width = bar_width
         self._last_render: Optional[str] = None
+        # Inputs of the last rendered line, to skip formatting when nothing changed
+        self._last_key: Optional[Tuple[object, ...]] = None
+        self._width = 0
+        self._width_checked = float("-inf")
 
         # Stats tracking
         self.ok = 0
@@ -81,7 +91,16 @@ class LegacyProgressUI:
         if not self.enabled:
             return
 
-        w = term_width()
+        now = time.monotonic()
+        if now - self._width_checked >= self.WIDTH_TTL:
+            self._width = term_width()
+            self._width_checked = now
+        w = self._width
+
+        key = (w, st.stage, st.pct, st.cur, st.total, st.base, st.eta, st.speed, st.elapsed)
+        if key == self._last_key and self._last_render is not None:
+            return
+        self._last_key = key
 
         bar = mkbar(st.pct, self.bar_width)
         elapsed_str = f" {st.elapsed}" if st.elapsed else ""
@@ -14,7 +14,7 @@ import re
 import subprocess
 import sys
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console
 from rich.live import Live
@@ -29,9 +29,14 @@ from rich.progress import (
 )
 from rich.table import Table
 
+from mkv2cast.converter import is_ffmpeg_progress_kv, parse_ffmpeg_progress_kv
 from mkv2cast.i18n import _
 from mkv2cast.ui.legacy_ui import fmt_hms
 
+# Progress fields of an ffmpeg stats line, matched on every stderr line
+_RE_TIME = re.compile(r"time=\s*(\d+):(\d+):(\d+)\.(\d+)")
+_RE_SPEED = re.compile(r"speed=\s*([0-9.]+)x")
+
 
 def _should_use_color() -> bool:
     """Check if color output should be used."""
@@ -150,7 +155,7 @@ class SimpleRichUI:
         # Start ffmpeg process
         process = subprocess.Popen(
             cmd,
-            stdout=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=False,
         )
@@ -158,6 +163,9 @@ class SimpleRichUI:
         # Read stderr for progress updates
         stderr_buffer = []
         last_pct = 0
+        kv_state: Dict[str, str] = {}
+        # With -progress, non key=value lines are log output only
+        scrape_stats = "-progress" not in cmd
 
         with progress:
             while True:
@@ -169,11 +177,22 @@ class SimpleRichUI:
                     break
 
                 line_str = line.decode("utf-8", errors="replace")
-                stderr_buffer.append(line_str)
 
-                # Parse ffmpeg progress
-                # Example: frame=  123 fps=45 q=28.0 size=    1234kB time=00:00:05.12 bitrate=1234.5kbits/s speed=1.23x
-                pct, speed = self._parse_ffmpeg_progress(line_str, dur_ms)
+                if is_ffmpeg_progress_kv(line_str):
+                    # -progress key=value block; only the block terminator yields an update
+                    info = parse_ffmpeg_progress_kv(line_str, kv_state, dur_ms)
+                    if info is None:
+                        continue
+                    pct = int(info["progress_percent"])
+                    speed = info["speed"]
+                else:
+                    stderr_buffer.append(line_str)
+                    if not scrape_stats:
+                        continue
+
+                    # Parse ffmpeg progress
+                    # Example: frame=  123 fps=45 q=28.0 size=    1234kB time=00:00:05.12 bitrate=1234.5kbits/s speed=1.23x
+                    pct, speed = self._parse_ffmpeg_progress(line_str, dur_ms)
 
                 if pct > last_pct:
                     last_pct = pct
@@ -194,14 +213,14 @@ class SimpleRichUI:
         speed = ""
 
         # Parse time
-        m = re.search(r"time=\s*(\d+):(\d+):(\d+)\.(\d+)", line)
+        m = _RE_TIME.search(line)
         if m and dur_ms > 0:
             h, mi, s, cs = int(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4))
             current_ms = (h * 3600 + mi * 60 + s) * 1000 + cs * 10
             pct = min(100, int(current_ms * 100 / dur_ms))
 
         # Parse speed
-        m = re.search(r"speed=\s*([0-9.]+)x", line)
+        m = _RE_SPEED.search(line)
         if m:
             speed = f"{float(m.group(1)):.1f}x"
 
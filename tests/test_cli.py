@@ -32,14 +32,14 @@ class TestSystemDetection:
         assert ram >= 1  # At least 1GB
 
     def test_get_total_ram_gb_fallback(self, monkeypatch, tmp_path):
-        """Test get_total_ram_gb returns fallback when /proc/meminfo unavailable."""
+        """Test get_total_ram_gb returns fallback when physical memory is unknown."""
         from mkv2cast.cli import get_total_ram_gb
 
-        # Mock open to raise error
-        def mock_open(*args, **kwargs):
-            raise FileNotFoundError()
+        # Mock sysconf to raise error
+        def mock_sysconf(name):
+            raise ValueError(name)
 
-        monkeypatch.setattr("builtins.open", mock_open)
+        monkeypatch.setattr("os.sysconf", mock_sysconf, raising=False)
         ram = get_total_ram_gb()
         assert ram == 8  # Default fallback
 
@@ -59,7 +59,7 @@ class TestSystemDetection:
 
         monkeypatch.setattr("mkv2cast.cli.get_total_ram_gb", lambda: 16)
         monkeypatch.setattr("mkv2cast.cli.get_gpu_info", lambda: ("intel", 2048))
-        monkeypatch.setattr("os.cpu_count", lambda: 8)
+        monkeypatch.setattr("mkv2cast.cli.available_cpu_count", lambda: 8)
 
         encode, integrity = auto_detect_workers("vaapi")
         assert encode >= 1
@@ -70,7 +70,7 @@ class TestSystemDetection:
         from mkv2cast.cli import auto_detect_workers
 
         monkeypatch.setattr("mkv2cast.cli.get_total_ram_gb", lambda: 8)
-        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        monkeypatch.setattr("mkv2cast.cli.available_cpu_count", lambda: 4)
 
         encode, integrity = auto_detect_workers("cpu")
         assert encode >= 1
@@ -125,6 +125,39 @@ class TestFileFiltering:
         output_file.touch()
         assert output_exists_for_input(input_file, cfg) is True
 
+    def test_output_exists_for_input_literal_brackets(self, tmp_path):
+        """Test glob metacharacters in the file name are matched literally."""
+        from mkv2cast.cli import output_exists_for_input
+        from mkv2cast.config import Config
+
+        cfg = Config()
+        input_file = tmp_path / "Movie [1080p].mkv"
+        input_file.touch()
+        (tmp_path / "Movie 1.h264.cast.mkv").touch()
+        assert output_exists_for_input(input_file, cfg) is False
+
+        (tmp_path / "Movie [1080p].h264.cast.mkv").touch()
+        assert output_exists_for_input(input_file, cfg) is True
+
+    def test_output_exists_checker_lists_directory_once(self, tmp_path, monkeypatch):
+        """Test the batch checker scans each directory once and matches like the plain check."""
+        import mkv2cast.cli as cli
+        from mkv2cast.config import Config
+
+        cfg = Config()
+        for name in ("a.mkv", "b.mkv", "c.mkv", "b.h264.cast.mkv", "c.tmp.123.0.mkv"):
+            (tmp_path / name).touch()
+
+        scans = []
+        real_list = cli._list_file_names
+        monkeypatch.setattr(cli, "_list_file_names", lambda d: scans.append(d) or real_list(d))
+
+        check = cli.make_output_exists_checker()
+        results = [check(tmp_path / n, cfg) for n in ("a.mkv", "b.mkv", "c.mkv")]
+        assert results == [False, True, True]
+        assert scans == [tmp_path]
+        assert results == [cli.output_exists_for_input(tmp_path / n, cfg) for n in ("a.mkv", "b.mkv", "c.mkv")]
+
 
 class TestCollectTargets:
     """Tests for collect_targets function."""
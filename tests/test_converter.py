@@ -55,6 +55,63 @@ class TestProgressParsing:
         assert result["speed"] == "2.5x"
         assert abs(result["progress_percent"] - 50.0) < 0.5
 
+    def test_parse_ffmpeg_progress_kv_block(self):
+        """Test parsing a -progress key=value block."""
+        from mkv2cast.converter import is_ffmpeg_progress_kv, parse_ffmpeg_progress_kv
+
+        block = [
+            "frame=240",
+            "fps=48.00",
+            "stream_0_0_q=28.0",
+            "bitrate= 838.9kbits/s",
+            "total_size=1048576",
+            "out_time_us=10000000",
+            "out_time=00:00:10.000000",
+            "speed=2.51x",
+        ]
+        state: dict = {}
+        for line in block:
+            assert is_ffmpeg_progress_kv(line)
+            assert parse_ffmpeg_progress_kv(line, state, 40000) is None
+
+        result = parse_ffmpeg_progress_kv("progress=continue\n", state, 40000)
+
+        assert result is not None
+        assert result["frame"] == 240
+        assert result["fps"] == 48.0
+        assert result["current_time_ms"] == 10000
+        assert result["bitrate"] == "838.9kbits/s"
+        assert result["speed"] == "2.5x"
+        assert result["size_bytes"] == 1048576
+        assert result["progress_percent"] == 25.0
+        assert state == {}
+
+    def test_parse_ffmpeg_progress_kv_na_values(self):
+        """Test -progress blocks with N/A values at encode start."""
+        from mkv2cast.converter import parse_ffmpeg_progress_kv
+
+        state: dict = {}
+        for line in ["out_time_us=N/A", "bitrate=N/A", "speed=N/A"]:
+            parse_ffmpeg_progress_kv(line, state, 60000)
+        result = parse_ffmpeg_progress_kv("progress=continue", state, 60000)
+
+        assert result is not None
+        assert result["current_time_ms"] == 0
+        assert result["bitrate"] == ""
+        assert result["speed"] == ""
+
+    def test_parse_ffmpeg_progress_line_stats_fallback(self):
+        """Test the human-readable stats line is still parsed."""
+        from mkv2cast.converter import is_ffmpeg_progress_kv, parse_ffmpeg_progress_line
+
+        line = "frame=  100 fps=30.0 q=28.0 size=   1234kB time=00:00:10.00 bitrate=1000kbits/s speed=2.5x"
+        assert not is_ffmpeg_progress_kv(line)
+
+        result = parse_ffmpeg_progress_line(line, {}, 60000)
+        assert result is not None
+        assert result["current_time_ms"] == 10000
+        assert parse_ffmpeg_progress_line("Stream mapping:", {}, 60000) is None
+
     def test_calculate_eta(self):
         """Test ETA calculation."""
         import time
@@ -68,6 +125,322 @@ class TestProgressParsing:
         assert 10 < eta < 20
 
 
+class TestProbeDuration:
+    """Tests for the standalone duration probe."""
+
+    def test_probe_duration_cached_per_file_version(self, tmp_path, monkeypatch):
+        """Test ffprobe runs once per unchanged file."""
+        import mkv2cast.converter as conv
+
+        calls = []
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(cmd)
+            return b'{"format": {"duration": "12.5"}}'
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        conv._probe_duration_cached.cache_clear()
+
+        f = tmp_path / "movie.mkv"
+        f.write_bytes(b"x")
+
+        assert conv.probe_duration_ms(f) == 12500
+        assert conv.probe_duration_ms(f) == 12500
+        assert len(calls) == 1
+
+        f.write_bytes(b"xx")
+        conv.probe_duration_ms(f)
+        assert len(calls) == 2
+
+        assert conv.probe_duration_ms(tmp_path / "missing.mkv") == 0
+        conv._probe_duration_cached.cache_clear()
+
+    def test_probe_duration_failure_not_cached(self, tmp_path, monkeypatch):
+        """Test a failed probe returns 0 once and is retried on the next call."""
+        import subprocess
+
+        import mkv2cast.converter as conv
+
+        calls = []
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(cmd)
+            if len(calls) == 1:
+                raise subprocess.TimeoutExpired(cmd, 10)
+            return b'{"format": {"duration": "2"}}'
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        conv.set_probe_cache_dir(None)
+
+        f = tmp_path / "movie.mkv"
+        f.write_bytes(b"x")
+        try:
+            assert conv.probe_duration_ms(f) == 0
+            assert conv.probe_duration_ms(f) == 2000
+            assert len(calls) == 2
+        finally:
+            conv.set_probe_cache_dir(None)
+
+    def test_duration_and_decision_share_probe(self, tmp_path, monkeypatch):
+        """Test decide_for reuses the probe made for the duration."""
+        import mkv2cast.converter as conv
+
+        calls = []
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(cmd)
+            return b'{"format": {"duration": "3", "format_name": "matroska"}, "streams": []}'
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        conv.set_probe_cache_dir(None)
+
+        f = tmp_path / "movie.mkv"
+        f.write_bytes(b"x")
+
+        assert conv.probe_duration_ms(f) == 3000
+        first = conv.ffprobe_json(f)
+        first["format"].clear()
+        assert conv.ffprobe_json(f)["format"]["duration"] == "3"
+        assert len(calls) == 1
+        conv.set_probe_cache_dir(None)
+
+    def test_concurrent_probes_share_one_launch(self, tmp_path, monkeypatch):
+        """Test callers probing the same file at once wait for one ffprobe run."""
+        import threading
+        import time
+
+        import mkv2cast.converter as conv
+
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(cmd)
+            started.set()
+            release.wait(timeout=5)
+            return b'{"format": {"duration": "2"}, "streams": []}'
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        conv.set_probe_cache_dir(None)
+
+        f = tmp_path / "movie.mkv"
+        f.write_bytes(b"x")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(conv.ffprobe_json(f))) for _ in range(2)]
+        try:
+            threads[0].start()
+            assert started.wait(timeout=5)
+            threads[1].start()
+            time.sleep(0.1)  # let the second caller find the probe in flight
+            release.set()
+            for t in threads:
+                t.join(timeout=5)
+
+            assert len(calls) == 1
+            assert [r["format"]["duration"] for r in results] == ["2", "2"]
+            assert conv._PROBE_INFLIGHT == {}
+        finally:
+            release.set()
+            conv.set_probe_cache_dir(None)
+
+    def test_disk_cache_survives_process_cache(self, tmp_path, monkeypatch):
+        """Test on-disk probe entries are reused and invalidated on change."""
+        import mkv2cast.converter as conv
+
+        calls = []
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(cmd)
+            return b'{"format": {"duration": "%d"}}' % len(calls)
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        cache_dir = tmp_path / "cache"
+        conv.set_probe_cache_dir(cache_dir)
+
+        f = tmp_path / "movie.mkv"
+        f.write_bytes(b"x")
+        try:
+            assert conv.ffprobe_json(f)["format"]["duration"] == "1"
+            assert len(list(cache_dir.glob("*.json"))) == 1
+
+            # A new process starts with an empty lru_cache but finds the disk entry
+            conv.set_probe_cache_dir(cache_dir)
+            assert conv.ffprobe_json(f)["format"]["duration"] == "1"
+            assert len(calls) == 1
+
+            f.write_bytes(b"xx")
+            assert conv.ffprobe_json(f)["format"]["duration"] == "2"
+            assert not list(cache_dir.glob("*.tmp"))
+        finally:
+            conv.set_probe_cache_dir(None)
+
+    def test_disk_cache_pruned_by_age_and_count(self, tmp_path):
+        """Test unused and excess on-disk probe entries are deleted."""
+        import os
+        import time
+
+        import mkv2cast.converter as conv
+
+        now = time.time()
+        for i in range(5):
+            entry = tmp_path / f"{i}.json"
+            entry.write_bytes(b"{}")
+            used = now - i * 86400 + 3600  # last used an hour short of i days ago
+            os.utime(entry, (used, used))
+
+        assert conv._prune_probe_cache(tmp_path, max_age_days=3, max_entries=10) == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0.json", "1.json", "2.json", "3.json"]
+
+        assert conv._prune_probe_cache(tmp_path, max_age_days=30, max_entries=2) == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0.json", "1.json"]
+
+        assert conv._prune_probe_cache(tmp_path / "missing") == 0
+
+
+class TestRunWithCallback:
+    """Tests for the callback-driven ffmpeg runner."""
+
+    def test_callbacks_rate_limited(self, tmp_path):
+        """Test encoding callbacks are throttled by time and done is always sent."""
+        import sys
+
+        from mkv2cast.converter import _run_ffmpeg_with_callback
+
+        script = (
+            "import sys\n"
+            "for i in range(50):\n"
+            "    sys.stderr.write('out_time_us=%d\\nspeed=2.0x\\nprogress=continue\\n' % (i * 100000))\n"
+            "sys.stderr.write('progress=end\\n')\n"
+        )
+        tmp_out = tmp_path / "out.tmp.mkv"
+        tmp_out.write_bytes(b"")
+        final = tmp_path / "out.mkv"
+
+        events = []
+        ok, out, _msg = _run_ffmpeg_with_callback(
+            [sys.executable, "-c", script],
+            tmp_out,
+            final,
+            "TRANSCODE",
+            10000,
+            tmp_path / "in.mkv",
+            lambda path, progress: events.append(progress["stage"]),
+            min_interval=3600,
+        )
+
+        assert ok and out == final and final.exists()
+        assert events == ["encoding", "done"]
+
+
+class TestConvertFileHistory:
+    """Tests for skipping already converted files via history."""
+
+    def test_skips_probe_when_history_has_output(self, tmp_path, monkeypatch):
+        """Test convert_file returns the recorded output without analyzing the file."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        def fail_decide_for(path, cfg=None):
+            raise AssertionError("decide_for should not run")
+
+        monkeypatch.setattr(conv, "decide_for", fail_decide_for)
+
+        previous = tmp_path / "movie.h264.cast.mkv"
+
+        class FakeHistory:
+            def find_converted(self, path):
+                return previous
+
+        ok, out, msg = conv.convert_file(tmp_path / "movie.mkv", cfg=Config(), backend="cpu", history_db=FakeHistory())
+        assert (ok, out, msg) == (True, previous, "Output already exists")
+
+    def test_ignores_history_output_for_other_settings(self, tmp_path, monkeypatch):
+        """Test a recorded output the current settings would not produce is not reused."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        analyzed = []
+
+        def fake_decide_for(path, cfg=None):
+            analyzed.append(path)
+            raise RuntimeError("no ffprobe")
+
+        monkeypatch.setattr(conv, "decide_for", fake_decide_for)
+
+        cases = [
+            (tmp_path / "old" / "movie.h264.cast.mkv", Config()),
+            (tmp_path / "movie.h264.cast.mp4", Config()),
+            (tmp_path / "other.h264.cast.mkv", Config()),
+            (tmp_path / "movie.remux.cast.mkv", Config(skip_when_ok=True)),
+            (tmp_path / "movie.aac.cast.mkv", Config(force_h264=True)),
+            (tmp_path / "movie.h264.cast.mkv", Config(force_aac=True)),
+        ]
+
+        class FakeHistory:
+            def __init__(self, previous):
+                self.previous = previous
+
+            def find_converted(self, path):
+                return self.previous
+
+        for previous, cfg in cases:
+            ok, out, msg = conv.convert_file(
+                tmp_path / "movie.mkv", cfg=cfg, backend="cpu", output_dir=tmp_path, history_db=FakeHistory(previous)
+            )
+            assert (ok, out, msg) == (False, None, "Analysis failed: no ffprobe")
+        assert len(analyzed) == len(cases)
+
+    def test_changed_setting_forces_reencode(self, tmp_path, monkeypatch):
+        """Test a remux recorded before --force-h264 is re-encoded rather than reused."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        src = tmp_path / "movie.mkv"
+        src.write_bytes(b"x")
+        previous = tmp_path / "movie.remux.cast.mkv"
+        previous.write_bytes(b"x")
+
+        class FakeHistory:
+            def find_converted(self, path):
+                return previous
+
+        def fake_decide_for(path, cfg=None):
+            return conv.Decision(
+                need_v=cfg.force_h264,
+                need_a=False,
+                aidx=0,
+                add_silence=False,
+                reason_v="h264",
+                vcodec="h264",
+                vpix="yuv420p",
+                vbit=8,
+                vhdr=False,
+                vprof="High",
+                vlevel=41,
+                acodec="aac",
+                ach=2,
+                alang="eng",
+                format_name="matroska",
+            )
+
+        monkeypatch.setattr(conv, "decide_for", fake_decide_for)
+        monkeypatch.setattr(conv, "check_disk_space", lambda *args: None)
+
+        cfg = Config(skip_when_ok=False)
+        assert conv.convert_file(src, cfg=cfg, backend="cpu", history_db=FakeHistory()) == (
+            True,
+            previous,
+            "Output already exists",
+        )
+
+        ok, out, msg = conv.convert_file(
+            src, cfg=Config(skip_when_ok=False, force_h264=True, dryrun=True), backend="cpu", history_db=FakeHistory()
+        )
+        assert (ok, out) == (True, None)
+        assert msg.startswith("DRYRUN: ") and "movie.h264.cast.tmp." in msg
+
+
 class TestMakeProgressDict:
     """Tests for progress dictionary creation."""
 
@@ -307,6 +680,8 @@ class TestCodecDetection:
         assert parse_bitdepth_from_pix("yuv420p10le") == 10
         assert parse_bitdepth_from_pix("p010le") == 10
         assert parse_bitdepth_from_pix("p010") == 10
+        # Not in the lookup table: regex fallback
+        assert parse_bitdepth_from_pix("gbrp10le") == 10
 
     def test_parse_bitdepth_12bit(self):
         """Test 12-bit pixel format detection."""
@@ -331,6 +706,69 @@ class TestCodecDetection:
         assert is_audio_description("Dolby Surround") is False
 
 
+class TestTrackSelection:
+    """Tests for audio and subtitle track selection."""
+
+    @staticmethod
+    def _stream(index, codec_type, lang, title="", forced=0):
+        return {
+            "index": index,
+            "codec_type": codec_type,
+            "tags": {"language": lang, "title": title},
+            "disposition": {"forced": forced},
+        }
+
+    def test_select_audio_language_priority(self):
+        """Test the first requested language wins, skipping audio descriptions."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import select_audio_track
+
+        streams = [
+            self._stream(1, "audio", "eng"),
+            self._stream(2, "audio", "jpn", "Audio Description"),
+            self._stream(3, "audio", "jpn"),
+        ]
+        stream, lang = select_audio_track(streams, Config(audio_lang="jpn,eng"))
+
+        assert stream["index"] == 3
+        assert lang == "jpn"
+
+    def test_select_audio_french_default_then_first(self):
+        """Test the French default and the first-track fallback."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import select_audio_track
+
+        streams = [self._stream(1, "audio", "eng"), self._stream(2, "audio", "fre")]
+        assert select_audio_track(streams, Config())[0]["index"] == 2
+
+        streams = [self._stream(1, "audio", "eng"), self._stream(2, "audio", "ger")]
+        assert select_audio_track(streams, Config())[0]["index"] == 1
+
+    def test_select_subtitle_prefers_forced(self):
+        """Test forced subtitles win within a requested language."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import select_subtitle_track
+
+        streams = [
+            self._stream(3, "subtitle", "fre", "SDH"),
+            self._stream(4, "subtitle", "fre"),
+            self._stream(5, "subtitle", "fre", forced=1),
+        ]
+        result = select_subtitle_track(streams, "eng", Config(subtitle_lang="fre"))
+
+        assert result is not None
+        assert result[0]["index"] == 5
+        assert result[1] is True
+
+    def test_select_subtitle_none_by_default(self):
+        """Test no subtitle is selected without preferences."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import select_subtitle_track
+
+        streams = [self._stream(3, "subtitle", "fre")]
+        assert select_subtitle_track(streams, "fre", Config()) is None
+
+
 class TestBackendSelection:
     """Tests for backend selection."""
 
@@ -361,6 +799,43 @@ class TestBackendSelection:
         backend = pick_backend(cfg)
         assert backend == "qsv"
 
+    def test_pick_backend_auto_respects_priority(self, monkeypatch):
+        """Test auto selection picks the highest-priority working backend."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        monkeypatch.setattr(conv, "_backend_cache", {})
+        monkeypatch.setattr(conv, "have_encoder", lambda name: True)
+        monkeypatch.setattr(conv, "test_nvenc", lambda: False)
+        monkeypatch.setattr(conv, "test_amf", lambda: False)
+        monkeypatch.setattr(conv, "test_qsv", lambda device: True)
+        monkeypatch.setattr(conv, "test_vaapi", lambda device: True)
+
+        assert conv.pick_backend(Config(hw="auto")) == "qsv"
+
+    def test_pick_backend_auto_no_hw_encoders(self, monkeypatch):
+        """Test auto selection falls back to CPU without hardware encoders."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        monkeypatch.setattr(conv, "_backend_cache", {})
+        monkeypatch.setattr(conv, "have_encoder", lambda name: False)
+
+        assert conv.pick_backend(Config(hw="auto")) == "cpu"
+
+    def test_pick_backend_auto_cached(self, monkeypatch):
+        """Test auto-detection runs the probes only once per device."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        calls = []
+        monkeypatch.setattr(conv, "_backend_cache", {})
+        monkeypatch.setattr(conv, "_probe_backend", lambda device: calls.append(device) or "vaapi")
+
+        assert conv.pick_backend(Config(hw="auto")) == "vaapi"
+        assert conv.pick_backend(Config(hw="auto")) == "vaapi"
+        assert len(calls) == 1
+
     @pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg not available")
     def test_have_encoder(self):
         """Test encoder availability check."""
@@ -420,6 +895,17 @@ class TestVideoArgs:
         assert "-global_quality" in args
         assert "23" in args
 
+    def test_video_args_cpu_threads(self, default_config):
+        """Test CPU thread limit is only emitted when requested."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import video_args_for
+
+        cfg = Config()
+        assert "-threads" not in video_args_for("cpu", cfg)
+
+        args = video_args_for("cpu", cfg, threads=4)
+        assert args[args.index("-threads") + 1] == "4"
+
 
 class TestDecision:
     """Tests for conversion decision logic."""
@@ -461,6 +947,223 @@ class TestDecision:
         assert decision.need_v is True  # Forced transcode
         assert "force-h264" in decision.reason_v.lower()
 
+    def test_decide_for_duration_from_probe(self, monkeypatch):
+        """Test duration is taken from the same ffprobe output."""
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        probe = {
+            "format": {"format_name": "matroska,webm", "duration": "N/A"},
+            "streams": [
+                {"index": 0, "codec_type": "video", "codec_name": "hevc", "pix_fmt": "yuv420p", "duration": "12.5"},
+                {"index": 1, "codec_type": "audio", "codec_name": "aac", "channels": 2},
+            ],
+        }
+        monkeypatch.setattr(conv, "ffprobe_json", lambda path: probe)
+
+        decision = conv.decide_for(conv.Path("movie.mkv"), Config())
+
+        assert decision.duration_ms == 12500
+
+
+class TestDecideForMany:
+    """Tests for concurrent file analysis."""
+
+    def test_decide_for_many_preserves_order(self, monkeypatch):
+        """Test decisions are returned in input order."""
+        import time
+        from pathlib import Path
+
+        import mkv2cast.converter as conv
+
+        def fake_decide_for(path, cfg=None):
+            time.sleep(0.05 if path.name == "a.mkv" else 0)
+            return path.name
+
+        monkeypatch.setattr(conv, "decide_for", fake_decide_for)
+
+        paths = [Path("a.mkv"), Path("b.mkv"), Path("c.mkv")]
+        assert conv.decide_for_many(paths, max_workers=3) == ["a.mkv", "b.mkv", "c.mkv"]
+
+    def test_decide_for_many_empty(self):
+        """Test an empty input list."""
+        from mkv2cast.converter import decide_for_many
+
+        assert decide_for_many([]) == []
+
+
+class TestCpuPinning:
+    """Tests for splitting CPUs between concurrent encodes."""
+
+    def test_partition_cpus_disjoint(self, monkeypatch):
+        """Test each worker gets its own contiguous set of CPUs."""
+        import mkv2cast.converter as conv
+
+        monkeypatch.setattr(conv.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+
+        assert conv.partition_cpus(2) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        assert conv.partition_cpus(3) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+    def test_partition_cpus_not_enough_cpus(self, monkeypatch):
+        """Test pinning is disabled for a single worker or too few CPUs."""
+        import mkv2cast.converter as conv
+
+        monkeypatch.setattr(conv.os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+
+        assert conv.partition_cpus(1) == []
+        assert conv.partition_cpus(4) == []
+
+    def test_convert_batch_pins_only_overlapping_encodes(self, monkeypatch, tmp_path):
+        """Test CPU sets are sized for the files actually encoded at once."""
+        from pathlib import Path
+
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        pinned = {}
+
+        def fake_convert_file(input_path, cpu_set=None, **kwargs):
+            pinned[input_path.name] = cpu_set
+            return True, None, "ok"
+
+        monkeypatch.setattr(conv.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+        monkeypatch.setattr(conv, "convert_file", fake_convert_file)
+        cfg = Config(encode_workers=4)
+
+        conv.convert_batch([Path("a.mkv")], cfg=cfg, output_dir=tmp_path, backend="cpu")
+        assert pinned == {"a.mkv": None}
+
+        pinned.clear()
+        conv.convert_batch([Path("a.mkv"), Path("b.mkv")], cfg=cfg, output_dir=tmp_path, backend="cpu")
+        assert sorted(len(cpu_set) for cpu_set in pinned.values()) == [4, 4]
+
+    def test_convert_file_kills_ffmpeg_on_interrupt(self, monkeypatch, tmp_path):
+        """Test an interrupted wait does not leave ffmpeg running."""
+        import pytest
+
+        import mkv2cast.converter as conv
+        from mkv2cast.config import Config
+
+        class FakeProcess:
+            killed = False
+
+            def wait(self, timeout=None):
+                if not self.killed:
+                    raise KeyboardInterrupt
+                return -9
+
+            def kill(self):
+                self.killed = True
+
+        process = FakeProcess()
+        decision = conv.Decision(
+            need_v=True,
+            need_a=False,
+            aidx=0,
+            add_silence=False,
+            reason_v="hevc",
+            vcodec="hevc",
+            vpix="yuv420p",
+            vbit=8,
+            vhdr=False,
+            vprof="Main",
+            vlevel=120,
+            acodec="aac",
+            ach=2,
+            alang="eng",
+            format_name="matroska",
+        )
+        monkeypatch.setattr(conv, "decide_for", lambda path, cfg=None: decision)
+        monkeypatch.setattr(conv, "check_disk_space", lambda *args: None)
+        monkeypatch.setattr(conv, "build_transcode_cmd", lambda *args, **kwargs: (["ffmpeg"], "TRANSCODE"))
+        monkeypatch.setattr(conv, "spawn_ffmpeg_pinned", lambda cmd, cpu_set, **kwargs: process)
+
+        src = tmp_path / "movie.mkv"
+        src.write_bytes(b"")
+        with pytest.raises(KeyboardInterrupt):
+            conv.convert_file(src, cfg=Config(retry_attempts=0), backend="cpu", output_dir=tmp_path)
+        assert process.killed
+
+    def test_available_cpu_count_honours_affinity_and_quota(self, monkeypatch, tmp_path):
+        """Test the usable CPU count follows the affinity mask and cgroup quota."""
+        import builtins
+
+        import mkv2cast.converter as conv
+
+        cpu_max = tmp_path / "cpu.max"
+
+        def fake_open(path, *args, **kwargs):
+            if path == "/sys/fs/cgroup/cpu.max":
+                path = cpu_max
+            return builtins.open(path, *args, **kwargs)
+
+        monkeypatch.setattr(conv.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+        monkeypatch.setattr(conv, "open", fake_open, raising=False)
+
+        assert conv.available_cpu_count() == 8  # no cgroup file
+
+        cpu_max.write_text("max 100000\n")
+        assert conv.available_cpu_count() == 8
+
+        cpu_max.write_text("250000 100000\n")
+        assert conv.available_cpu_count() == 3
+
+    def test_total_ram_gb_honours_cgroup_limit(self, monkeypatch, tmp_path):
+        """Test physical RAM comes from sysconf and is capped by memory.max."""
+        import builtins
+
+        import mkv2cast.converter as conv
+
+        memory_max = tmp_path / "memory.max"
+
+        def fake_open(path, *args, **kwargs):
+            if path == "/sys/fs/cgroup/memory.max":
+                path = memory_max
+            return builtins.open(path, *args, **kwargs)
+
+        pages = {"SC_PHYS_PAGES": 4 * 1024 * 1024, "SC_PAGE_SIZE": 4096}  # 16 GiB
+        monkeypatch.setattr(conv.os, "sysconf", lambda name: pages[name], raising=False)
+        monkeypatch.setattr(conv, "open", fake_open, raising=False)
+
+        assert conv.total_ram_gb() == 16  # no cgroup file
+
+        memory_max.write_text("max\n")
+        assert conv.total_ram_gb() == 16
+
+        memory_max.write_text(f"{6 * 1024**3}\n")
+        assert conv.total_ram_gb() == 6
+
+        def broken_sysconf(name):
+            raise ValueError(name)
+
+        monkeypatch.setattr(conv.os, "sysconf", broken_sysconf, raising=False)
+        assert conv.total_ram_gb(default=4) == 4
+
+
+class TestDiskGuard:
+    """Tests for disk space and output quota guards."""
+
+    def test_check_disk_space(self, tmp_path):
+        """Test free space guard on output and temp directories."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import check_disk_space
+
+        assert check_disk_space(tmp_path, tmp_path, 0, Config(disk_min_free_mb=1)) is None
+
+        msg = check_disk_space(tmp_path, tmp_path, 0, Config(disk_min_free_mb=1 << 40))
+        assert msg is not None and "Insufficient free space" in msg
+
+    def test_enforce_output_quota(self, tmp_path):
+        """Test output size and ratio limits."""
+        from mkv2cast.config import Config
+        from mkv2cast.converter import enforce_output_quota
+
+        out = tmp_path / "out.mkv"
+        out.write_bytes(b"x" * 2000)
+
+        assert enforce_output_quota(out, 1000, Config()) is None
+        assert "max ratio" in enforce_output_quota(out, 1000, Config(max_output_ratio=1.5))
+
 
 class TestBuildCommand:
     """Tests for ffmpeg command building."""
@@ -602,3 +1305,46 @@ class TestGetOutputTag:
 
         tag = get_output_tag(decision)
         assert tag == ".remux"
+
+
+class TestMoveOutput:
+    """Tests for move_output."""
+
+    def test_same_filesystem_replace(self, tmp_path):
+        """Test a same-filesystem move is a plain rename that overwrites."""
+        from mkv2cast.converter import move_output
+
+        src, dst = tmp_path / "a.tmp", tmp_path / "a.mkv"
+        src.write_bytes(b"new")
+        dst.write_bytes(b"old")
+
+        move_output(src, dst)
+
+        assert dst.read_bytes() == b"new"
+        assert not src.exists()
+
+    def test_cross_device_falls_back(self, tmp_path, monkeypatch):
+        """Test EXDEV falls back to shutil.move while other errors propagate."""
+        import errno
+        import os
+
+        from mkv2cast.converter import move_output
+
+        src, dst = tmp_path / "a.tmp", tmp_path / "a.mkv"
+        src.write_bytes(b"data")
+        moved = []
+
+        def fake_replace(a, b):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        monkeypatch.setattr(os, "replace", fake_replace)
+        monkeypatch.setattr(shutil, "move", lambda a, b: moved.append((a, b)))
+        move_output(src, dst)
+        assert moved == [(str(src), str(dst))]
+
+        def fail_replace(a, b):
+            raise OSError(errno.EACCES, "denied")
+
+        monkeypatch.setattr(os, "replace", fail_replace)
+        with pytest.raises(OSError):
+            move_output(src, dst)
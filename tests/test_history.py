@@ -103,6 +103,10 @@ class TestHistoryDB:
         assert stats["by_status"].get("done", 0) == 3
         assert stats["by_status"].get("failed", 0) == 2
         assert stats["by_status"].get("skipped", 0) == 1
+        assert stats["avg_encode_time"] == 60
+        assert stats["total_encode_time"] == 180
+        assert stats["total_input_size"] == 3000000
+        assert stats["total_output_size"] == 2400000
 
     def test_clean_old(self, temp_state_dir):
         """Test cleaning old entries."""
@@ -121,6 +125,72 @@ class TestHistoryDB:
         recent = db.get_recent(10)
         assert len(recent) == 0
 
+    def test_connection_reused_per_thread(self, temp_state_dir):
+        """Test SQLite connections are kept per thread and use WAL."""
+        import threading
+
+        from mkv2cast.history import SQLITE_AVAILABLE, HistoryDB
+
+        if not SQLITE_AVAILABLE:
+            return
+
+        db = HistoryDB(temp_state_dir)
+        conn = db._conn()
+        assert db._conn() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(db._conn()))
+        t.start()
+        t.join()
+        assert other[0] is not conn
+
+        db.close()
+        assert db._conn() is not conn
+
+    def test_queued_writes_visible_after_flush(self, temp_state_dir):
+        """Test background-written rows from several threads are all committed."""
+        import threading
+
+        from mkv2cast.history import HistoryDB
+
+        db = HistoryDB(temp_state_dir)
+
+        def worker(n):
+            for i in range(25):
+                db.record_skip(Path(f"/test/{n}_{i}.mkv"), "already done", "cpu")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        db.flush()
+        assert db.get_stats()["by_status"]["skipped"] == 100
+
+    def test_find_converted(self, temp_state_dir, tmp_path):
+        """Test lookup of a previous successful conversion."""
+        from mkv2cast.history import HistoryDB
+
+        src = tmp_path / "movie.mkv"
+        src.write_bytes(b"x" * 100)
+        out = tmp_path / "movie.h264.cast.mkv"
+
+        db = HistoryDB(temp_state_dir)
+        entry_id = db.record_start(src, "cpu", 100)
+        db.record_finish(entry_id, out, "done")
+
+        # Output missing
+        assert db.find_converted(src) is None
+
+        out.write_bytes(b"y")
+        assert db.find_converted(src) == out
+
+        # Input changed since the conversion
+        src.write_bytes(b"x" * 200)
+        assert db.find_converted(src) is None
+
 
 class TestHistoryDBFallback:
     """Tests for JSONL fallback behavior."""
@@ -149,3 +219,61 @@ class TestHistoryDBFallback:
         lines = log_path.read_text().strip().split("\n")
         for line in lines:
             json.loads(line)  # Should not raise
+
+    def test_jsonl_clean_old_then_append(self, temp_state_dir, monkeypatch):
+        """Test the JSONL handle is reopened after the log is rewritten."""
+        import mkv2cast.history
+
+        monkeypatch.setattr(mkv2cast.history, "SQLITE_AVAILABLE", False)
+
+        from mkv2cast.history import HistoryDB
+
+        db = HistoryDB(temp_state_dir)
+        db.record_skip(Path("/test/a.mkv"), "already done", "cpu")
+        assert db.clean_old(1) == 0
+
+        db.record_skip(Path("/test/b.mkv"), "already done", "cpu")
+        db.close()
+
+        lines = (temp_state_dir / "history.log").read_text().strip().split("\n")
+        assert len(lines) == 2
+
+    def test_jsonl_index_tracks_appends(self, temp_state_dir, monkeypatch):
+        """Test JSONL reads stay in sync with records written after the first read."""
+        import mkv2cast.history
+
+        monkeypatch.setattr(mkv2cast.history, "SQLITE_AVAILABLE", False)
+
+        from mkv2cast.history import HistoryDB
+
+        db = HistoryDB(temp_state_dir)
+        entry_id = db.record_start(Path("/test/video.mkv"), "cpu", 1000)
+        assert db.get_recent(5)[0]["status"] == "running"
+
+        db.record_finish(entry_id, Path("/test/video.cast.mkv"), "done", encode_time=10.0, output_size=500)
+        recent = db.get_recent(5)
+        assert recent[0]["status"] == "done"
+        assert recent[0]["input_size"] == 1000
+
+        recent[0]["status"] = "mutated"
+        assert db.get_stats()["by_status"] == {"done": 1}
+        assert HistoryDB(temp_state_dir).get_recent(5)[0]["status"] == "done"
+
+    def test_jsonl_find_converted(self, temp_state_dir, tmp_path, monkeypatch):
+        """Test lookup of a previous conversion in the JSONL log."""
+        import mkv2cast.history
+
+        monkeypatch.setattr(mkv2cast.history, "SQLITE_AVAILABLE", False)
+
+        from mkv2cast.history import HistoryDB
+
+        src = tmp_path / "movie.mkv"
+        src.write_bytes(b"x" * 100)
+        out = tmp_path / "movie.h264.cast.mkv"
+        out.write_bytes(b"y")
+
+        db = HistoryDB(temp_state_dir)
+        db.record_finish(db.record_start(src, "cpu", 100), out, "done")
+
+        assert db.find_converted(src) == out
+        assert db.find_converted(tmp_path / "other.mkv") is None
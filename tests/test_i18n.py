@@ -61,6 +61,39 @@ class TestTranslationFunction:
         result = _("Summary")
         assert result == "Summary"  # Should return same string
 
+    def test_translation_follows_language_change(self):
+        """Test cached translations are not reused after switching language."""
+        from mkv2cast.i18n import _, setup_i18n
+
+        setup_i18n("fr")
+        assert _("Summary") == "Résumé"
+
+        setup_i18n("en")
+        assert _("Summary") == "Summary"
+
+    def test_current_language_tracks_setup(self, monkeypatch):
+        """Test get_current_language reports the configured language."""
+        from mkv2cast.i18n import get_current_language, reset_i18n, setup_i18n
+
+        monkeypatch.setenv("MKV2CAST_LANG", "es")
+
+        setup_i18n("de")
+        assert get_current_language() == "de"
+
+        reset_i18n()
+        assert get_current_language() == "es"
+
+    def test_catalog_pretranslated_on_setup(self):
+        """Test catalog strings are resolved once at setup and dropped on reset."""
+        import mkv2cast.i18n as i18n
+
+        i18n.setup_i18n("fr")
+        assert i18n._PRETRANSLATED["Summary"] == "Résumé"
+        assert set(i18n._PRETRANSLATED) == set(i18n.TRANSLATION_CATALOG)
+
+        i18n.reset_i18n()
+        assert i18n._PRETRANSLATED == {}
+
     def test_translation_function_without_setup(self):
         """Test that _ works even without explicit setup."""
         from mkv2cast.i18n import _
@@ -181,6 +214,16 @@ class TestLanguageDetection:
         lang = detect_system_language()
         assert lang == "fr"
 
+    def test_detect_language_skips_unsupported_var(self, monkeypatch):
+        """Test an unsupported value does not stop the scan of lower-priority variables."""
+        from mkv2cast.i18n import detect_system_language
+
+        monkeypatch.setenv("MKV2CAST_LANG", "xx")
+        monkeypatch.delenv("LANGUAGE", raising=False)
+        monkeypatch.setenv("LC_ALL", "de_DE.UTF-8")
+
+        assert detect_system_language() == "de"
+
     def test_detect_language_unsupported_fallback(self, monkeypatch):
         """Test fallback for unsupported language."""
         import locale
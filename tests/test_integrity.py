@@ -61,6 +61,23 @@ class TestRunQuiet:
         assert result is False
 
 
+class TestFileStat:
+    """Tests for file_stat function."""
+
+    def test_file_stat(self, temp_dir):
+        """Test size and mtime come from one stat call."""
+        import os
+
+        from mkv2cast.integrity import file_stat
+
+        test_file = temp_dir / "test.txt"
+        test_file.write_bytes(b"x" * 1000)
+
+        st = os.stat(test_file)
+        assert file_stat(test_file) == (1000, st.st_mtime_ns)
+        assert file_stat(temp_dir / "nonexistent.txt") is None
+
+
 class TestCheckFileStable:
     """Tests for file stability checking."""
 
@@ -96,6 +113,55 @@ class TestCheckFileStable:
         result = check_file_stable(test_file, wait_seconds=1)
         assert result is True
 
+    def test_wait_until_stable_file_at_rest(self, temp_dir):
+        """Test files untouched for longer than the window pass without sleeping."""
+        import os
+        import time
+
+        from mkv2cast.integrity import wait_until_stable
+
+        test_file = temp_dir / "old.mkv"
+        test_file.write_bytes(b"x" * 100)
+        old = time.time() - 60
+        os.utime(test_file, (old, old))
+
+        start = time.monotonic()
+        assert wait_until_stable(test_file, 30) is True
+        assert time.monotonic() - start < 1
+
+    def test_wait_until_stable_detects_writes(self, temp_dir):
+        """Test a file written to during the window is reported unstable."""
+        import threading
+
+        from mkv2cast.integrity import wait_until_stable
+
+        test_file = temp_dir / "growing.mkv"
+        test_file.write_bytes(b"x" * 100)
+
+        def append():
+            with test_file.open("ab") as f:
+                f.write(b"y" * 100)
+
+        timer = threading.Timer(0.1, append)
+        timer.start()
+        try:
+            assert wait_until_stable(test_file, 0.5) is False
+        finally:
+            timer.join()
+
+    def test_wait_until_stable_stop_event(self, temp_dir):
+        """Test a set stop event aborts the wait."""
+        import threading
+
+        from mkv2cast.integrity import wait_until_stable
+
+        test_file = temp_dir / "new.mkv"
+        test_file.write_bytes(b"x" * 100)
+        stop = threading.Event()
+        stop.set()
+
+        assert wait_until_stable(test_file, 30, stop) is False
+
 
 class TestCheckFfprobeValid:
     """Tests for ffprobe validation."""
@@ -182,3 +248,201 @@ class TestIntegrityCheck:
 
         assert len(callbacks) > 0
         assert any(cb[0] == "CHECK" for cb in callbacks)
+
+    def test_integrity_check_batch(self, temp_dir):
+        """Test batch checks yield one result per file."""
+        from mkv2cast.integrity import integrity_check_batch
+
+        small = temp_dir / "small.mkv"
+        small.write_bytes(b"x" * 100)
+        paths = [small, temp_dir / "missing.mkv"]
+
+        results = list(integrity_check_batch(paths, workers=2, stable_wait=0))
+        assert sorted(r[0] for r in results) == sorted(paths)
+        assert all(ok is False for _p, ok, _t in results)
+
+        results = list(integrity_check_batch(paths, workers=2, enabled=False))
+        assert all(ok is True for _p, ok, _t in results)
+        assert list(integrity_check_batch([])) == []
+
+
+class TestDeepDecodeBatch:
+    """Tests for batched deep-decode verification."""
+
+    def test_concat_entry_escapes_quotes(self, temp_dir):
+        """Test single quotes in paths are escaped for the concat demuxer."""
+        from mkv2cast.integrity import _concat_entry
+
+        entry = _concat_entry(temp_dir / "it's.mkv")
+        assert entry == f"file '{temp_dir}/it'\\''s.mkv'\n"
+
+    def test_batch_single_ffmpeg_on_success(self, temp_dir, monkeypatch):
+        """Test a clean batch decode marks every file good without per-file runs."""
+        from pathlib import Path
+
+        import mkv2cast.integrity as integrity
+
+        paths = [temp_dir / "a.mkv", temp_dir / "b.mkv"]
+        lists = []
+
+        def fake_run_quiet(cmd, timeout=10.0):
+            lists.append(Path(cmd[cmd.index("-i") + 1]).read_text(encoding="utf-8"))
+            return True
+
+        monkeypatch.setattr(integrity, "run_quiet", fake_run_quiet)
+        monkeypatch.setattr(integrity, "check_deep_decode", lambda *a, **k: pytest.fail("per-file decode"))
+
+        assert integrity.check_deep_decode_batch(paths) == {paths[0]: True, paths[1]: True}
+        assert lists == ["".join(integrity._concat_entry(p) for p in paths)]
+
+    def test_batch_falls_back_per_file(self, temp_dir, monkeypatch):
+        """Test a failed batch decode re-checks files individually."""
+        import mkv2cast.integrity as integrity
+
+        paths = [temp_dir / "a.mkv", temp_dir / "b.mkv"]
+        monkeypatch.setattr(integrity, "run_quiet", lambda cmd, timeout=10.0: False)
+        monkeypatch.setattr(integrity, "check_deep_decode", lambda p, log_path=None: p.name == "a.mkv")
+
+        assert integrity.check_deep_decode_batch(paths) == {paths[0]: True, paths[1]: False}
+
+    def test_integrity_check_batch_deep(self, temp_dir, monkeypatch):
+        """Test integrity_check_batch deep-decodes only files passing the quick checks."""
+        import mkv2cast.integrity as integrity
+
+        good, bad = temp_dir / "good.mkv", temp_dir / "bad.mkv"
+        decoded = []
+
+        def fake_check(path, **kwargs):
+            assert "deep_check" not in kwargs
+            return path == good, 0.0
+
+        def fake_batch(paths, log_path=None):
+            decoded.extend(paths)
+            return dict.fromkeys(paths, True)
+
+        monkeypatch.setattr(integrity, "integrity_check", fake_check)
+        monkeypatch.setattr(integrity, "check_deep_decode_batch", fake_batch)
+
+        results = {p: ok for p, ok, _t in integrity.integrity_check_batch([good, bad], deep_check=True)}
+        assert results == {good: True, bad: False}
+        assert decoded == [good]
+
+
+class TestFFProbeWorker:
+    """Tests for the long-lived probe worker."""
+
+    @staticmethod
+    def _worker(script):
+        import sys
+
+        from mkv2cast.integrity import FFProbeWorker
+
+        return FFProbeWorker(cmd=[sys.executable, "-c", script])
+
+    def test_worker_answers_per_path(self, temp_dir):
+        """Test one child process answers several requests."""
+        worker = self._worker(
+            "import os, sys\nfor line in sys.stdin:\n    print('1' if os.path.exists(line[:-1]) else '0', flush=True)\n"
+        )
+        good = temp_dir / "good.mkv"
+        good.write_bytes(b"x")
+        try:
+            assert worker.submit(good) is True
+            pid = worker._proc.pid
+            assert worker.submit(temp_dir / "missing.mkv") is False
+            assert worker._proc.pid == pid
+        finally:
+            worker.close()
+        assert worker._proc is None
+
+    def test_worker_crash_returns_none(self, temp_dir):
+        """Test a dead child yields None so callers fall back to ffprobe."""
+        worker = self._worker("import sys; sys.stdin.readline(); sys.exit(1)")
+        try:
+            assert worker.submit(temp_dir / "a.mkv") is None
+            assert worker.submit(temp_dir / "a\nb.mkv") is None
+        finally:
+            worker.close()
+
+    @pytest.mark.skipif(__import__("os").name != "posix", reason="timeout needs select() on pipes")
+    def test_worker_timeout(self, temp_dir):
+        """Test a hung child is killed and the file reported invalid."""
+        worker = self._worker("import time; time.sleep(60)")
+        try:
+            assert worker.submit(temp_dir / "a.mkv", timeout=0.2) is False
+            assert worker._proc is None
+        finally:
+            worker.close()
+
+    def test_check_ffprobe_valid_uses_worker(self, temp_dir, monkeypatch):
+        """Test check_ffprobe_valid prefers the worker and falls back on None."""
+        import mkv2cast.integrity as integrity
+
+        class FakeWorker:
+            def __init__(self, answer):
+                self.answer = answer
+
+            def submit(self, path, timeout=8.0):
+                return self.answer
+
+        probed = []
+        monkeypatch.setattr(integrity, "ffprobe_json", lambda path, timeout=None: probed.append(path) or {})
+        monkeypatch.setattr(integrity, "_get_probe_worker", lambda: FakeWorker(False))
+        assert integrity.check_ffprobe_valid(temp_dir / "a.mkv") is False
+        assert probed == []
+
+        monkeypatch.setattr(integrity, "_get_probe_worker", lambda: FakeWorker(None))
+        assert integrity.check_ffprobe_valid(temp_dir / "a.mkv") is True
+        assert probed == [temp_dir / "a.mkv"]
+
+    def test_batch_closes_its_workers(self, temp_dir, monkeypatch):
+        """Test the per-thread workers of a batch are closed when it finishes."""
+        import mkv2cast.integrity as integrity
+
+        class FakeWorker:
+            instances = []
+
+            def __init__(self):
+                self.closed = False
+                FakeWorker.instances.append(self)
+
+            def close(self):
+                self.closed = True
+
+        def fake_integrity_check(path, **kwargs):
+            integrity._get_probe_worker()
+            return True, 0.0
+
+        monkeypatch.setattr(integrity, "AV_AVAILABLE", True)
+        monkeypatch.setattr(integrity, "FFProbeWorker", FakeWorker)
+        monkeypatch.setattr(integrity, "integrity_check", fake_integrity_check)
+
+        paths = [temp_dir / f"{i}.mkv" for i in range(6)]
+        assert len(list(integrity.integrity_check_batch(paths, workers=3))) == 6
+        assert 1 <= len(FakeWorker.instances) <= 3
+        assert all(w.closed for w in FakeWorker.instances)
+        assert integrity._probe_worker_owners == []
+
+    def test_check_ffprobe_valid_fallback_feeds_probe_cache(self, temp_dir, monkeypatch):
+        """Test the ffprobe fallback leaves a probe that decide_for can reuse."""
+        import mkv2cast.converter as conv
+        import mkv2cast.integrity as integrity
+
+        calls = []
+
+        def fake_check_output(cmd, **kwargs):
+            calls.append(kwargs.get("timeout"))
+            return b'{"format": {"duration": "1"}, "streams": []}'
+
+        monkeypatch.setattr(conv.subprocess, "check_output", fake_check_output)
+        monkeypatch.setattr(integrity, "_get_probe_worker", lambda: None)
+        conv.set_probe_cache_dir(None)
+
+        f = temp_dir / "a.mkv"
+        f.write_bytes(b"x")
+        try:
+            assert integrity.check_ffprobe_valid(f, timeout=5.0) is True
+            assert conv.ffprobe_json(f)["format"]["duration"] == "1"
+            assert calls == [5.0]
+        finally:
+            conv.set_probe_cache_dir(None)
@@ -0,0 +1,191 @@
+"""
+Tests for the JSON progress output module.
+"""
+
+import io
+import json
+from pathlib import Path
+
+
+class TestJSONProgressOutput:
+    """Tests for JSONProgressOutput."""
+
+    def test_emit_matches_dataclass_layout(self):
+        """Test emitted events serialize the full state like dataclasses.asdict."""
+        from dataclasses import asdict
+
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream)
+        out.start(total_files=1, backend="cpu", encode_workers=1, integrity_workers=1)
+        out.file_queued(Path("/videos/movie.mkv"), duration_ms=60000)
+        out.file_encoding_start(Path("/videos/movie.mkv"))
+
+        event = json.loads(stream.getvalue().splitlines()[-1])
+        expected = asdict(out.state)
+        expected["current_encoding"] = ["movie.mkv"]
+        expected["current_checking"] = []
+        expected["file"] = "movie.mkv"
+        assert event == expected
+        assert event["event"] == "file_start"
+        assert event["files"]["/videos/movie.mkv"]["status"] == "encoding"
+
+    def test_progress_events_coalesced(self):
+        """Test rapid progress updates are coalesced while state stays current."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=3600)
+        path = Path("/videos/movie.mkv")
+        out.start(total_files=1, backend="cpu", encode_workers=1, integrity_workers=1)
+        out.file_encoding_start(path, duration_ms=60000)
+
+        for ms in (1000, 2000, 3000):
+            out.file_progress(path, time_ms=ms)
+        out.file_progress(path, time_ms=60000)
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        progress = [e for e in events if e["event"] == "progress"]
+        assert [e["files"][str(path)]["current_time_ms"] for e in progress] == [1000, 60000]
+
+    def test_overall_counts_only_encoding_files(self):
+        """Test overall percent weighs in-flight encodes and drops finished ones."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        out = JSONProgressOutput(stream=io.StringIO(), min_emit_interval=0)
+        a, b = Path("/videos/a.mkv"), Path("/videos/b.mkv")
+        out.start(total_files=4, backend="cpu", encode_workers=2, integrity_workers=1)
+        out.file_encoding_start(a, duration_ms=1000)
+        out.file_encoding_start(b, duration_ms=1000)
+        out.file_progress(a, time_ms=500)
+        out.file_progress(b, time_ms=250)
+        assert out.state.overall.overall_percent == 75 / 4
+
+        out.file_done(a)
+        out.file_progress(b, time_ms=500)
+        assert out._encoding_keys == {str(b)}
+        assert out.state.overall.overall_percent == 150 / 4
+
+    def test_delta_mode_emits_changed_file_only(self):
+        """Test delta mode sends only the changed file in progress and file_done events."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=0, delta=True)
+        a, b = Path("/videos/a.mkv"), Path("/videos/b.mkv")
+        out.file_queued(a, duration_ms=1000)
+        out.file_queued(b, duration_ms=1000)
+        out.start(total_files=2, backend="cpu", encode_workers=1, integrity_workers=1)
+        out.file_encoding_start(a)
+        out.file_progress(a, time_ms=500)
+        out.file_done(a)
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert set(events[0]["files"]) == {str(a), str(b)}
+        progress, done = events[-2], events[-1]
+        assert progress["event"] == "progress"
+        assert "files" not in progress
+        assert set(progress["files_delta"]) == {str(a)}
+        assert progress["files_delta"][str(a)]["progress_percent"] == 50.0
+        assert done["files_delta"][str(a)]["status"] == "done"
+        assert done["status"] == "done"
+        assert done["overall"]["processed_files"] == 1
+
+    def test_delta_coalescing_keeps_other_files(self):
+        """Test a file's throttled ticks are sent with the next coalesced event."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=3600, delta=True)
+        a, b = Path("/videos/a.mkv"), Path("/videos/b.mkv")
+        out.start(total_files=2, backend="cpu", encode_workers=2, integrity_workers=1)
+        out.file_encoding_start(a, duration_ms=1000)
+        out.file_encoding_start(b, duration_ms=1000)
+
+        out.file_progress(a, time_ms=100)
+        out.file_progress(b, time_ms=400)  # throttled by a's tick
+        out.file_progress(a, time_ms=1000)  # 100% always goes out
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        progress = [e["files_delta"] for e in events if e["event"] == "progress"]
+        assert [set(delta) for delta in progress] == [{str(a)}, {str(a), str(b)}]
+        assert progress[1][str(b)]["current_time_ms"] == 400
+
+    def test_current_lists_keep_order(self):
+        """Test in-flight file names are emitted as ordered lists."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=0)
+        out.start(total_files=3, backend="cpu", encode_workers=3, integrity_workers=1)
+        for name in ("c.mkv", "a.mkv", "b.mkv"):
+            out.file_encoding_start(Path("/videos") / name, duration_ms=1000)
+        out.file_done(Path("/videos/a.mkv"))
+
+        event = json.loads(stream.getvalue().splitlines()[-1])
+        assert event["current_encoding"] == ["c.mkv", "b.mkv"]
+        assert event["current_checking"] == []
+
+    def test_string_keys_accepted(self):
+        """Test progress and completion can be reported with the str(path) key."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=0)
+        path = Path("/videos/movie.mkv")
+        out.start(total_files=1, backend="cpu", encode_workers=1, integrity_workers=1)
+        out.file_encoding_start(path, duration_ms=1000)
+        out.file_progress(str(path), time_ms=250)
+        assert out.state.files[str(path)].progress_percent == 25.0
+
+        out.file_done(str(path))
+        done = json.loads(stream.getvalue().splitlines()[-1])
+        assert done["file"] == "movie.mkv"
+        assert done["status"] == "done"
+        assert not out.state.current_encoding
+
+    def test_threaded_writer_preserves_order(self):
+        """Test the background writer delivers every event in order once flushed."""
+        from mkv2cast.json_progress import JSONProgressOutput
+
+        stream = io.StringIO()
+        out = JSONProgressOutput(stream=stream, min_emit_interval=0, threaded=True)
+        path = Path("/videos/movie.mkv")
+        out.start(total_files=1, backend="cpu", encode_workers=1, integrity_workers=1)
+        out.file_encoding_start(path, duration_ms=100000)
+        for ms in range(0, 100000, 500):
+            out.file_progress(path, time_ms=ms)
+        out.file_done(path)
+        out.complete()
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [e["event"] for e in events[:2]] == ["start", "file_start"]
+        assert [e["event"] for e in events[-2:]] == ["file_done", "complete"]
+        times = [e["files"][str(path)]["current_time_ms"] for e in events if e["event"] == "progress"]
+        assert times == list(range(0, 100000, 500))
+
+
+class TestParseFFmpegProgressForJSON:
+    """Tests for stats-line parsing used by JSON mode."""
+
+    def test_parse_stats_line(self):
+        """Test all fields of a typical ffmpeg stats line."""
+        from mkv2cast.json_progress import parse_ffmpeg_progress_for_json
+
+        line = "frame=  120 fps= 30.0 q=28.0 size=    1024kB time=00:00:04.00 bitrate=2097.2kbits/s speed=1.5x"
+        assert parse_ffmpeg_progress_for_json(line) == {
+            "frame": 120,
+            "fps": 30.0,
+            "size_bytes": 1024 * 1024,
+            "time_ms": 4000,
+            "bitrate": "2097.2kbits/s",
+            "speed": "1.5x",
+        }
+
+    def test_parse_skips_unavailable_values(self):
+        """Test N/A and malformed values are left out."""
+        from mkv2cast.json_progress import parse_ffmpeg_progress_for_json
+
+        result = parse_ffmpeg_progress_for_json("frame=abc time=N/A bitrate=N/A speed=N/A")
+        assert result == {"bitrate": "N/A", "speed": "N/A"}
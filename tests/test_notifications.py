@@ -30,6 +30,19 @@ class TestNotificationSupport:
         has_notify_send = shutil.which("notify-send") is not None
         assert NOTIFY_SEND_AVAILABLE == has_notify_send
 
+    def test_probes_are_lazy_and_cached(self):
+        """Capability probes run on first use only and are memoized."""
+        from mkv2cast.notifications import has_notify_send, has_plyer
+
+        has_notify_send.cache_clear()
+        has_plyer.cache_clear()
+        assert has_notify_send.cache_info().currsize == 0
+
+        first = has_notify_send()
+        assert has_notify_send() is first
+        assert has_notify_send.cache_info().hits == 1
+        assert has_plyer() is has_plyer()
+
 
 class TestSendNotification:
     """Tests for send_notification function."""
@@ -38,8 +51,8 @@ class TestSendNotification:
         """Test notification when no backend available."""
         import mkv2cast.notifications
 
-        monkeypatch.setattr(mkv2cast.notifications, "NOTIFY_SEND_AVAILABLE", False)
-        monkeypatch.setattr(mkv2cast.notifications, "PLYER_AVAILABLE", False)
+        monkeypatch.setattr(mkv2cast.notifications, "has_notify_send", lambda: False)
+        monkeypatch.setattr(mkv2cast.notifications, "has_plyer", lambda: False)
 
         from mkv2cast.notifications import send_notification
 
@@ -54,17 +54,145 @@ class TestPipelineOrchestrator:
         assert pipeline.integrity_workers_count == 1
         assert len(pipeline.targets) == 2
 
+    def test_analysis_overlaps_integrity_check(self, mock_ui, mock_config, tmp_path, monkeypatch):
+        """Test decide_for starts after the stability checks and overlaps the ffprobe stage."""
+        pytest.importorskip("rich")
+        import mkv2cast.pipeline as pipeline_mod
+        from mkv2cast.converter import Decision
+
+        probed = threading.Event()
+
+        def fake_decide(path, cfg):
+            probed.set()
+            return Decision(
+                need_v=True,
+                need_a=False,
+                aidx=0,
+                add_silence=False,
+                reason_v="test",
+                vcodec="hevc",
+                vpix="yuv420p",
+                vbit=8,
+                vhdr=False,
+                vprof="",
+                vlevel=0,
+                acodec="aac",
+                ach=2,
+                alang="eng",
+                format_name="matroska",
+            )
+
+        probed_before_stable = []
+
+        def fake_integrity(inp, ui, worker_id, filename, log_path, stop_event, cfg, initial=None, on_stable=None):
+            # Size and stability checks: nothing is analyzed yet
+            probed_before_stable.append(probed.wait(timeout=0.1))
+            on_stable()
+            # ffprobe stage: only succeeds if the analysis runs alongside it
+            return probed.wait(timeout=2), 0.0
+
+        monkeypatch.setattr(pipeline_mod, "decide_for", fake_decide)
+        monkeypatch.setattr(pipeline_mod, "integrity_check_with_progress", fake_integrity)
+        monkeypatch.setattr(pipeline_mod, "build_transcode_cmd", lambda *a, **k: (["ffmpeg"], "TRANSCODE"))
+
+        target = tmp_path / "video.mkv"
+        target.touch()
+        orchestrator = pipeline_mod.PipelineOrchestrator(
+            targets=[target],
+            backend="cpu",
+            ui=mock_ui,
+            cfg=mock_config,
+            encode_workers=1,
+            integrity_workers=1,
+            get_log_path=lambda p: tmp_path / f"{p.stem}.log",
+            get_tmp_path=lambda p, w, t: tmp_path / f"{p.stem}.tmp.{w}{t}.mkv",
+            output_exists_fn=lambda p, c: False,
+        )
+        try:
+            orchestrator.integrity_worker(0)
+        finally:
+            orchestrator._probe_executor.shutdown()
+
+        mock_ui.mark_skipped.assert_called_once_with(target, "dryrun")
+        assert probed_before_stable == [False]
+
+    def test_unstable_file_not_analyzed(self, mock_ui, mock_config, tmp_path, monkeypatch):
+        """Test a file failing the size/stability checks is never probed."""
+        pytest.importorskip("rich")
+        import mkv2cast.pipeline as pipeline_mod
+
+        def fail_decide(path, cfg):
+            raise AssertionError("decide_for should not run")
+
+        def fake_integrity(inp, ui, worker_id, filename, log_path, stop_event, cfg, initial=None, on_stable=None):
+            return False, 0.0
+
+        monkeypatch.setattr(pipeline_mod, "decide_for", fail_decide)
+        monkeypatch.setattr(pipeline_mod, "integrity_check_with_progress", fake_integrity)
+
+        target = tmp_path / "video.mkv"
+        target.touch()
+        orchestrator = pipeline_mod.PipelineOrchestrator(
+            targets=[target],
+            backend="cpu",
+            ui=mock_ui,
+            cfg=mock_config,
+            encode_workers=1,
+            integrity_workers=1,
+            get_log_path=lambda p: tmp_path / f"{p.stem}.log",
+            get_tmp_path=lambda p, w, t: tmp_path / f"{p.stem}.tmp.{w}{t}.mkv",
+            output_exists_fn=lambda p, c: False,
+        )
+        try:
+            orchestrator.integrity_worker(0)
+        finally:
+            orchestrator._probe_executor.shutdown()
+
+        mock_ui.mark_skipped.assert_called_once_with(target, "integrity failed")
+
+    def test_output_exists_records_single_skip(self, mock_ui, mock_config, tmp_path):
+        """Test an existing output is skipped with one history record and no start entry."""
+        pytest.importorskip("rich")
+        from mkv2cast.pipeline import PipelineOrchestrator
+
+        target = tmp_path / "video.mkv"
+        target.touch()
+        history = MagicMock()
+        orchestrator = PipelineOrchestrator(
+            targets=[target],
+            backend="cpu",
+            ui=mock_ui,
+            cfg=mock_config,
+            encode_workers=1,
+            integrity_workers=1,
+            get_log_path=lambda p: tmp_path / f"{p.stem}.log",
+            get_tmp_path=lambda p, w, t: tmp_path / f"{p.stem}.tmp.{w}{t}.mkv",
+            output_exists_fn=lambda p, c: True,
+            history=history,
+        )
+        try:
+            orchestrator.integrity_worker(0)
+        finally:
+            orchestrator._probe_executor.shutdown()
+
+        history.skip.assert_called_once_with(target, "output exists")
+        history.start.assert_not_called()
+        history.finish.assert_not_called()
+
     def test_auto_detect_workers(self, monkeypatch):
         """Test auto_detect_workers function."""
         pytest.importorskip("rich")
         from mkv2cast.pipeline import auto_detect_workers
 
-        monkeypatch.setattr("os.cpu_count", lambda: 8)
+        monkeypatch.setattr("mkv2cast.pipeline.available_cpu_count", lambda: 8)
 
         encode, integrity = auto_detect_workers()
         assert encode >= 1
         assert integrity >= 1
 
+        monkeypatch.setattr("mkv2cast.pipeline.available_cpu_count", lambda: 1)
+        assert auto_detect_workers()[1] == 1
+
 
 class TestFFmpegProgress:
     """Tests for ffmpeg progress parsing."""
@@ -116,6 +244,178 @@ class TestFFmpegProgress:
         assert speed == ""
         assert out_ms == 0
 
+    def test_iter_output_lines_splits_cr_and_lf(self):
+        """Test chunked reads yield CR- and LF-terminated lines across chunk edges."""
+        pytest.importorskip("rich")
+        import os
+
+        from mkv2cast.pipeline import _iter_output_lines
+
+        r, w = os.pipe()
+        os.write(w, b"Input #0\nframe=1 time=00:00:01.00\r")
+        os.write(w, b"frame=2 time=00:00:0")
+        os.write(w, b"2.00\r\nout_time_us=1\nprogress=end")
+        os.close(w)
+        with os.fdopen(r, "rb") as stream:
+            lines = list(_iter_output_lines(stream))
+
+        assert lines == [
+            b"Input #0",
+            b"frame=1 time=00:00:01.00",
+            b"frame=2 time=00:00:02.00",
+            b"out_time_us=1",
+            b"progress=end",
+        ]
+
+    def test_run_ffmpeg_with_progress_logs_and_reports(self, tmp_path):
+        """Test non-progress stderr lines go to the log and progress reaches the UI."""
+        pytest.importorskip("rich")
+        import sys
+
+        from mkv2cast.pipeline import run_ffmpeg_with_progress
+
+        script = (
+            "import sys\n"
+            "sys.stderr.write('Stream #0:0: Video: h264\\n')\n"
+            "sys.stderr.write('out_time_us=30000000\\nspeed=2.0x\\nprogress=continue\\n')\n"
+            "sys.stderr.write('out_time_us=60000000\\nspeed=2.0x\\nprogress=end\\n')\n"
+        )
+        ui = MagicMock()
+        log_path = tmp_path / "encode.log"
+
+        rc = run_ffmpeg_with_progress(
+            [sys.executable, "-c", script], ui, 0, "ENCODE", "a.mkv", 60000, log_path, tmp_path / "a.mkv"
+        )
+
+        assert rc == 0
+        assert log_path.read_bytes() == b"Stream #0:0: Video: h264\n"
+        pcts = [c.args[2] for c in ui.update_encode.call_args_list]
+        assert pcts == [50, 100]
+
+    def test_run_ffmpeg_with_progress_throttles_speed_only_updates(self, tmp_path):
+        """Test speed-only changes are rate limited while percentage steps always go out."""
+        pytest.importorskip("rich")
+        import sys
+
+        from mkv2cast.pipeline import run_ffmpeg_with_progress
+
+        blocks = [(30, "1.0x"), (30, "1.1x"), (30, "1.2x"), (45, "1.3x"), (45, "1.4x")]
+        script = "import sys\n" + "".join(
+            f"sys.stderr.write('out_time_us={t * 1000000}\\nspeed={sp}\\nprogress=continue\\n')\n" for t, sp in blocks
+        )
+        ui = MagicMock()
+
+        rc = run_ffmpeg_with_progress(
+            [sys.executable, "-c", script], ui, 0, "ENCODE", "a.mkv", 60000, None, tmp_path / "a.mkv", None, 3600
+        )
+
+        assert rc == 0
+        updates = [(c.args[2], c.kwargs["speed"]) for c in ui.update_encode.call_args_list]
+        assert updates == [(50, "1.0x"), (75, "1.3x")]
+
+    def test_run_ffmpeg_with_progress_skips_stats_scrape(self, tmp_path):
+        """Test stats-looking log lines are not scraped when the command uses -progress."""
+        pytest.importorskip("rich")
+        import sys
+
+        from mkv2cast.pipeline import run_ffmpeg_with_progress
+
+        script = "import sys\nsys.stderr.write('frame=1 time=00:00:30.00 speed=1.0x\\n')\n"
+        ui = MagicMock()
+
+        cmd = [sys.executable, "-c", script, "-progress", "pipe:2"]
+        assert run_ffmpeg_with_progress(cmd, ui, 0, "ENCODE", "a.mkv", 60000, None, tmp_path / "a.mkv") == 0
+        ui.update_encode.assert_not_called()
+
+        assert run_ffmpeg_with_progress(cmd[:3], ui, 0, "ENCODE", "a.mkv", 60000, None, tmp_path / "a.mkv") == 0
+        assert ui.update_encode.call_args.args[2] == 50
+
+
+class TestWorkQueue:
+    """Tests for the condition-variable work queue."""
+
+    def test_fifo_order(self):
+        """Test items come out in insertion order."""
+        pytest.importorskip("rich")
+        from mkv2cast.pipeline import WorkQueue
+
+        q = WorkQueue()
+        for i in range(3):
+            q.put(i)
+        assert [q.get() for _ in range(3)] == [(True, 0), (True, 1), (True, 2)]
+
+    def test_stop_wakes_blocked_workers(self):
+        """Test stop() releases every waiting worker immediately."""
+        pytest.importorskip("rich")
+        import threading
+
+        from mkv2cast.pipeline import WorkQueue
+
+        q = WorkQueue()
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(q.get())) for _ in range(3)]
+        for t in workers:
+            t.start()
+
+        q.stop()
+        for t in workers:
+            t.join(timeout=2)
+
+        assert not any(t.is_alive() for t in workers)
+        assert results == [(False, None)] * 3
+        q.put(1)
+        assert q.get() == (False, None)
+
+    def test_close_drains_then_releases_workers(self):
+        """Test close() lets workers finish queued items before exiting."""
+        pytest.importorskip("rich")
+        import threading
+
+        from mkv2cast.pipeline import WorkQueue
+
+        q = WorkQueue()
+        q.put("a")
+        q.close()
+        assert q.get() == (True, "a")
+        assert q.get() == (False, None)
+
+        q = WorkQueue()
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(q.get())) for _ in range(2)]
+        for t in workers:
+            t.start()
+        q.close()
+        for t in workers:
+            t.join(timeout=2)
+        assert results == [(False, None)] * 2
+
+    def test_bounded_put_waits_for_room(self):
+        """Test a full bounded queue blocks put() until a get() or stop()."""
+        pytest.importorskip("rich")
+        import threading
+
+        from mkv2cast.pipeline import WorkQueue
+
+        q = WorkQueue(maxsize=1)
+        assert q.put("a") is True
+
+        results = []
+        producer = threading.Thread(target=lambda: results.append(q.put("b")))
+        producer.start()
+        producer.join(timeout=0.1)
+        assert producer.is_alive()
+
+        assert q.get() == (True, "a")
+        producer.join(timeout=2)
+        assert results == [True]
+
+        blocked = threading.Thread(target=lambda: results.append(q.put("c")))
+        blocked.start()
+        q.stop()
+        blocked.join(timeout=2)
+        assert not blocked.is_alive()
+        assert results == [True, False]
+
 
 class TestProcessTracking:
     """Tests for process tracking functions."""
@@ -132,14 +432,37 @@ class TestProcessTracking:
 
         # Clear any existing
         with pytest.MonkeyPatch.context() as mp:
-            mp.setattr("mkv2cast.pipeline._active_processes", [])
+            mp.setattr("mkv2cast.pipeline._active_processes", set())
 
             register_process(mock_proc)
-            # Check it was added (note: we can't directly access due to module-level list)
+            # Check it was added (note: we can't directly access due to module-level set)
 
             unregister_process(mock_proc)
             # Should complete without error
 
+    def test_terminate_all_processes_returns_once_exited(self, monkeypatch):
+        """Test termination does not sleep out the grace period when processes exit."""
+        pytest.importorskip("rich")
+        import subprocess
+        import sys
+        import time
+
+        import mkv2cast.pipeline as pipeline_mod
+
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        monkeypatch.setattr(pipeline_mod, "_active_processes", {proc})
+
+        start = time.monotonic()
+        pipeline_mod.terminate_all_processes()
+        assert proc.poll() is not None
+        assert pipeline_mod._active_processes == set()
+        assert time.monotonic() - start < 0.5
+
+        monkeypatch.setattr(pipeline_mod, "_active_processes", set())
+        start = time.monotonic()
+        pipeline_mod.terminate_all_processes()
+        assert time.monotonic() - start < 0.1
+
 
 class TestIntegrityCheckWithProgress:
     """Tests for integrity check with progress updates."""
@@ -160,3 +483,49 @@ class TestIntegrityCheckWithProgress:
 
         assert success is True
         assert elapsed == 0
+
+    def test_integrity_check_uses_caller_stat(self, monkeypatch):
+        """Test a (size, mtime_ns) from the caller replaces the size stat."""
+        pytest.importorskip("rich")
+        import mkv2cast.pipeline as pipeline_mod
+        from mkv2cast.config import Config
+
+        monkeypatch.setattr(pipeline_mod, "file_stat", lambda path: pytest.fail("input was stat'ed again"))
+        cfg = Config()
+        cfg.integrity_check = True
+
+        success, _elapsed = pipeline_mod.integrity_check_with_progress(
+            Path("/fake/path.mkv"), MagicMock(), worker_id=0, filename="path.mkv", cfg=cfg, initial=(512, 0)
+        )
+
+        assert success is False
+
+    def test_integrity_check_on_stable_before_ffprobe(self, monkeypatch):
+        """Test on_stable fires after the size/stability checks and before ffprobe."""
+        pytest.importorskip("rich")
+        import mkv2cast.pipeline as pipeline_mod
+        from mkv2cast.config import Config
+
+        calls = []
+        monkeypatch.setattr(pipeline_mod, "check_ffprobe_valid", lambda path: calls.append("ffprobe") or True)
+        cfg = Config()
+        cfg.integrity_check = True
+        cfg.stable_wait = 0
+        cfg.deep_check = False
+
+        def run(size):
+            return pipeline_mod.integrity_check_with_progress(
+                Path("/fake/path.mkv"),
+                MagicMock(),
+                worker_id=0,
+                filename="path.mkv",
+                cfg=cfg,
+                initial=(size, 0),
+                on_stable=lambda: calls.append("stable"),
+            )[0]
+
+        assert run(512) is False
+        assert calls == []
+
+        assert run(2 * 1024 * 1024) is True
+        assert calls == ["stable", "ffprobe"]
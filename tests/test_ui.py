@@ -83,6 +83,37 @@ class TestLegacyUI:
         assert state.stage == "ENCODE"
         assert state.pct == 50
 
+    def test_legacy_render_skips_unchanged_state(self, monkeypatch):
+        """Test an unchanged state is not formatted or written again."""
+        import io
+
+        import mkv2cast.ui.legacy_ui as legacy
+        from mkv2cast.ui.legacy_ui import LegacyProgressUI, UIState
+
+        out = io.StringIO()
+        widths = []
+        monkeypatch.setattr(legacy.sys, "stdout", out)
+        monkeypatch.setattr(legacy, "term_width", lambda: widths.append(1) or 100)
+
+        ui = LegacyProgressUI(progress=False)
+        ui.enabled = True
+        state = UIState(stage="ENCODE", pct=10, cur=1, total=2, base="a.mkv", eta="00:01:00", speed="1.0x")
+
+        ui.render(state)
+        written = out.getvalue()
+        ui.render(UIState(**vars(state)))
+        assert out.getvalue() == written
+        assert len(widths) == 1
+
+        state.pct = 11
+        ui.render(state)
+        assert "11%" in out.getvalue()[len(written) :]
+
+        ui.log("message")
+        before = out.getvalue()
+        ui.render(state)
+        assert out.getvalue() != before
+
 
 class TestRichUI:
     """Tests for Rich UI (if available)."""